@@ -3,6 +3,7 @@ Chat API Routes
 """
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import StreamingResponse
+import json
 import uuid
 
 from app.models import ChatRequest, ChatResponse, SourceCitation
@@ -30,7 +31,13 @@ async def chat(
             history.append({"role": msg.role, "content": msg.content})
         
         # Run the RAG agent - now returns detailed source metadata
-        response, source_metadata = await rag_agent.query(user_message, history)
+        response, source_metadata = await rag_agent.query(
+            user_message,
+            history,
+            retrieval_mode=request.retrieval_mode,
+            model=request.model,
+            temperature=request.temperature
+        )
         
         # Convert source metadata to SourceCitation objects
         sources = [
@@ -40,7 +47,8 @@ async def chat(
                 page=src.get("page"),
                 excerpt=src.get("excerpt", ""),
                 relevance_score=src.get("relevance_score", 0.0),
-                highlight_text=src.get("highlight_text", src.get("full_content", ""))
+                highlight_text=src.get("highlight_text", src.get("full_content", "")),
+                start_index=src.get("start_index")
             )
             for src in source_metadata
         ] if source_metadata else None
@@ -62,6 +70,9 @@ async def chat_stream(
 ):
     """
     Stream chat response using Server-Sent Events
+    
+    Each event has a type (`tool_call`, `sources` or `token`) and a JSON
+    payload; the stream ends with `data: [DONE]`.
     """
     try:
         user_message = request.messages[-1].content if request.messages else ""
@@ -70,8 +81,18 @@ async def chat_stream(
             history.append({"role": msg.role, "content": msg.content})
         
         async def generate():
-            async for chunk in rag_agent.stream_query(user_message, history):
-                yield f"data: {chunk}\n\n"
+            try:
+                async for event in rag_agent.stream_query(
+                    user_message,
+                    history,
+                    retrieval_mode=request.retrieval_mode,
+                    model=request.model,
+                    temperature=request.temperature
+                ):
+                    event_type = event.pop("type")
+                    yield f"event: {event_type}\ndata: {json.dumps(event)}\n\n"
+            except Exception as e:
+                yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
             yield "data: [DONE]\n\n"
         
         return StreamingResponse(
@@ -3,6 +3,8 @@ Dependencies for API routes
 """
 from functools import lru_cache
 from app.core.agent import RAGAgent
+from app.core.registry import DocumentRegistry
+from app.core.ingestion import IngestionManager
 from app.config import get_settings
 
 
@@ -22,14 +24,44 @@ def get_rag_agent() -> RAGAgent:
             chunk_size=settings.CHUNK_SIZE,
             chunk_overlap=settings.CHUNK_OVERLAP,
             embedding_model=settings.EMBEDDING_MODEL,
+            ingest_workers=settings.INGEST_WORKERS,
+            embed_batch_size=settings.EMBED_BATCH_SIZE,
+            pages_per_task=settings.PAGES_PER_TASK,
+            query_embedding_cache_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+            search_cache_size=settings.SEARCH_CACHE_SIZE,
+            chat_workers=settings.CHAT_WORKERS,
+            retrieval_mode=settings.RETRIEVAL_MODE,
+            sparse_index_path=settings.SPARSE_INDEX_DB,
+            model_cache_size=settings.MODEL_CACHE_SIZE,
+            history_token_budget=settings.HISTORY_TOKEN_BUDGET,
+            prompt_token_budget=settings.PROMPT_TOKEN_BUDGET,
+            summary_cache_size=settings.SUMMARY_CACHE_SIZE,
         )
     return _rag_agent
 
 
-# Document store (in production, use a database)
-documents_store: dict = {}
+# Persistent document registry (SQLite)
+_document_registry: DocumentRegistry | None = None
 
 
-def get_documents_store() -> dict:
-    """Get documents store"""
-    return documents_store
+def get_document_registry() -> DocumentRegistry:
+    """Get or create the document registry"""
+    global _document_registry
+    if _document_registry is None:
+        _document_registry = DocumentRegistry(get_settings().REGISTRY_DB)
+        _document_registry.fail_interrupted()
+    return _document_registry
+
+
+# Background ingestion jobs
+_ingestion_manager: IngestionManager | None = None
+
+
+def get_ingestion_manager() -> IngestionManager:
+    """Get or create the ingestion job manager"""
+    global _ingestion_manager
+    if _ingestion_manager is None:
+        _ingestion_manager = IngestionManager(
+            max_concurrent_jobs=get_settings().MAX_CONCURRENT_INGESTS
+        )
+    return _ingestion_manager
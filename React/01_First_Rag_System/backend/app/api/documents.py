@@ -1,16 +1,20 @@
 """
 Documents API Routes
 """
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Tuple
 import uuid
 import os
-import shutil
+import json
 from datetime import datetime
 
-from app.models import DocumentResponse
-from app.api.deps import get_rag_agent, get_documents_store
+from app.models import DocumentResponse, IngestionJobResponse
+from app.api.deps import get_rag_agent, get_document_registry, get_ingestion_manager
 from app.core.agent import RAGAgent
+from app.core.ingestion import IngestionManager, IngestionJob, extract_page_texts
+from app.core.registry import DocumentRegistry, save_and_hash
 from app.config import get_settings
 
 router = APIRouter(prefix="/api/documents", tags=["Documents"])
@@ -20,10 +24,16 @@ router = APIRouter(prefix="/api/documents", tags=["Documents"])
 async def upload_document(
     file: UploadFile = File(...),
     rag_agent: RAGAgent = Depends(get_rag_agent),
-    documents_store: dict = Depends(get_documents_store)
+    registry: DocumentRegistry = Depends(get_document_registry),
+    ingestion: IngestionManager = Depends(get_ingestion_manager)
 ):
     """
-    Upload a document to the knowledge base
+    Upload a document to the knowledge base.
+    
+    Returns immediately with status "processing" and a job id; follow the
+    ingestion with GET /api/documents/jobs/{job_id}/events.
+    Identical content that is already indexed is not embedded again; a changed
+    file uploaded under an existing filename replaces the old chunks.
     """
     try:
         settings = get_settings()
@@ -34,58 +44,154 @@ async def upload_document(
         # Get file extension
         file_ext = file.filename.split(".")[-1].upper() if "." in file.filename else "TXT"
         
-        # Save file
+        # Save file, hashing it on the way (off the event loop: large uploads take a while)
         file_path = os.path.join(settings.UPLOAD_DIR, f"{doc_id}_{file.filename}")
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        content_hash = await run_in_threadpool(save_and_hash, file.file, file_path)
+        
+        # Same content already indexed: nothing to embed
+        existing = registry.get_by_hash(content_hash)
+        if existing:
+            os.remove(file_path)
+            return DocumentResponse(**existing)
+        
+        # Changed file under a known filename: re-index it in place
+        previous = registry.get_by_filename(file.filename)
+        if previous:
+            doc_id = previous["id"]
         
         # Get file size
         file_size = os.path.getsize(file_path)
         
-        # Process document and add to ChromaDB
-        await rag_agent.add_document(file_path, file.filename)
-        
         # Store metadata
         doc_metadata = {
             "id": doc_id,
             "filename": file.filename,
-            "status": "success",
+            "content_hash": content_hash,
+            "status": "processing",
             "upload_date": datetime.now().isoformat(),
             "size": file_size,
             "type": file_ext,
             "path": file_path
         }
-        documents_store[doc_id] = doc_metadata
+        registry.upsert(doc_metadata)
+        
+        # Process document and add to ChromaDB in the background.
+        # A new version is indexed under chunk ids of its own and its pages are
+        # held back, so the previous version keeps answering until the new one
+        # is complete, and is only replaced then.
+        id_prefix = f"{doc_id}:{uuid.uuid4().hex[:8]}" if previous else doc_id
         
-        return DocumentResponse(**doc_metadata)
+        def work(report):
+            pages: List[Tuple[int, str]] = []
+            try:
+                # Chunks written before a failure are removed by ingest_document
+                rag_agent.ingest_document(
+                    file_path,
+                    file.filename,
+                    doc_id=doc_id,
+                    on_progress=report,
+                    on_pages=pages.extend if previous else lambda p: registry.add_pages(doc_id, p),
+                    id_prefix=id_prefix
+                )
+            except Exception:
+                if not previous:
+                    registry.delete_pages(doc_id)
+                raise
+            if previous:
+                rag_agent.delete_document_chunks(file.filename, keep_prefix=id_prefix)
+                registry.delete_pages(doc_id)
+                registry.add_pages(doc_id, pages)
+                if previous["path"] != file_path and os.path.exists(previous["path"]):
+                    os.remove(previous["path"])
+        
+        def on_done(job: IngestionJob):
+            if job.error and previous:
+                # The previous version is still indexed: keep its record
+                registry.upsert(previous)
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                return
+            registry.update_status(doc_id, "error" if job.error else "success")
+        
+        job = ingestion.submit(doc_id, file.filename, work, on_done)
+        
+        return DocumentResponse(**doc_metadata, job_id=job.id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_ingestion_job(
+    job_id: str,
+    ingestion: IngestionManager = Depends(get_ingestion_manager)
+):
+    """
+    Get the status and latest progress of an ingestion job
+    """
+    job = ingestion.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return IngestionJobResponse(**job.to_dict())
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_ingestion_job(
+    job_id: str,
+    ingestion: IngestionManager = Depends(get_ingestion_manager)
+):
+    """
+    Stream ingestion progress (per page and per embedding batch) using Server-Sent Events
+    """
+    job = ingestion.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def generate():
+        queue = job.subscribe()
+        try:
+            while True:
+                event = await queue.get()
+                yield f"data: {json.dumps(event)}\n\n"
+                if event["stage"] in ("done", "error"):
+                    break
+            yield "data: [DONE]\n\n"
+        finally:
+            job.unsubscribe(queue)
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+    )
+
+
 @router.get("", response_model=List[DocumentResponse])
 async def list_documents(
-    documents_store: dict = Depends(get_documents_store)
+    registry: DocumentRegistry = Depends(get_document_registry)
 ):
     """
     List all uploaded documents
     """
-    return [DocumentResponse(**doc) for doc in documents_store.values()]
+    return [DocumentResponse(**doc) for doc in registry.list()]
 
 
 @router.delete("/{doc_id}")
 async def delete_document(
     doc_id: str,
     rag_agent: RAGAgent = Depends(get_rag_agent),
-    documents_store: dict = Depends(get_documents_store)
+    registry: DocumentRegistry = Depends(get_document_registry)
 ):
     """
     Delete a document from the knowledge base
     """
-    if doc_id not in documents_store:
+    doc = registry.get(doc_id)
+    if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
     try:
-        doc = documents_store[doc_id]
         
         # Remove from ChromaDB
         await rag_agent.remove_document(doc["filename"])
@@ -94,84 +200,61 @@ async def delete_document(
         if os.path.exists(doc["path"]):
             os.remove(doc["path"])
         
-        # Remove from store
-        del documents_store[doc_id]
+        # Remove from registry
+        registry.delete(doc_id)
         
         return {"message": "Document deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _locate_highlight(text: str, highlight: Optional[str], start: Optional[int]) -> Tuple[int, int]:
+    """Get the (start, end) of the highlight in a page, or (-1, -1)"""
+    if not highlight:
+        return -1, -1
+    # Offset stored with the chunk at ingest: verify instead of searching
+    if start is not None and text.startswith(highlight[:100], start):
+        return start, start + len(highlight)
+    idx = text.find(highlight[:100])  # Use first 100 chars for matching
+    if idx == -1:
+        return -1, -1
+    return idx, idx + len(highlight)
+
+
 @router.get("/view/{filename:path}")
 async def view_document(
     filename: str,
     highlight: str = None,
-    documents_store: dict = Depends(get_documents_store)
+    page: Optional[int] = Query(None, ge=1, description="First page to return (1-indexed)"),
+    page_count: int = Query(1, ge=1, le=20, description="Number of pages to return"),
+    start: Optional[int] = Query(None, ge=0, description="Offset of the highlight in its page"),
+    registry: DocumentRegistry = Depends(get_document_registry)
 ):
     """
-    Get document content for viewing with optional highlight text.
-    Returns the document content and metadata for the source viewer.
+    Get document pages for viewing with optional highlight text.
+    
+    Only the requested pages are read from the page store. Pass the
+    citation's `page` and `start_index` (as `start`) to place the highlight
+    without searching for it.
     """
     # Find document by filename
-    doc_info = None
-    for doc in documents_store.values():
-        if doc["filename"] == filename:
-            doc_info = doc
-            break
+    doc_info = registry.get_by_filename(filename)
     
     if not doc_info:
         raise HTTPException(status_code=404, detail="Document not found")
     
     try:
-        file_path = doc_info["path"]
-        
-        # Read document content based on type
-        if file_path.lower().endswith('.pdf'):
-            # For PDFs, extract text
-            from langchain_community.document_loaders import PyPDFLoader
-            loader = PyPDFLoader(file_path)
-            pages = loader.load()
-            
-            content = []
-            for i, page in enumerate(pages):
-                page_content = {
-                    "page": i + 1,
-                    "text": page.page_content,
-                    "has_highlight": False,
-                    "highlight_start": -1,
-                    "highlight_end": -1
-                }
-                
-                # Check if this page contains the highlight text
-                if highlight:
-                    idx = page.page_content.find(highlight[:100])  # Use first 100 chars for matching
-                    if idx != -1:
-                        page_content["has_highlight"] = True
-                        page_content["highlight_start"] = idx
-                        page_content["highlight_end"] = idx + len(highlight)
-                
-                content.append(page_content)
-            
-            return {
-                "filename": filename,
-                "type": "pdf",
-                "pages": content,
-                "total_pages": len(pages),
-                "highlight_text": highlight
-            }
-        else:
-            # For text files
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-            
-            highlight_start = -1
-            highlight_end = -1
-            if highlight:
-                idx = text.find(highlight[:100])
-                if idx != -1:
-                    highlight_start = idx
-                    highlight_end = idx + len(highlight)
-            
+        doc_id = doc_info["id"]
+        total_pages = registry.page_count(doc_id)
+        if total_pages == 0:
+            # Indexed before page texts were stored: extract them once
+            pages = await run_in_threadpool(extract_page_texts, doc_info["path"])
+            registry.add_pages(doc_id, pages)
+            total_pages = len(pages)
+        
+        if not doc_info["path"].lower().endswith('.pdf'):
+            (_, text), = registry.get_pages(doc_id, 0)
+            highlight_start, highlight_end = _locate_highlight(text, highlight, start)
             return {
                 "filename": filename,
                 "type": "text",
@@ -180,6 +263,42 @@ async def view_document(
                 "highlight_start": highlight_start,
                 "highlight_end": highlight_end
             }
+        
+        if page is None:
+            page = 1
+            if highlight:
+                # Citation without a page: find the first page containing the highlight
+                for first in range(0, total_pages, 50):
+                    found = next(
+                        (number for number, text in registry.get_pages(doc_id, first, 50)
+                         if highlight[:100] in text),
+                        None
+                    )
+                    if found is not None:
+                        page = found + 1
+                        break
+        
+        content = []
+        for number, text in registry.get_pages(doc_id, page - 1, page_count):
+            highlight_start, highlight_end = (
+                _locate_highlight(text, highlight, start) if number == page - 1 else (-1, -1)
+            )
+            content.append({
+                "page": number + 1,
+                "text": text,
+                "has_highlight": highlight_start != -1,
+                "highlight_start": highlight_start,
+                "highlight_end": highlight_end
+            })
+        
+        return {
+            "filename": filename,
+            "type": "pdf",
+            "page": page,
+            "pages": content,
+            "total_pages": total_pages,
+            "highlight_text": highlight
+        }
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
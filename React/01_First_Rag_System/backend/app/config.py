@@ -29,19 +29,44 @@ class Settings(BaseSettings):
     BASE_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     UPLOAD_DIR: str = os.path.join(BASE_DIR, "uploads")
     CHROMA_DIR: str = os.path.join(BASE_DIR, "chroma_db")
+    REGISTRY_DB: str = os.path.join(BASE_DIR, "documents.db")
+    SPARSE_INDEX_DB: str = os.path.join(CHROMA_DIR, "bm25.db")
     
     # LLM settings
     DEFAULT_MODEL: str = "llama3.2:1b"
     DEFAULT_TEMPERATURE: float = 0.7
+    MODEL_CACHE_SIZE: int = 4  # Compiled agent graphs kept per (model, temperature)
     
     # Embedding model settings (FastEmbed - ONNX based, no PyTorch needed)
     # Options: "BAAI/bge-small-en-v1.5" (fastest), "BAAI/bge-base-en-v1.5" (balanced)
     EMBEDDING_MODEL: str = "BAAI/bge-small-en-v1.5"
     
+    # Retrieval: "dense", "sparse" (BM25) or "hybrid" (both, fused); overridable per request
+    RETRIEVAL_MODE: str = "hybrid"
+    
+    # Concurrent chat queries
+    CHAT_WORKERS: int = 8
+    
     # Document processing
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
     
+    # Ingestion (parsing + embedding run in worker processes)
+    INGEST_WORKERS: int = 2
+    EMBED_BATCH_SIZE: int = 64
+    PAGES_PER_TASK: int = 16
+    MAX_CONCURRENT_INGESTS: int = 2
+    
+    # Conversation history (estimated tokens); older turns are summarized, 0 disables
+    HISTORY_TOKEN_BUDGET: int = 2000
+    # Prompt size above which earlier tool outputs are elided within a run, 0 disables
+    PROMPT_TOKEN_BUDGET: int = 6000
+    SUMMARY_CACHE_SIZE: int = 256
+    
+    # Retrieval caches (entries)
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024
+    SEARCH_CACHE_SIZE: int = 256
+    
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -1,3 +1,5 @@
 from .agent import RAGAgent
+from .registry import DocumentRegistry
+from .cache import RetrievalCache
 
-__all__ = ["RAGAgent"]
+__all__ = ["RAGAgent", "DocumentRegistry", "RetrievalCache"]
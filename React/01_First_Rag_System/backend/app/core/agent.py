@@ -3,24 +3,40 @@ RAG Agent with ChromaDB and LangGraph ReAct Pattern
 This module combines document retrieval with the ReAct agent for intelligent responses.
 """
 
-from typing import Annotated, Sequence, TypedDict, List, Tuple, Optional, Dict, Any
+from typing import Annotated, Sequence, TypedDict, List, Tuple, Optional, Dict, Any, Callable
 from langchain_ollama import ChatOllama
 from langchain_community.embeddings import FastEmbedEmbeddings
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, BaseMessage, SystemMessage
 from langchain_core.tools import tool
+from langchain_core.runnables import RunnableConfig
 from langchain_core.documents import Document
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 from langchain_chroma import Chroma
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
 import os
 import asyncio
 import re
 import json
 import hashlib
-from concurrent.futures import ThreadPoolExecutor
+import uuid
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.ingestion import init_worker, count_pages, load_and_split_pages, embed_texts
+from app.core.cache import RetrievalCache
+from app.core.sparse_index import BM25Index, reciprocal_rank_fusion
+from app.core.model_registry import ModelRegistry
+from app.core.history import HistoryManager
+from app.core.arithmetic import answer_arithmetic
+
+
+RETRIEVAL_MODES = ("dense", "sparse", "hybrid")
+RRF_K = 60
 
 
 class SourceMetadata(TypedDict):
@@ -58,20 +74,39 @@ class RAGAgent:
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
         embedding_model: str = "BAAI/bge-small-en-v1.5",
+        ingest_workers: int = 1,
+        embed_batch_size: int = 64,
+        pages_per_task: int = 16,
+        query_embedding_cache_size: int = 1024,
+        search_cache_size: int = 256,
+        chat_workers: int = 8,
+        retrieval_mode: str = "hybrid",
+        sparse_index_path: str = None,
+        model_cache_size: int = 4,
+        embeddings_factory: Optional[Callable[..., Any]] = None,
+        history_token_budget: int = 2000,
+        prompt_token_budget: int = 6000,
+        summary_cache_size: int = 256,
     ):
-        self.model_name = model
-        self.temperature = temperature
         self.chroma_dir = chroma_dir or os.path.join(os.path.dirname(__file__), "../../chroma_db")
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.embedding_model = embedding_model
+        # Must be picklable (a top-level class or function): worker processes call it too
+        self.embeddings_factory = embeddings_factory or FastEmbedEmbeddings
+        self.ingest_workers = ingest_workers
+        self.embed_batch_size = embed_batch_size
+        self.pages_per_task = pages_per_task
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {retrieval_mode}")
+        self.retrieval_mode = retrieval_mode
         
         # Ensure chroma directory exists
         os.makedirs(self.chroma_dir, exist_ok=True)
         
         # Initialize FastEmbed embeddings - ONNX-based, lightweight (no PyTorch needed!)
         # Available models: "BAAI/bge-small-en-v1.5" (fast), "BAAI/bge-base-en-v1.5" (balanced)
-        self.embeddings = FastEmbedEmbeddings(
+        self.embeddings = self.embeddings_factory(
             model_name=self.embedding_model,
         )
         
@@ -82,6 +117,21 @@ class RAGAgent:
             persist_directory=self.chroma_dir
         )
         
+        # BM25 index over the same chunks, fused with dense results in hybrid mode
+        self.sparse_index = BM25Index(sparse_index_path or os.path.join(self.chroma_dir, "bm25.db"))
+        self._sync_sparse_index()
+        
+        # Query embedding and search result caches for search_documents
+        self.retrieval_cache = RetrievalCache(query_embedding_cache_size, search_cache_size)
+        
+        # Keeps replayed conversations and tool outputs within the token budgets
+        self.history = HistoryManager(
+            self._summarize_history,
+            history_token_budget=history_token_budget,
+            prompt_token_budget=prompt_token_budget,
+            summary_cache_size=summary_cache_size,
+        )
+        
         # Text splitter for documents
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.chunk_size,
@@ -89,41 +139,55 @@ class RAGAgent:
             length_function=len,
         )
         
-        # Initialize LLM and tools
-        self._init_llm()
+        # Initialize tools (shared by every model)
+        self._init_tools()
         
-        # Build the LangGraph
-        self._build_graph()
+        # Compiled LangGraphs per (model, temperature), default built now
+        self.models = ModelRegistry(self._build_graph, model, temperature, max_size=model_cache_size)
         
-        # Thread pool for async operations
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # Thread pool for async operations (queries are independent, see AgentState.source_metadata)
+        self.executor = ThreadPoolExecutor(max_workers=chat_workers)
         
-        # Store for retrieved source metadata (per query)
-        self._current_sources: List[Dict[str, Any]] = []
+        # Process pool for parsing and embedding (created on first ingest)
+        self._ingest_pool: Optional[ProcessPoolExecutor] = None
+        self._ingest_pool_lock = threading.Lock()
     
-    def _init_llm(self):
-        """Initialize the LLM with tools"""
-        self.llm = ChatOllama(
-            model=self.model_name,
-            temperature=self.temperature,
+    @property
+    def model_name(self) -> str:
+        return self.models.default[0]
+    
+    @property
+    def temperature(self) -> float:
+        return self.models.default[1]
+    
+    @property
+    def app(self):
+        """Compiled graph of the default model"""
+        return self.models.get()
+    
+    def _create_llm(self, model: str, temperature: float):
+        """Create the chat model client for a model/temperature"""
+        return ChatOllama(
+            model=model,
+            temperature=temperature,
         )
+    
+    def _init_tools(self):
+        """Initialize the agent tools"""
+        # Create tools with access to the retrievers
+        search = self.search
         
-        # Create tools with access to vectorstore
-        vectorstore = self.vectorstore
-        
-        # Reference to self for closure
-        agent_self = self
-        
-        @tool
-        def search_documents(query: str) -> str:
+        @tool(response_format="content_and_artifact")
+        def search_documents(query: str, config: RunnableConfig) -> Tuple[str, List[Dict[str, Any]]]:
             """Search the knowledge base for relevant information about a topic."""
-            # Use similarity_search_with_score for relevance scores
-            docs_with_scores = vectorstore.similarity_search_with_score(query, k=3)
+            # The retrieval mode can be chosen per request through the run config
+            mode = config.get("configurable", {}).get("retrieval_mode")
+            docs_with_scores = search(query, k=3, mode=mode)
             if not docs_with_scores:
-                return "No relevant documents found in the knowledge base."
+                return "No relevant documents found in the knowledge base.", []
             
             result = ""
-            agent_self._current_sources = []  # Reset sources for this query
+            sources = []  # Returned as the ToolMessage artifact, not shown to the LLM
             
             for i, (doc, score) in enumerate(docs_with_scores):
                 filename = doc.metadata.get('source', 'Unknown')
@@ -139,17 +203,18 @@ class RAGAgent:
                     "page": page + 1 if page is not None else None,  # Convert to 1-indexed
                     "excerpt": doc.page_content[:500],  # First 500 chars as excerpt
                     "full_content": doc.page_content,
-                    "relevance_score": round(float(1 - score), 3),  # Convert distance to similarity
+                    "relevance_score": round(float(score), 3),
+                    "start_index": doc.metadata.get('start_index'),  # Offset of the chunk in its page
                     "highlight_text": doc.page_content  # Full text for highlighting
                 }
-                agent_self._current_sources.append(source_meta)
+                sources.append(source_meta)
                 
                 # Format for LLM with source reference
                 page_info = f", Page {page + 1}" if page is not None else ""
                 result += f"\n[Source {i+1}: {filename}{page_info} | ID:{chunk_id}]\n"
                 result += doc.page_content + "\n"
             
-            return result
+            return result, sources
         
         @tool
         def add_numbers(a: int, b: int) -> int:
@@ -174,11 +239,87 @@ class RAGAgent:
             return a / b
         
         self.tools = [search_documents, add_numbers, subtract_numbers, multiply_numbers, divide_numbers]
-        self.llm_with_tools = self.llm.bind_tools(self.tools)
     
-    def _build_graph(self):
-        """Build the LangGraph ReAct agent graph"""
-        llm_with_tools = self.llm_with_tools
+    def _sync_sparse_index(self) -> None:
+        """Rebuild the BM25 index if it doesn't match the vector store (e.g. first start after upgrade)"""
+        collection = self.vectorstore._collection
+        total = collection.count()
+        if len(self.sparse_index) == total:
+            return
+        
+        def all_chunks(page_size: int = 1000):
+            for offset in range(0, total, page_size):
+                page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+                for chunk_id, text, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                    yield chunk_id, text or "", (metadata or {}).get("source", "")
+        
+        count = self.sparse_index.rebuild(all_chunks())
+        print(f"Rebuilt BM25 index with {count} chunks")
+    
+    def _dense_search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        query_embedding = self.retrieval_cache.embed_query(query, self.embeddings.embed_query)
+        results = self.vectorstore.similarity_search_by_vector_with_relevance_scores(query_embedding, k=k)
+        # Convert distance to similarity
+        return [(doc, 1 - distance) for doc, distance in results]
+    
+    def _get_chunks(self, chunk_ids: List[str]) -> Dict[str, Document]:
+        results = self.vectorstore._collection.get(ids=chunk_ids, include=["documents", "metadatas"])
+        return {
+            chunk_id: Document(page_content=text, metadata=metadata or {}, id=chunk_id)
+            for chunk_id, text, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+        }
+    
+    def _sparse_search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        hits = self.sparse_index.search(query, k)
+        if not hits:
+            return []
+        chunks = self._get_chunks([chunk_id for chunk_id, _ in hits])
+        top_score = hits[0][1]
+        # Scale BM25 scores to [0, 1] relative to the best hit
+        return [(chunks[chunk_id], score / top_score) for chunk_id, score in hits if chunk_id in chunks]
+    
+    def _hybrid_search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        candidates = max(k * 4, 20)
+        dense = self._dense_search(query, candidates)
+        sparse = self.sparse_index.search(query, candidates)
+        fused = reciprocal_rank_fusion(
+            [[doc.id for doc, _ in dense], [chunk_id for chunk_id, _ in sparse]], k=RRF_K
+        )[:k]
+        
+        chunks = {doc.id: doc for doc, _ in dense}
+        missing = [chunk_id for chunk_id, _ in fused if chunk_id not in chunks]
+        if missing:
+            chunks.update(self._get_chunks(missing))
+        # Scale fused scores to [0, 1]: 1 means ranked first by both retrievers
+        best_possible = 2 / (RRF_K + 1)
+        return [(chunks[chunk_id], score / best_possible) for chunk_id, score in fused if chunk_id in chunks]
+    
+    def search(self, query: str, k: int = 3, mode: Optional[str] = None) -> List[Tuple[Document, float]]:
+        """
+        Retrieve the chunks most relevant to a query.
+        
+        Args:
+            query: Search query
+            k: Number of chunks to return
+            mode: "dense" (embeddings), "sparse" (BM25) or "hybrid" (both, fused
+                with reciprocal rank fusion); defaults to the agent's retrieval mode
+            
+        Returns:
+            List of (chunk, relevance score in [0, 1]), most relevant first
+        """
+        mode = mode or self.retrieval_mode
+        searchers = {
+            "dense": self._dense_search,
+            "sparse": self._sparse_search,
+            "hybrid": self._hybrid_search,
+        }
+        if mode not in searchers:
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        return self.retrieval_cache.search(query, k, searchers[mode], mode)
+    
+    def _build_graph(self, model: str, temperature: float):
+        """Build the LangGraph ReAct agent graph for a model/temperature"""
+        llm_with_tools = self._create_llm(model, temperature).bind_tools(self.tools)
         
         def call_model(state: AgentState) -> AgentState:
             """Call the LLM with the current state"""
@@ -191,14 +332,31 @@ Your capabilities:
 
 Guidelines:
 - Always search the knowledge base when asked about specific documents or topics
+- When a question needs several independent searches or calculations, request all of them at once; they run in parallel
 - Provide clear, accurate responses based on available information
 - Cite sources when referencing documents
 - If information is not found, say so clearly
 - Be helpful and conversational""")
             
-            response = llm_with_tools.invoke([system_message] + list(state["messages"]))
+            # Earlier rounds' tool outputs are elided from the prompt once it gets too long
+            messages = self.history.elide_tool_outputs(state["messages"])
+            response = llm_with_tools.invoke([system_message] + messages)
             return {"messages": [response]}
         
+        def route_query(state: AgentState) -> AgentState:
+            """Answer pure arithmetic directly, without an LLM call"""
+            last_message = state["messages"][-1]
+            answer = answer_arithmetic(last_message.content) if isinstance(last_message, HumanMessage) else None
+            if answer is None:
+                return {}
+            return {"messages": [AIMessage(content=answer)]}
+        
+        def route_after_router(state: AgentState) -> str:
+            """Skip the agent if the router already answered"""
+            if isinstance(state["messages"][-1], AIMessage):
+                return "end"
+            return "agent"
+        
         def should_continue(state: AgentState) -> str:
             """Determine if we should continue with tool execution"""
             messages = state["messages"]
@@ -210,12 +368,38 @@ Guidelines:
         
         # Build the graph
         graph = StateGraph(AgentState)
+        graph.add_node("router", route_query)
         graph.add_node("agent", call_model)
         
+        # Tool calls from one model turn are executed concurrently by the ToolNode
         tool_node = ToolNode(tools=self.tools)
-        graph.add_node("tools", tool_node)
         
-        graph.set_entry_point("agent")
+        def call_tools(state: AgentState, config: RunnableConfig) -> AgentState:
+            """Run the requested tools and keep this step's citations in the state"""
+            result = tool_node.invoke(state, config)
+            update = {"messages": result["messages"]}
+            searches = [
+                message.artifact for message in result["messages"]
+                if isinstance(message, ToolMessage) and message.name == "search_documents"
+                and message.artifact is not None
+            ]
+            if searches:
+                # The latest tool step that searched provides the citations
+                update["source_metadata"] = [source for sources in searches for source in sources]
+            return update
+        
+        graph.add_node("tools", call_tools)
+        
+        graph.set_entry_point("router")
+        
+        graph.add_conditional_edges(
+            "router",
+            route_after_router,
+            {
+                "agent": "agent",
+                "end": END
+            }
+        )
         
         graph.add_conditional_edges(
             "agent",
@@ -228,43 +412,229 @@ Guidelines:
         
         graph.add_edge("tools", "agent")
         
-        self.app = graph.compile()
+        return graph.compile()
     
-    async def add_document(self, file_path: str, filename: str) -> bool:
+    def _get_ingest_pool(self) -> ProcessPoolExecutor:
+        """Get the parsing/embedding process pool, starting it on first use"""
+        with self._ingest_pool_lock:
+            if self._ingest_pool is None:
+                # spawn: forking a process that runs server threads is unsafe
+                self._ingest_pool = ProcessPoolExecutor(
+                    max_workers=self.ingest_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_worker,
+                    initargs=(self.embedding_model, self.embeddings_factory),
+                )
+            return self._ingest_pool
+    
+    def _reset_ingest_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Drop a broken pool (a worker died) so the next job starts a new one"""
+        with self._ingest_pool_lock:
+            if self._ingest_pool is pool:
+                self._ingest_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def ingest_document(
+        self,
+        file_path: str,
+        filename: str,
+        doc_id: Optional[str] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        on_pages: Optional[Callable[[List[Tuple[int, str]]], None]] = None,
+        id_prefix: Optional[str] = None
+    ) -> int:
         """
-        Add a document to the ChromaDB vector store.
+        Parse, embed and index a document (blocking; run off the event loop).
+        
+        Streaming pipeline: page windows are parsed in worker processes, their
+        chunks are grouped into fixed-size embedding batches spread across the
+        workers, and every batch is written to ChromaDB as soon as it is
+        embedded. At most a few windows and batches are held in memory.
         
         Args:
             file_path: Path to the document file
             filename: Original filename for metadata
+            doc_id: Registry id stored with each chunk
+            on_progress: Called with progress events (page and batch counts)
+            on_pages: Called with (zero-based page, text) pairs as pages are
+                parsed, to store them for the document viewer (text files are page 0)
+            id_prefix: Chunk ids are "<id_prefix>:<chunk index>" (default: doc_id);
+                a new version of a document gets its own prefix, so its chunks
+                do not overwrite the previous version's
             
         Returns:
-            True if successful
+            Number of chunks indexed
+        
+        If ingestion fails, the chunks already written are removed again. If a
+        worker process died, the pool is discarded and the next job starts a new one.
         """
+        doc_id = doc_id or str(uuid.uuid4())
+        pool = self._get_ingest_pool()
+        written: List[str] = []
         try:
-            # Load document based on file type
-            if file_path.lower().endswith('.pdf'):
-                loader = PyPDFLoader(file_path)
-            else:
-                loader = TextLoader(file_path)
-            
-            documents = loader.load()
+            return self._ingest(
+                pool, file_path, filename, doc_id, id_prefix or doc_id,
+                on_progress or (lambda event: None), on_pages, written
+            )
+        except Exception as e:
+            if written:
+                self._delete_chunk_ids(written)
+            if isinstance(e, BrokenProcessPool):
+                self._reset_ingest_pool(pool)
+            raise
+    
+    def _ingest(
+        self,
+        pool: ProcessPoolExecutor,
+        file_path: str,
+        filename: str,
+        doc_id: str,
+        id_prefix: str,
+        report: Callable[[Dict[str, Any]], None],
+        on_pages: Optional[Callable[[List[Tuple[int, str]]], None]],
+        written: List[str]
+    ) -> int:
+        """The streaming pipeline of ingest_document; appends the ids it writes to `written`"""
+        max_in_flight = self.ingest_workers * 2
+        
+        report({"stage": "parsing"})
+        total_pages = pool.submit(count_pages, file_path).result()
+        page_windows = iter(range(0, total_pages, self.pages_per_task))
+        
+        parsing = deque()  # Futures of parsed page windows, in page order
+        embedding = deque()  # (chunk texts, metadatas, future of vectors), in chunk order
+        pending_texts: List[str] = []
+        pending_metadatas: List[Dict[str, Any]] = []
+        state = {"pages": 0, "chunks": 0, "batches": 0}
+        
+        def submit_parse() -> bool:
+            start = next(page_windows, None)
+            if start is None:
+                return False
+            parsing.append(pool.submit(
+                load_and_split_pages, file_path, start, start + self.pages_per_task,
+                self.chunk_size, self.chunk_overlap
+            ))
+            return True
+        
+        def submit_embed(count: int) -> None:
+            texts = pending_texts[:count]
+            metadatas = pending_metadatas[:count]
+            del pending_texts[:count]
+            del pending_metadatas[:count]
+            embedding.append((texts, metadatas, pool.submit(embed_texts, texts)))
+        
+        def write_oldest_batch() -> None:
+            texts, metadatas, future = embedding.popleft()
+            ids = [f"{id_prefix}:{m['chunk_index']}" for m in metadatas]
+            written.extend(ids)
+            self.vectorstore._collection.upsert(
+                ids=ids,
+                embeddings=future.result(),
+                documents=texts,
+                metadatas=metadatas,
+            )
+            self.sparse_index.add(ids, texts, [filename] * len(ids))
+            self.retrieval_cache.invalidate()
+            state["chunks"] += len(texts)
+            state["batches"] += 1
+            report({
+                "stage": "embedding",
+                "batch": state["batches"],
+                "chunks": state["chunks"],
+                "pages": state["pages"],
+                "total_pages": total_pages,
+            })
+        
+        chunk_index = 0
+        for _ in range(max_in_flight):
+            if not submit_parse():
+                break
+        
+        while parsing:
+            pages = parsing.popleft().result()
+            submit_parse()
             
-            # Add source metadata
-            for doc in documents:
-                doc.metadata['source'] = filename
+            if on_pages:
+                on_pages([(page or 0, text) for page, text, _ in pages])
             
-            # Split documents
-            splits = self.text_splitter.split_documents(documents)
+            for page, _, chunks in pages:
+                for chunk, start_index in chunks:
+                    # (page, start_index) locates the chunk for highlighting without searching
+                    metadata = {
+                        "source": filename,
+                        "doc_id": doc_id,
+                        "chunk_index": chunk_index,
+                        "start_index": start_index,
+                    }
+                    if page is not None:
+                        metadata["page"] = page
+                    pending_texts.append(chunk)
+                    pending_metadatas.append(metadata)
+                    chunk_index += 1
+                state["pages"] += 1
+                report({"stage": "parsed", "page": state["pages"], "total_pages": total_pages})
             
-            # Add to vector store
-            self.vectorstore.add_documents(splits)
+            while len(pending_texts) >= self.embed_batch_size:
+                submit_embed(self.embed_batch_size)
+                # Backpressure: don't let embedded-but-unwritten batches pile up
+                while len(embedding) > max_in_flight:
+                    write_oldest_batch()
+        
+        if pending_texts:
+            submit_embed(len(pending_texts))
+        while embedding:
+            write_oldest_batch()
+        
+        return state["chunks"]
+    
+    async def add_document(self, file_path: str, filename: str) -> bool:
+        """
+        Add a document to the ChromaDB vector store.
+        
+        Args:
+            file_path: Path to the document file
+            filename: Original filename for metadata
             
+        Returns:
+            True if successful
+        """
+        try:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self.ingest_document, file_path, filename)
             return True
         except Exception as e:
             print(f"Error adding document: {e}")
             raise e
     
+    def _delete_chunk_ids(self, chunk_ids: List[str]) -> None:
+        """Delete chunks by id from the vector store and the BM25 index (blocking)"""
+        self.vectorstore.delete(ids=chunk_ids)
+        self.sparse_index.remove(chunk_ids)
+        self.retrieval_cache.invalidate()
+    
+    def delete_document_chunks(self, filename: str, keep_prefix: Optional[str] = None) -> None:
+        """
+        Delete all chunks of a document from the vector store (blocking).
+        
+        With keep_prefix, chunks whose id starts with "<keep_prefix>:" (the
+        version just ingested) are kept and only the older ones are deleted.
+        """
+        results = self.vectorstore.get(
+            where={"source": filename}
+        )
+        
+        if keep_prefix:
+            stale = [i for i in results["ids"] if not i.startswith(f"{keep_prefix}:")] if results else []
+            if stale:
+                self._delete_chunk_ids(stale)
+            return
+        
+        if results and results['ids']:
+            self.vectorstore.delete(ids=results['ids'])
+        self.sparse_index.remove_source(filename)
+        self.retrieval_cache.invalidate()
+    
     async def remove_document(self, filename: str) -> bool:
         """
         Remove a document from the vector store.
@@ -276,25 +646,31 @@ Guidelines:
             True if successful
         """
         try:
-            # Get all documents with this source
-            results = self.vectorstore.get(
-                where={"source": filename}
-            )
-            
-            if results and results['ids']:
-                self.vectorstore.delete(ids=results['ids'])
-            
+            self.delete_document_chunks(filename)
             return True
         except Exception as e:
             print(f"Error removing document: {e}")
             return False
     
-    def _run_sync(self, query: str, history: List[dict]) -> Tuple[str, List[Dict[str, Any]]]:
-        """Synchronous execution of the agent"""
-        # Reset current sources before query
-        self._current_sources = []
-        
-        # Build messages
+    def _summarize_history(self, summary: str, messages: List[BaseMessage], model: Optional[str] = None) -> str:
+        """Update a running conversation summary with messages that aged out"""
+        transcript = "\n".join(
+            f"{'User' if message.type == 'human' else 'Assistant'}: {message.content}"
+            for message in messages
+        )
+        prompt = f"""Update the summary of a conversation between a user and a document assistant.
+Keep names, numbers, document references, decisions and open questions. Reply with the summary only, in at most 150 words.
+
+Current summary:
+{summary or "(empty)"}
+
+New messages:
+{transcript}"""
+        response = self._create_llm(model or self.model_name, 0).invoke([HumanMessage(content=prompt)])
+        return response.content.strip()
+    
+    def _build_messages(self, query: str, history: List[dict], model: Optional[str] = None) -> List[BaseMessage]:
+        """Convert the conversation history and new query to LangChain messages"""
         messages = []
         for msg in history:
             if msg['role'] == 'user':
@@ -302,25 +678,56 @@ Guidelines:
             else:
                 messages.append(AIMessage(content=msg['content']))
         
+        # Older turns are summarized (incrementally, cached) to stay within the budget
+        messages = self.history.compact(messages, model=model)
         messages.append(HumanMessage(content=query))
-        
-        # Run the agent
-        result = self.app.invoke({"messages": messages})
+        return messages
+    
+    def _run_config(self, retrieval_mode: Optional[str]) -> RunnableConfig:
+        """Per-request run config, read by the tools"""
+        if retrieval_mode is not None and retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {retrieval_mode}")
+        return {"configurable": {"retrieval_mode": retrieval_mode or self.retrieval_mode}}
+    
+    def _run_sync(
+        self,
+        query: str,
+        history: List[dict],
+        retrieval_mode: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Synchronous execution of the agent"""
+        # The model is picked once; settings changes don't affect this run
+        model, temperature = self.models.resolve(model, temperature)
+        messages = self._build_messages(query, history, model)
+        app = self.models.get(model, temperature)
+        result = app.invoke({"messages": messages}, config=self._run_config(retrieval_mode))
         
         # Extract response and sources
         last_message = result["messages"][-1]
         response_content = last_message.content
         
-        # Return the detailed source metadata collected during search
-        return response_content, self._current_sources.copy()
+        # Citations travel in the graph state, so concurrent queries never share them
+        return response_content, result.get("source_metadata") or []
     
-    async def query(self, query: str, history: List[dict] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    async def query(
+        self,
+        query: str,
+        history: List[dict] = None,
+        retrieval_mode: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None
+    ) -> Tuple[str, List[Dict[str, Any]]]:
         """
         Query the RAG agent asynchronously.
         
         Args:
             query: User's question
             history: Conversation history
+            retrieval_mode: "dense", "sparse" or "hybrid" (defaults to the agent's mode)
+            model: Model for this request only (defaults to the current setting)
+            temperature: Temperature for this request only (defaults to the current setting)
             
         Returns:
             Tuple of (response_content, source_metadata_list)
@@ -333,56 +740,82 @@ Guidelines:
             self.executor,
             self._run_sync,
             query,
-            history
+            history,
+            retrieval_mode,
+            model,
+            temperature
         )
         
         return result
     
-    async def stream_query(self, query: str, history: List[dict] = None):
+    async def stream_query(
+        self,
+        query: str,
+        history: List[dict] = None,
+        retrieval_mode: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None
+    ):
         """
-        Stream the query response.
+        Stream the agent run as it happens.
         
         Args:
             query: User's question
             history: Conversation history
+            retrieval_mode: "dense", "sparse" or "hybrid" (defaults to the agent's mode)
+            model: Model for this request only (defaults to the current setting)
+            temperature: Temperature for this request only (defaults to the current setting)
             
         Yields:
-            Response chunks
+            Event dicts, in order of occurrence:
+            - {"type": "tool_call", "name": ..., "args": {...}} when a tool starts
+            - {"type": "sources", "sources": [...]} when a search returns citations
+            - {"type": "token", "content": ...} for every LLM token delta
         """
-        history = history or []
+        model, temperature = self.models.resolve(model, temperature)
+        config = self._run_config(retrieval_mode)
+        app = self.models.get(model, temperature)
         
-        # Build messages
-        messages = []
-        for msg in history:
-            if msg['role'] == 'user':
-                messages.append(HumanMessage(content=msg['content']))
-            else:
-                messages.append(AIMessage(content=msg['content']))
-        
-        messages.append(HumanMessage(content=query))
+        # Compaction may call the LLM to summarize, so keep it off the event loop
+        loop = asyncio.get_event_loop()
+        messages = await loop.run_in_executor(
+            self.executor, self._build_messages, query, history or [], model
+        )
         
-        # Stream the response
-        for chunk in self.app.stream({"messages": messages}, stream_mode="values"):
-            last_message = chunk["messages"][-1]
-            if isinstance(last_message, AIMessage) and last_message.content:
-                yield last_message.content
+        async for event in app.astream_events({"messages": messages}, config=config, version="v2"):
+            kind = event["event"]
+            
+            if kind == "on_chat_model_stream":
+                content = event["data"]["chunk"].content
+                if content:
+                    yield {"type": "token", "content": content}
+            
+            elif kind == "on_tool_start":
+                yield {"type": "tool_call", "name": event["name"], "args": event["data"].get("input", {})}
+            
+            elif kind == "on_tool_end":
+                output = event["data"].get("output")
+                if isinstance(output, ToolMessage) and output.artifact:
+                    yield {"type": "sources", "sources": output.artifact}
+            
+            elif kind == "on_chain_end" and event["name"] == "router":
+                # Arithmetic answered by the router never goes through the LLM
+                output = event["data"].get("output") or {}
+                for message in output.get("messages", []):
+                    yield {"type": "token", "content": message.content}
     
     def update_settings(self, model: str = None, temperature: float = None):
         """
         Update agent settings.
         
+        The new default is swapped in atomically; requests already running
+        finish with the model they started with.
+        
         Args:
             model: New model name
             temperature: New temperature value
         """
-        if model:
-            self.model_name = model
-        if temperature is not None:
-            self.temperature = temperature
-        
-        # Reinitialize LLM with new settings
-        self._init_llm()
-        self._build_graph()
+        self.models.set_default(model, temperature)
     
     def get_settings(self) -> dict:
         """
@@ -395,5 +828,7 @@ Guidelines:
             "model": self.model_name,
             "temperature": self.temperature,
             "chroma_path": self.chroma_dir,
-            "document_count": self.vectorstore._collection.count() if self.vectorstore._collection else 0
+            "retrieval_mode": self.retrieval_mode,
+            "document_count": self.vectorstore._collection.count() if self.vectorstore._collection else 0,
+            "cache": self.retrieval_cache.stats()
         }
@@ -0,0 +1,118 @@
+"""
+Arithmetic Fast Path
+
+Pure arithmetic questions ("what is 17*23?", "(1200 + 350) / 4") are answered
+directly by a safe AST evaluator instead of two LLM round trips through the
+math tools. Only numeric literals, + - * / // ** and parentheses are accepted;
+anything else is left to the agent.
+"""
+
+import ast
+import math
+import operator
+import re
+from typing import Optional, Union
+
+Number = Union[int, float]
+
+MAX_EXPRESSION_LENGTH = 200
+MAX_POWER_BITS = 4096  # Reject powers whose result would exceed ~4096 bits
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: operator.pow,
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+QUESTION_PREFIX = re.compile(
+    r"^(?:what\s+is|what's|whats|how\s+much\s+is|calculate|compute|evaluate|solve)\s+",
+    re.IGNORECASE
+)
+WORD_OPERATORS = [
+    (re.compile(r"\bplus\b"), "+"),
+    (re.compile(r"\bminus\b"), "-"),
+    (re.compile(r"\b(?:times|multiplied\s+by)\b"), "*"),
+    (re.compile(r"\bdivided\s+by\b"), "/"),
+    (re.compile(r"(?<=[\d)\s])[x×](?=[\s\d(])"), "*"),
+    (re.compile(r"÷"), "/"),
+    (re.compile(r"\^"), "**"),
+]
+THOUSANDS_SEPARATOR = re.compile(r"(?<=\d),(?=\d{3}\b)")
+EXPRESSION_CHARS = re.compile(r"^[\d\s.+\-*/()]+$")
+# Phone numbers and identifiers ("1-888-687-3287") are not subtractions
+HYPHENATED_NUMBER = re.compile(r"^\d+(?:-\d+){2,}$")
+
+
+def extract_expression(query: str) -> Optional[str]:
+    """Turn a question into a Python arithmetic expression, or None if it isn't pure arithmetic"""
+    text = QUESTION_PREFIX.sub("", query.strip().lower()).rstrip("?!. =")
+    for pattern, replacement in WORD_OPERATORS:
+        text = pattern.sub(replacement, text)
+    text = THOUSANDS_SEPARATOR.sub("", text).strip()
+    if not text or len(text) > MAX_EXPRESSION_LENGTH or not EXPRESSION_CHARS.match(text):
+        return None
+    if HYPHENATED_NUMBER.match(text):
+        return None
+    return text
+
+
+def _evaluate(node: ast.AST) -> Number:
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        return UNARY_OPERATORS[type(node.op)](_evaluate(node.operand))
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        left, right = _evaluate(node.left), _evaluate(node.right)
+        if isinstance(node.op, ast.Pow):
+            if abs(right) > 1000 or (abs(left) > 1 and math.log2(abs(left)) * abs(right) > MAX_POWER_BITS):
+                raise ValueError("Exponent too large")
+            # A fractional power of a negative number is complex
+            if left < 0 and not float(right).is_integer():
+                raise ValueError("Result is not a real number")
+        return BINARY_OPERATORS[type(node.op)](left, right)
+    raise ValueError(f"Unsupported expression: {ast.dump(node)}")
+
+
+def format_number(value: Number) -> str:
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.10g}"
+    return str(value)
+
+
+def answer_arithmetic(query: str) -> Optional[str]:
+    """
+    Answer a pure arithmetic question directly.
+
+    Returns:
+        The answer, or None if the query needs the agent (not arithmetic,
+        a bare number, or too large to evaluate safely)
+    """
+    expression = extract_expression(query)
+    if expression is None:
+        return None
+    try:
+        tree = ast.parse(expression, mode="eval")
+        # A bare number ("2024?") is not a calculation
+        operation = tree.body
+        while isinstance(operation, ast.UnaryOp):
+            operation = operation.operand
+        if not isinstance(operation, ast.BinOp):
+            return None
+        result = _evaluate(tree)
+    except ZeroDivisionError:
+        return f"{expression} is undefined: cannot divide by zero."
+    except (SyntaxError, ValueError, OverflowError):
+        return None
+    return f"{expression} = {format_number(result)}"
@@ -0,0 +1,122 @@
+"""
+Retrieval Caches
+
+Two levels of caching for the search_documents tool:
+
+1. Query text -> embedding vector (LRU). Repeated questions skip the
+   embedding model entirely.
+2. (normalized query, k, retrieval mode, collection version) -> search
+   results (LRU). The collection version is bumped whenever chunks are
+   written or deleted, so stale results are never served after the
+   knowledge base changes.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class LRUCache:
+    """Thread-safe LRU cache that counts hits and misses"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "size": len(self._data),
+                "max_size": self.max_size,
+            }
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query used as a cache key"""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class RetrievalCache:
+    """
+    Query embedding and search result caches for one vector collection.
+
+    Call `invalidate` after any write to the collection.
+    """
+
+    def __init__(self, embedding_cache_size: int = 1024, result_cache_size: int = 256):
+        self.embeddings = LRUCache(embedding_cache_size)
+        self.results = LRUCache(result_cache_size)
+        self._version = 0
+        self._version_lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        """Mark the collection as changed, dropping all cached results"""
+        with self._version_lock:
+            self._version += 1
+        self.results.clear()
+
+    def embed_query(self, query: str, embed: Callable[[str], List[float]]) -> List[float]:
+        """Get the embedding of a query, computing it with `embed` on a miss"""
+        vector = self.embeddings.get(query)
+        if vector is None:
+            vector = embed(query)
+            self.embeddings.put(query, vector)
+        return vector
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        search: Callable[[str, int], List[Tuple[Any, float]]],
+        mode: str = "dense"
+    ) -> List[Tuple[Any, float]]:
+        """Get the top-k results of a query, running `search` on a miss"""
+        # Read the version first: results computed while the collection changes
+        # are stored under the old version and never served afterwards
+        key = (normalize_query(query), k, mode, self._version)
+        results = self.results.get(key)
+        if results is None:
+            results = search(query, k)
+            self.results.put(key, results)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "collection_version": self._version,
+            "query_embeddings": self.embeddings.stats(),
+            "search_results": self.results.stats(),
+        }
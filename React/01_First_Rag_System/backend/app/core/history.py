@@ -0,0 +1,165 @@
+"""
+Conversation History Compaction
+
+Every chat request replays the whole conversation, so without compaction
+prompt size and latency grow with every turn. The history manager keeps the
+prompt within a token budget:
+
+1. Recent messages are kept verbatim, newest first, up to the history budget.
+2. Older messages are folded into a running summary. Summaries are cached by
+   a hash of the conversation prefix they cover, so each turn only summarizes
+   the messages that just aged out instead of the whole conversation.
+3. Inside an agent run, tool outputs from earlier rounds are elided once the
+   prompt exceeds the prompt budget; the latest round is always kept.
+"""
+
+import hashlib
+from typing import Callable, List, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, ToolMessage
+
+from app.core.cache import LRUCache
+
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def message_tokens(message: BaseMessage) -> int:
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    return estimate_tokens(content) + 4  # Role and formatting overhead
+
+
+def prefix_hashes(messages: Sequence[BaseMessage]) -> List[str]:
+    """Chained hash of every prefix: hashes[i] identifies messages[:i + 1]"""
+    hashes = []
+    digest = ""
+    for message in messages:
+        digest = hashlib.sha256(
+            f"{digest}\x00{message.type}\x00{message.content}".encode("utf-8")
+        ).hexdigest()
+        hashes.append(digest)
+    return hashes
+
+
+class HistoryManager:
+    """
+    Keeps conversation history within a token budget.
+
+    `summarize(previous_summary, messages)` must return the previous summary
+    updated with the given messages; it is only called for messages that fall
+    out of the verbatim window and are not covered by a cached summary.
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[str, List[BaseMessage]], str],
+        history_token_budget: int = 2000,
+        prompt_token_budget: int = 6000,
+        summary_cache_size: int = 256,
+    ):
+        self.summarize = summarize
+        self.history_token_budget = history_token_budget
+        self.prompt_token_budget = prompt_token_budget
+        self.summaries = LRUCache(summary_cache_size)
+
+    def _split_point(self, history: Sequence[BaseMessage]) -> int:
+        """Index of the first message kept verbatim"""
+        used = 0
+        cut = len(history)
+        while cut > 0:
+            tokens = message_tokens(history[cut - 1])
+            if used + tokens > self.history_token_budget:
+                break
+            used += tokens
+            cut -= 1
+        # Start the verbatim window on a user message so the exchange reads naturally
+        while 0 < cut < len(history) and history[cut].type != "human":
+            cut += 1
+        return cut
+
+    def _summary_for(self, history: Sequence[BaseMessage], cut: int, **kwargs) -> str:
+        """Summary of history[:cut], extending the longest cached prefix summary"""
+        hashes = prefix_hashes(history[:cut])
+
+        start, summary = 0, ""
+        for end in range(cut, 0, -1):
+            cached = self.summaries.get(hashes[end - 1])
+            if cached is not None:
+                start, summary = end, cached
+                break
+
+        # Summarize the remaining messages in steps that fit the history budget
+        while start < cut:
+            end, used = start, 0
+            while end < cut and (end == start or used + message_tokens(history[end]) <= self.history_token_budget):
+                used += message_tokens(history[end])
+                end += 1
+            summary = self.summarize(summary, list(history[start:end]), **kwargs)
+            self.summaries.put(hashes[end - 1], summary)
+            start = end
+        return summary
+
+    def compact(self, history: Sequence[BaseMessage], **kwargs) -> List[BaseMessage]:
+        """
+        Compact prior conversation messages (excluding the new query).
+
+        Extra keyword arguments are passed to `summarize`.
+
+        Returns:
+            The recent messages, preceded by a summary message if anything
+            older had to be summarized
+        """
+        if self.history_token_budget <= 0:
+            return list(history)
+
+        cut = self._split_point(history)
+        if cut == 0:
+            return list(history)
+
+        summary = self._summary_for(history, cut, **kwargs)
+        return [SystemMessage(content=SUMMARY_PREFIX + summary)] + list(history[cut:])
+
+    def elide_tool_outputs(self, messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+        """
+        Replace tool outputs of earlier rounds with a placeholder, oldest first,
+        until the messages fit the prompt budget.
+
+        The state is not modified; only the prompt sent to the model is.
+        """
+        messages = list(messages)
+        if self.prompt_token_budget <= 0:
+            return messages
+
+        total = sum(message_tokens(message) for message in messages)
+        if total <= self.prompt_token_budget:
+            return messages
+
+        # Tool messages after the last tool-calling AI message are the latest round
+        last_call = max(
+            (i for i, message in enumerate(messages) if isinstance(message, AIMessage) and message.tool_calls),
+            default=len(messages)
+        )
+        for i, message in enumerate(messages[:last_call]):
+            if total <= self.prompt_token_budget:
+                break
+            if not isinstance(message, ToolMessage):
+                continue
+            placeholder = message.model_copy(update={
+                "content": f"[Earlier {message.name or 'tool'} output elided "
+                           f"(~{message_tokens(message)} tokens); call the tool again if needed]"
+            })
+            total -= message_tokens(message) - message_tokens(placeholder)
+            messages[i] = placeholder
+        return messages
+
+    def stats(self) -> dict:
+        return {
+            "history_token_budget": self.history_token_budget,
+            "prompt_token_budget": self.prompt_token_budget,
+            "summaries": self.summaries.stats(),
+        }
@@ -0,0 +1,231 @@
+"""
+Background Document Ingestion
+
+Parsing, splitting and embedding are CPU-bound and used to run on the event
+loop inside the upload request. They now run in a process pool, orchestrated
+by background threads, so uploads return a job id immediately and chat
+requests keep being served while a large PDF ingests.
+
+Within a job, page windows are parsed and fixed-size chunk batches are embedded
+concurrently across the pool, with a bounded number of tasks in flight, and
+each batch is written to ChromaDB as soon as it is embedded. Memory use stays
+flat regardless of document size.
+
+Progress events of a job can be replayed and followed by any number of
+subscribers (the SSE endpoint in app/api/documents.py).
+"""
+
+import asyncio
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# ==================== Process pool workers ====================
+# These run in worker processes and must stay importable top-level functions.
+
+_worker_embeddings = None
+_worker_reader = None  # ((file path, mtime), PdfReader) of the PDF being parsed
+
+
+def init_worker(embedding_model: str, embeddings_factory: Optional[Callable[..., Any]] = None) -> None:
+    """Load the embedding model once per worker process"""
+    global _worker_embeddings
+    if embeddings_factory is None:
+        from langchain_community.embeddings import FastEmbedEmbeddings
+        embeddings_factory = FastEmbedEmbeddings
+    _worker_embeddings = embeddings_factory(model_name=embedding_model)
+
+
+def _get_pdf_reader(file_path: str):
+    # Page windows of one PDF usually land on the same worker; reuse its parsed xref
+    global _worker_reader
+    key = (file_path, os.path.getmtime(file_path))
+    if _worker_reader is None or _worker_reader[0] != key:
+        from pypdf import PdfReader
+        _worker_reader = (key, PdfReader(file_path))
+    return _worker_reader[1]
+
+
+def count_pages(file_path: str) -> int:
+    """Get the number of pages of a document (text files count as one page)"""
+    if not file_path.lower().endswith('.pdf'):
+        return 1
+    return len(_get_pdf_reader(file_path).pages)
+
+
+def load_and_split_pages(
+    file_path: str,
+    start_page: int,
+    end_page: int,
+    chunk_size: int,
+    chunk_overlap: int
+) -> List[Tuple[Optional[int], str, List[Tuple[str, int]]]]:
+    """
+    Parse pages [start_page, end_page) of a document and split each into chunks.
+
+    Only the requested pages are extracted, so a large PDF is processed as a
+    stream of small page windows instead of being loaded at once.
+
+    Returns:
+        List of (zero-based page number or None, page text,
+        [(chunk text, character offset of the chunk in the page)]) per page
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        add_start_index=True,
+    )
+
+    def split(text: str) -> List[Tuple[str, int]]:
+        return [(doc.page_content, doc.metadata["start_index"]) for doc in splitter.create_documents([text])]
+
+    if not file_path.lower().endswith('.pdf'):
+        from langchain_community.document_loaders import TextLoader
+        text = "".join(doc.page_content for doc in TextLoader(file_path).lazy_load())
+        return [(None, text, split(text))]
+
+    reader = _get_pdf_reader(file_path)
+    pages = []
+    for page in range(start_page, min(end_page, len(reader.pages))):
+        text = reader.pages[page].extract_text()
+        pages.append((page, text, split(text)))
+    return pages
+
+
+def extract_page_texts(file_path: str) -> List[Tuple[int, str]]:
+    """Extract (zero-based page, text) for every page (text files are page 0)"""
+    if not file_path.lower().endswith('.pdf'):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return [(0, f.read())]
+    from pypdf import PdfReader
+    return [(page, reader_page.extract_text()) for page, reader_page in enumerate(PdfReader(file_path).pages)]
+
+
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embed a batch of chunk texts with the worker's model"""
+    return _worker_embeddings.embed_documents(texts)
+
+
+# ==================== Jobs ====================
+
+class IngestionJob:
+    """A document being ingested, with its replayable progress events"""
+
+    def __init__(self, doc_id: str, filename: str):
+        self.id = str(uuid.uuid4())
+        self.doc_id = doc_id
+        self.filename = filename
+        self.status = "queued"  # queued, processing, success, error
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.events: List[Dict[str, Any]] = []
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("success", "error")
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Record a progress event and push it to live subscribers"""
+        with self._lock:
+            self.events.append(event)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Get a queue with all past events followed by new ones (call on the event loop)"""
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            for event in self.events:
+                queue.put_nowait(event)
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s[1] is not queue]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "doc_id": self.doc_id,
+            "filename": self.filename,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "progress": self.events[-1] if self.events else None,
+        }
+
+
+class IngestionManager:
+    """Runs ingestion jobs on background threads and tracks their progress"""
+
+    def __init__(self, max_concurrent_jobs: int = 2, max_finished_jobs: int = 100):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_jobs,
+            thread_name_prefix="ingest"
+        )
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._lock = threading.Lock()
+        self.max_finished_jobs = max_finished_jobs
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    def submit(
+        self,
+        doc_id: str,
+        filename: str,
+        work: Callable[[Callable[[Dict[str, Any]], None]], None],
+        on_done: Optional[Callable[[IngestionJob], None]] = None
+    ) -> IngestionJob:
+        """
+        Queue ingestion work.
+
+        Args:
+            doc_id: Registry id of the document
+            filename: Original filename
+            work: Callable doing the ingestion, given a progress callback
+            on_done: Called with the job once its work succeeded or failed
+                (job.error is set on failure), before the job reports the outcome
+        """
+        job = IngestionJob(doc_id, filename)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.publish({"stage": "queued"})
+        self._executor.submit(self._run, job, work, on_done)
+        return job
+
+    def _run(self, job: IngestionJob, work, on_done) -> None:
+        job.status = "processing"
+        try:
+            work(job.publish)
+        except Exception as e:
+            print(f"Error ingesting {job.filename}: {e}")
+            job.error = str(e) or type(e).__name__
+        if on_done:
+            try:
+                on_done(job)
+            except Exception as e:
+                print(f"Error recording ingestion of {job.filename}: {e}")
+        # Only once on_done has recorded the outcome: clients act on the status and event
+        job.status = "error" if job.error else "success"
+        if job.status == "success":
+            job.publish({"stage": "done"})
+        else:
+            job.publish({"stage": "error", "error": job.error})
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
@@ -0,0 +1,81 @@
+"""
+Model Registry
+
+Compiled agent graphs keyed by (model, temperature), kept in a small LRU.
+
+Changing the settings only swaps which key is the default: graphs are never
+mutated, so requests already running keep the graph they started with, and
+individual requests can pick another model without touching the default.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+
+ModelKey = Tuple[str, float]
+
+
+class ModelRegistry:
+    """LRU of compiled graphs per (model, temperature) with an atomically swappable default"""
+
+    def __init__(
+        self,
+        build: Callable[[str, float], Any],
+        default_model: str,
+        default_temperature: float,
+        max_size: int = 4
+    ):
+        self._build = build
+        self.max_size = max(1, max_size)
+        self._graphs: "OrderedDict[ModelKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._default: ModelKey = self._key(default_model, default_temperature)
+        self.get()
+
+    @staticmethod
+    def _key(model: str, temperature: float) -> ModelKey:
+        return model, round(float(temperature), 3)
+
+    @property
+    def default(self) -> ModelKey:
+        return self._default
+
+    def resolve(self, model: Optional[str] = None, temperature: Optional[float] = None) -> ModelKey:
+        """Fill unset values from the default settings"""
+        # Read the default once so a concurrent swap can't mix two settings
+        default_model, default_temperature = self._default
+        return self._key(
+            model or default_model,
+            default_temperature if temperature is None else temperature
+        )
+
+    def get(self, model: Optional[str] = None, temperature: Optional[float] = None) -> Any:
+        """Get the compiled graph for a model/temperature (the defaults if unset)"""
+        key = self.resolve(model, temperature)
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                self._graphs.move_to_end(key)
+                return graph
+
+        # Build outside the lock so cached lookups never wait on a compile
+        graph = self._build(*key)
+        with self._lock:
+            graph = self._graphs.setdefault(key, graph)
+            self._graphs.move_to_end(key)
+            while len(self._graphs) > self.max_size:
+                self._graphs.popitem(last=False)
+        return graph
+
+    def set_default(self, model: Optional[str] = None, temperature: Optional[float] = None) -> ModelKey:
+        """
+        Make another model/temperature the default.
+
+        The graph is built before the swap, so a failure leaves the current
+        default in place.
+        """
+        key = self.resolve(model, temperature)
+        self.get(*key)
+        self._default = key
+        return key
@@ -0,0 +1,162 @@
+"""
+Persistent Document Registry
+
+SQLite-backed record of every uploaded document, keyed by content hash.
+It survives restarts alongside the ChromaDB collection, so the document list
+stays in sync with the indexed chunks and identical re-uploads can skip embedding.
+
+Page texts extracted at ingest are stored here too, zlib-compressed and keyed by
+(document, page), so the viewer reads only the pages it shows.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import zlib
+from typing import BinaryIO, Dict, List, Optional, Any, Tuple
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def save_and_hash(source: BinaryIO, file_path: str) -> str:
+    """
+    Copy an uploaded file to disk while computing its SHA-256.
+
+    Returns:
+        Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "wb") as buffer:
+        while True:
+            block = source.read(HASH_CHUNK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+            buffer.write(block)
+    return digest.hexdigest()
+
+
+class DocumentRegistry:
+    """
+    Registry of uploaded documents stored in SQLite.
+
+    Each record holds the API-facing metadata (id, filename, status, ...)
+    plus the content hash and on-disk path used for deduplication.
+    """
+
+    COLUMNS = ("id", "filename", "content_hash", "status", "upload_date", "size", "type", "path")
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    upload_date TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    type TEXT NOT NULL,
+                    path TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_documents_hash ON documents (content_hash)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_documents_filename ON documents (filename)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS document_pages (
+                    doc_id TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    text BLOB NOT NULL,
+                    PRIMARY KEY (doc_id, page)
+                ) WITHOUT ROWID
+            """)
+
+    def _fetch_one(self, sql: str, params: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Get a document by id"""
+        return self._fetch_one("SELECT * FROM documents WHERE id = ?", (doc_id,))
+
+    def get_by_hash(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Get an indexed document with the given content hash"""
+        return self._fetch_one(
+            "SELECT * FROM documents WHERE content_hash = ? AND status = 'success' LIMIT 1",
+            (content_hash,)
+        )
+
+    def get_by_filename(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Get the most recent document uploaded under a filename"""
+        return self._fetch_one(
+            "SELECT * FROM documents WHERE filename = ? ORDER BY upload_date DESC LIMIT 1",
+            (filename,)
+        )
+
+    def list(self) -> List[Dict[str, Any]]:
+        """List all documents, oldest first"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM documents ORDER BY upload_date").fetchall()
+        return [dict(row) for row in rows]
+
+    def upsert(self, record: Dict[str, Any]) -> None:
+        """Insert or replace a document record"""
+        values = tuple(record[column] for column in self.COLUMNS)
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO documents ({', '.join(self.COLUMNS)}) VALUES ({placeholders})",
+                values
+            )
+
+    def update_status(self, doc_id: str, status: str) -> None:
+        """Update the processing status of a document"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE documents SET status = ? WHERE id = ?", (status, doc_id))
+
+    def fail_interrupted(self) -> None:
+        """Mark documents left mid-ingestion by a previous run as failed"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE documents SET status = 'error' WHERE status = 'processing'")
+
+    def delete(self, doc_id: str) -> None:
+        """Remove a document record and its stored pages"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+            self._conn.execute("DELETE FROM document_pages WHERE doc_id = ?", (doc_id,))
+
+    # ==================== Page texts ====================
+
+    def add_pages(self, doc_id: str, pages: List[Tuple[int, str]]) -> None:
+        """Store (zero-based page, text) pairs of a document"""
+        rows = [(doc_id, page, zlib.compress(text.encode("utf-8"))) for page, text in pages]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO document_pages VALUES (?, ?, ?)", rows)
+
+    def get_pages(self, doc_id: str, start: int, count: int = 1) -> List[Tuple[int, str]]:
+        """Get up to `count` stored pages starting at zero-based page `start`"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, text FROM document_pages WHERE doc_id = ? AND page >= ? AND page < ? ORDER BY page",
+                (doc_id, start, start + count)
+            ).fetchall()
+        return [(page, zlib.decompress(text).decode("utf-8")) for page, text in rows]
+
+    def page_count(self, doc_id: str) -> int:
+        """Number of stored pages of a document (0 if none were stored)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM document_pages WHERE doc_id = ?", (doc_id,)
+            ).fetchone()[0]
+
+    def delete_pages(self, doc_id: str) -> None:
+        """Remove the stored pages of a document"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM document_pages WHERE doc_id = ?", (doc_id,))
@@ -0,0 +1,211 @@
+"""
+Persistent BM25 Index
+
+Sparse (keyword) index over the chunks stored in ChromaDB, kept in SQLite
+as an inverted index so it survives restarts and is updated incrementally:
+adding a document inserts postings for its chunks only, removing one deletes
+only its postings. Dense embeddings miss exact identifiers and acronyms
+("NT-0042", "401(k)", "PTO"); BM25 catches them, and the two rankings are
+combined with reciprocal rank fusion.
+"""
+
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+TOKEN_PATTERN = re.compile(r"\w+(?:[-.]\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens. Compound identifiers such as "nt-0042" or "3.2"
+    are kept whole and also split into their parts.
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(match)
+        if "-" in match or "." in match:
+            tokens.extend(part for part in re.split(r"[-.]", match) if part)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fuse several rankings of ids into one.
+
+    Each id scores sum(1 / (k + rank)) over the rankings it appears in.
+
+    Returns:
+        (id, fused score) pairs, best first
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """
+    BM25 inverted index stored in SQLite.
+
+    Chunks are identified by their ChromaDB ids and grouped by source filename
+    for removal. Corpus statistics (chunk count, total length) are maintained
+    alongside the postings so scoring never scans the whole index.
+    """
+
+    def __init__(self, db_path: str, k1: float = 1.5, b: float = 0.75):
+        self.db_path = db_path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # The index can always be rebuilt from ChromaDB, so skip fsync on every commit
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    length INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, chunk_id)
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    chunk_count INTEGER NOT NULL,
+                    total_length INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_chunks_source ON chunks (source)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_postings_chunk ON postings (chunk_id)")
+            self._conn.execute("INSERT OR IGNORE INTO stats VALUES (0, 0, 0)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT chunk_count FROM stats").fetchone()[0]
+
+    def _delete_chunks(self, chunk_ids: Sequence[str]) -> None:
+        # Caller holds the lock and the transaction
+        for start in range(0, len(chunk_ids), 500):
+            batch = chunk_ids[start:start + 500]
+            placeholders = ", ".join("?" for _ in batch)
+            removed = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(length), 0) FROM chunks WHERE id IN ({placeholders})",
+                batch
+            ).fetchone()
+            if not removed[0]:
+                continue
+            self._conn.execute(f"DELETE FROM postings WHERE chunk_id IN ({placeholders})", batch)
+            self._conn.execute(f"DELETE FROM chunks WHERE id IN ({placeholders})", batch)
+            self._conn.execute(
+                "UPDATE stats SET chunk_count = chunk_count - ?, total_length = total_length - ?",
+                removed
+            )
+
+    def add(self, chunk_ids: Sequence[str], texts: Sequence[str], sources: Sequence[str]) -> None:
+        """Index chunks, replacing any already indexed under the same ids"""
+        rows = []
+        postings = []
+        total_length = 0
+        for chunk_id, text, source in zip(chunk_ids, texts, sources):
+            terms = Counter(tokenize(text))
+            length = sum(terms.values())
+            total_length += length
+            rows.append((chunk_id, source, length))
+            postings.extend((term, chunk_id, tf) for term, tf in terms.items())
+
+        with self._lock, self._conn:
+            self._delete_chunks(list(chunk_ids))
+            self._conn.executemany("INSERT INTO chunks VALUES (?, ?, ?)", rows)
+            self._conn.executemany("INSERT INTO postings VALUES (?, ?, ?)", postings)
+            self._conn.execute(
+                "UPDATE stats SET chunk_count = chunk_count + ?, total_length = total_length + ?",
+                (len(rows), total_length)
+            )
+
+    def remove(self, chunk_ids: Sequence[str]) -> None:
+        """Remove chunks by id"""
+        with self._lock, self._conn:
+            self._delete_chunks(list(chunk_ids))
+
+    def remove_source(self, source: str) -> None:
+        """Remove all chunks of a document"""
+        with self._lock, self._conn:
+            chunk_ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM chunks WHERE source = ?", (source,)
+            )]
+            self._delete_chunks(chunk_ids)
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("UPDATE stats SET chunk_count = 0, total_length = 0")
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """
+        Rank chunks against a query.
+
+        Returns:
+            Up to k (chunk id, BM25 score) pairs, best first
+        """
+        terms = set(tokenize(query))
+        scores: Dict[str, float] = {}
+        with self._lock:
+            chunk_count, total_length = self._conn.execute(
+                "SELECT chunk_count, total_length FROM stats"
+            ).fetchone()
+            if not chunk_count or not terms:
+                return []
+            avg_length = total_length / chunk_count
+
+            for term in terms:
+                postings = self._conn.execute(
+                    "SELECT p.chunk_id, p.tf, c.length FROM postings p "
+                    "JOIN chunks c ON c.id = p.chunk_id WHERE p.term = ?",
+                    (term,)
+                ).fetchall()
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (chunk_count - df + 0.5) / (df + 0.5))
+                for chunk_id, tf, length in postings:
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def rebuild(self, chunks: Iterable[Tuple[str, str, str]], batch_size: int = 500) -> int:
+        """
+        Re-index everything from (chunk id, text, source) triples.
+
+        Returns:
+            Number of chunks indexed
+        """
+        self.clear()
+        count = 0
+        batch: List[Tuple[str, str, str]] = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                self.add(*zip(*batch))
+                count += len(batch)
+                batch = []
+        if batch:
+            self.add(*zip(*batch))
+            count += len(batch)
+        return count
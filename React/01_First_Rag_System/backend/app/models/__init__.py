@@ -4,6 +4,7 @@ from .schemas import (
     ChatResponse,
     SourceCitation,
     DocumentResponse,
+    IngestionJobResponse,
     SettingsRequest,
     SettingsResponse,
 )
@@ -14,6 +15,7 @@ __all__ = [
     "ChatResponse",
     "SourceCitation",
     "DocumentResponse",
+    "IngestionJobResponse",
     "SettingsRequest",
     "SettingsResponse",
 ]
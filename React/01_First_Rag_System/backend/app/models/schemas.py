@@ -2,7 +2,7 @@
 Pydantic Models/Schemas for API
 """
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
 
@@ -16,6 +16,7 @@ class SourceCitation(BaseModel):
     excerpt: str  # Text excerpt that was used
     relevance_score: float  # How relevant this source was
     highlight_text: str  # Full text for highlighting in viewer
+    start_index: Optional[int] = None  # Offset of the text in its page
 
 
 # ==================== Chat Models ====================
@@ -30,6 +31,9 @@ class ChatRequest(BaseModel):
     """Request body for chat endpoint"""
     messages: List[ChatMessage]
     stream: Optional[bool] = False
+    retrieval_mode: Optional[Literal["dense", "sparse", "hybrid"]] = None  # Server default if unset
+    model: Optional[str] = None  # Overrides the model for this request only
+    temperature: Optional[float] = None  # Overrides the temperature for this request only
 
 
 class ChatResponse(BaseModel):
@@ -50,6 +54,18 @@ class DocumentResponse(BaseModel):
     upload_date: str
     size: int
     type: str
+    job_id: Optional[str] = None  # Set while the document is being ingested
+
+
+class IngestionJobResponse(BaseModel):
+    """Status of a background ingestion job"""
+    id: str
+    doc_id: str
+    filename: str
+    status: str
+    error: Optional[str] = None
+    created_at: str
+    progress: Optional[dict] = None
 
 
 class DocumentDeleteResponse(BaseModel):
@@ -65,9 +81,27 @@ class SettingsRequest(BaseModel):
     temperature: Optional[float] = None
 
 
+class CacheStats(BaseModel):
+    """Hit/miss counters of a single cache"""
+    hits: int
+    misses: int
+    hit_rate: float
+    size: int
+    max_size: int
+
+
+class RetrievalCacheStats(BaseModel):
+    """Statistics of the search_documents caches"""
+    collection_version: int
+    query_embeddings: CacheStats
+    search_results: CacheStats
+
+
 class SettingsResponse(BaseModel):
     """Response from settings endpoint"""
     model: str
     temperature: float
     chroma_path: str
+    retrieval_mode: str
     document_count: int
+    cache: Optional[RetrievalCacheStats] = None
@@ -0,0 +1,332 @@
+"""
+Retrieval quality and latency benchmark for the RAG backends.
+
+Generates a corpus (the handbook from create_test_document.py, with its
+question/answer-span pairs, plus synthetic distractor pages) and runs each
+backend's own ingestion and retrieval code offline, with the hashing stand-in
+embedding model and fake LLMs from benchmarks/offline.py:
+
+    neuralrag   app.core.agent.RAGAgent, in dense, sparse and hybrid mode
+    legacy      rag_agent.py
+    hybrid      05_Hybrid_RAG_System (dense + BM25 ensemble, LLM rerank)
+    hyde        07_HyDE RAG (hypothetical document, dense search)
+
+The fake reranker scores documents by word overlap with the query, and the
+fake HyDE generator returns the question itself (the pipeline's own fallback).
+
+For every retriever it reports recall@k and MRR (a hit is a result containing
+the answer span), ingest throughput, and p50/p95 query latency, as a JSON
+report for regression tracking. Each backend runs in its own process because
+the 05/07 backends both use top-level `config` and `services` modules.
+
+Usage (from the backend directory):
+    python -m benchmarks.backend_suite --output benchmark_report.json
+    python -m benchmarks.backend_suite --backends neuralrag hyde --distractor-pages 0
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REACT_DIR = os.path.dirname(os.path.dirname(BACKEND_DIR))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.offline import FakeChatModel, HashingEmbeddings, WORD_PATTERN
+
+
+BACKENDS = ("neuralrag", "legacy", "hybrid", "hyde")
+KS = (1, 3, 5)
+
+# A retriever maps (question, k) to the texts of its top-k results
+Retriever = Callable[[str, int], List[str]]
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def evaluate(search: Retriever, qa_pairs: List[Tuple[str, str]], repeats: int = 3) -> dict:
+    """Recall@k, MRR (over the top max(KS) results) and query latency of a retriever"""
+    depth = max(KS)
+    hits = {k: 0 for k in KS}
+    reciprocal_ranks = 0.0
+    latencies = []
+    for question, answer in qa_pairs:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            texts = search(question, depth)[:depth]
+            latencies.append((time.perf_counter() - started) * 1000)
+        rank = next(
+            (i for i, text in enumerate(texts, start=1) if normalize(answer) in normalize(text)),
+            None
+        )
+        if rank is not None:
+            reciprocal_ranks += 1 / rank
+            for k in KS:
+                hits[k] += rank <= k
+    return {
+        **{f"recall@{k}": round(hits[k] / len(qa_pairs), 3) for k in KS},
+        "mrr": round(reciprocal_ranks / len(qa_pairs), 3),
+        "p50_ms": round(percentile(latencies, 0.5), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+    }
+
+
+# ==================== Fake LLM replies ====================
+
+def _words(text: str) -> set:
+    return set(WORD_PATTERN.findall(text.lower()))
+
+
+def rerank_reply(prompt: str) -> str:
+    """Scores (1-10) for the 05 reranker prompt: share of query words in each document"""
+    match = re.search(r"Query: (.*?)\n\nDocuments:\n(.*)\n\nReturn ONLY", prompt, re.S)
+    query, documents = match.group(1), match.group(2)
+    query_words = _words(query) or {""}
+    scores = [
+        1 + round(9 * len(query_words & _words(doc)) / len(query_words))
+        for doc in re.split(r"\[Doc \d+\]: ", documents)[1:]
+    ]
+    return ",".join(str(score) for score in scores)
+
+
+def hyde_reply(prompt: str) -> str:
+    """Hypothetical passage for the 07 HyDE prompt: the question itself"""
+    match = re.search(r"Question: (.*?)\n\nHypothetical answer passage:", prompt, re.S)
+    return match.group(1) if match else prompt
+
+
+# ==================== Backends ====================
+# Each returns (ingest stats, {retriever label: retriever})
+
+def run_neuralrag(paths: List[str], work_dir: str, llm_latency_ms: float):
+    from app.core.agent import RAGAgent, RETRIEVAL_MODES
+
+    agent = RAGAgent(
+        chroma_dir=os.path.join(work_dir, "chroma"),
+        ingest_workers=1,
+        embeddings_factory=HashingEmbeddings,
+        # Measure retrieval itself, not the result caches
+        query_embedding_cache_size=0,
+        search_cache_size=0,
+    )
+    try:
+        chunks = sum(agent.ingest_document(path, os.path.basename(path)) for path in paths)
+    finally:
+        if agent._ingest_pool is not None:
+            agent._ingest_pool.shutdown()
+
+    def retriever(mode: str) -> Retriever:
+        return lambda question, k: [doc.page_content for doc, _ in agent.search(question, k=k, mode=mode)]
+
+    return {"chunks": chunks}, {f"neuralrag-{mode}": retriever(mode) for mode in RETRIEVAL_MODES}
+
+
+def run_legacy(paths: List[str], work_dir: str, llm_latency_ms: float):
+    import rag_agent
+
+    # The legacy module hard-codes its embedding model and Chroma directory
+    rag_agent.FastEmbedEmbeddings = HashingEmbeddings
+    rag_agent.CHROMA_PERSIST_DIR = os.path.join(work_dir, "chroma")
+    agent = rag_agent.RAGAgent()
+    for path in paths:
+        asyncio.run(agent.add_document(path, os.path.basename(path)))
+    chunks = agent.vectorstore._collection.count()
+
+    def search(question: str, k: int) -> List[str]:
+        return [doc.page_content for doc, _ in agent.vectorstore.similarity_search_with_score(question, k=k)]
+
+    return {"chunks": chunks}, {"legacy": search}
+
+
+def _load_project_documents(paths: List[str]):
+    """Extract and chunk files the way the 05/07 upload route does"""
+    from langchain_core.documents import Document
+    from services.document import chunk_text, extract_text_from_pdf
+
+    documents = []
+    for path in paths:
+        if path.lower().endswith(".pdf"):
+            text = extract_text_from_pdf(path)
+        else:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                text = f.read()
+        documents += [
+            Document(page_content=chunk, metadata={"source": os.path.basename(path)})
+            for chunk in chunk_text(text)
+        ]
+    return documents
+
+
+def _quiet(fn):
+    """The 05/07 pipelines print every retrieved chunk; keep the report readable"""
+    def wrapper(*args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def run_hybrid(paths: List[str], work_dir: str, llm_latency_ms: float):
+    backend_dir = os.path.join(REACT_DIR, "05_Hybrid_RAG_System", "backend")
+    sys.path.insert(0, backend_dir)
+    from services.rag_manager import RAGManager
+
+    documents = _load_project_documents(paths)
+    manager = RAGManager(
+        documents,
+        persist_dir=os.path.join(work_dir, "chroma"),
+        embedding=HashingEmbeddings(),
+        reranker_llm=FakeChatModel(respond=rerank_reply, latency_ms=llm_latency_ms),
+    )
+
+    @_quiet
+    def search(question: str, k: int) -> List[str]:
+        return [doc.page_content for doc in manager.run_query(question)][:k]
+
+    return {"chunks": len(documents)}, {"hybrid": search}
+
+
+def run_hyde(paths: List[str], work_dir: str, llm_latency_ms: float):
+    backend_dir = os.path.join(REACT_DIR, "07_HyDE RAG", "backend")
+    sys.path.insert(0, backend_dir)
+    from services.rag_manager import RAGManager
+
+    documents = _load_project_documents(paths)
+    manager = RAGManager(
+        documents,
+        persist_dir=os.path.join(work_dir, "chroma"),
+        embedding=HashingEmbeddings(),
+        hyde_llm=FakeChatModel(respond=hyde_reply, latency_ms=llm_latency_ms),
+    )
+
+    @_quiet
+    def search(question: str, k: int) -> List[str]:
+        return [doc.page_content for doc in manager.run_query(question)["final_results"]][:k]
+
+    return {"chunks": len(documents)}, {"hyde": search}
+
+
+RUNNERS = {
+    "neuralrag": run_neuralrag,
+    "legacy": run_legacy,
+    "hybrid": run_hybrid,
+    "hyde": run_hyde,
+}
+
+
+def run_backend(name: str, corpus: dict, work_dir: str, repeats: int, llm_latency_ms: float) -> dict:
+    """Ingest the corpus into one backend and evaluate its retrievers (runs in a child process)"""
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        ingest, retrievers = RUNNERS[name](corpus["paths"], work_dir, llm_latency_ms)
+    seconds = time.perf_counter() - started
+    ingest.update({
+        "seconds": round(seconds, 2),
+        "pages_per_s": round(corpus["pages"] / seconds, 1),
+        "chunks_per_s": round(ingest["chunks"] / seconds, 1),
+    })
+    qa_pairs = [(pair["question"], pair["answer"]) for pair in corpus["qa"]]
+    return {
+        "status": "ok",
+        "ingest": ingest,
+        "retrieval": {label: evaluate(search, qa_pairs, repeats) for label, search in retrievers.items()},
+    }
+
+
+def build_corpus(work_dir: str, distractor_pages: int) -> dict:
+    from pypdf import PdfReader
+    from create_test_document import create_test_document
+    from benchmarks.ingest_benchmark import create_corpus
+
+    with contextlib.redirect_stdout(sys.stderr):
+        handbook = create_test_document(work_dir)
+    with open(os.path.splitext(handbook)[0] + "_qa.json", encoding="utf-8") as f:
+        qa = json.load(f)
+
+    paths = [handbook]
+    if distractor_pages:
+        paths += create_corpus(work_dir, distractor_pages)
+    pages = sum(len(PdfReader(path).pages) for path in paths)
+    return {"paths": paths, "pages": pages, "qa": qa}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--distractor-pages", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per question")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated latency of each fake LLM call")
+    parser.add_argument("--output", help="Write the JSON report to this file as well")
+    # Internal: run one backend in this process
+    parser.add_argument("--run-backend", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_backend:
+        with open(args.corpus, encoding="utf-8") as f:
+            corpus = json.load(f)
+        work_dir = os.path.join(os.path.dirname(args.result), args.run_backend)
+        result = run_backend(args.run_backend, corpus, work_dir, args.repeats, args.llm_latency_ms)
+        with open(args.result, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="backend_suite_")
+    try:
+        corpus = build_corpus(work_dir, args.distractor_pages)
+        corpus_path = os.path.join(work_dir, "corpus.json")
+        with open(corpus_path, "w", encoding="utf-8") as f:
+            json.dump(corpus, f)
+
+        report: Dict[str, dict] = {
+            "corpus": {
+                "files": len(corpus["paths"]),
+                "pages": corpus["pages"],
+                "questions": len(corpus["qa"]),
+            },
+            "settings": {"repeats": args.repeats, "llm_latency_ms": args.llm_latency_ms, "ks": list(KS)},
+            "backends": {},
+        }
+        for name in args.backends:
+            result_path = os.path.join(work_dir, f"{name}.json")
+            process = subprocess.run(
+                [sys.executable, "-m", "benchmarks.backend_suite", "--run-backend", name,
+                 "--corpus", corpus_path, "--result", result_path,
+                 "--repeats", str(args.repeats), "--llm-latency-ms", str(args.llm_latency_ms)],
+                cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+            )
+            if process.returncode == 0:
+                with open(result_path, encoding="utf-8") as f:
+                    report["backends"][name] = json.load(f)
+            else:
+                error = process.stderr.strip().splitlines()
+                report["backends"][name] = {"status": "error", "error": error[-1] if error else "failed"}
+
+        output = json.dumps(report, indent=2)
+        print(output)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(output + "\n")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
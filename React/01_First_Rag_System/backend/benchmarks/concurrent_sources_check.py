@@ -0,0 +1,95 @@
+"""
+Concurrent chat check: every response must cite the sources of its own search.
+
+Ingests the generated handbook, then sends --chats different questions to
+RAGAgent.query at once. The chat model is simulated (benchmarks/offline.py):
+it searches once for its question, with random delays so the runs interleave,
+then answers "Answer to: <question>". Each response's sources are compared
+with a direct search for that response's own question.
+
+Exits with status 1 if any response got another question's answer or sources.
+
+Usage (from the backend directory):
+    python -m benchmarks.concurrent_sources_check --chats 50 --workers 16
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.offline import HashingEmbeddings, SearchingChatModel
+from create_test_document import QA_PAIRS
+
+
+def answer_to(question: str) -> str:
+    return f"Answer to: {question}"
+
+
+async def run_chats(agent, questions: list) -> list:
+    return await asyncio.gather(*(agent.query(question) for question in questions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=16, help="chat_workers of the agent")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    from create_test_document import create_test_document
+    from app.core.agent import RAGAgent
+
+    class CheckAgent(RAGAgent):
+        def _create_llm(self, model: str, temperature: float):
+            return SearchingChatModel(respond=answer_to, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+
+    work_dir = tempfile.mkdtemp(prefix="sources_check_")
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            handbook = create_test_document(work_dir)
+        agent = CheckAgent(
+            model="simulated",
+            chroma_dir=os.path.join(work_dir, "chroma"),
+            ingest_workers=1,
+            chat_workers=args.workers,
+            embeddings_factory=HashingEmbeddings,
+        )
+        agent.ingest_document(handbook, os.path.basename(handbook))
+        agent._ingest_pool.shutdown()
+
+        questions = [
+            f"{QA_PAIRS[i % len(QA_PAIRS)][0]} (chat {i})" for i in range(args.chats)
+        ]
+        # What each chat's own search returns, asked one at a time
+        expected = [
+            [doc.page_content for doc, _ in agent.search(question, k=3)] for question in questions
+        ]
+        results = asyncio.run(run_chats(agent, questions))
+
+        mismatched = [
+            question
+            for question, want, (answer, sources) in zip(questions, expected, results)
+            if answer != answer_to(question) or [s["full_content"] for s in sources] != want
+        ]
+        print(json.dumps({
+            "chats": args.chats,
+            "workers": args.workers,
+            "mismatched": len(mismatched),
+            "examples": mismatched[:5],
+        }, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    sys.exit(1 if mismatched else 0)
+
+
+if __name__ == "__main__":
+    main()
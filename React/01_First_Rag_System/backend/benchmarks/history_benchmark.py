@@ -0,0 +1,145 @@
+"""
+Long-conversation benchmark for history compaction.
+
+Replays a scripted 50-turn conversation about the generated handbook, sending
+the full history with every turn as the frontend does, with compaction
+disabled and enabled. Reports the prompt tokens (estimated, summed over all
+LLM calls of the turn) and latency of every turn.
+
+By default the LLM is simulated: it searches once per question, then answers,
+with latency proportional to prompt and answer length, so the benchmark runs
+without Ollama. Pass --model to use a real Ollama model instead.
+
+Usage (from the backend directory):
+    python -m benchmarks.history_benchmark --turns 50
+    python -m benchmarks.history_benchmark --turns 20 --model llama3.2:1b
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.core.history import message_tokens
+from create_test_document import QA_PAIRS
+
+
+class PromptRecorder(BaseCallbackHandler):
+    """Records the estimated prompt tokens of every chat model call"""
+
+    def __init__(self):
+        self.calls: List[int] = []
+
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        self.calls.append(sum(message_tokens(message) for message in messages[0]))
+
+
+class SimulatedChatModel(BaseChatModel):
+    """Searches once per question, then answers; latency grows with prompt length"""
+
+    prefill_ms_per_token: float = 0.5
+    decode_ms_per_token: float = 2.0
+    answer_words: int = 120
+
+    @property
+    def _llm_type(self) -> str:
+        return "simulated"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt_tokens = sum(message_tokens(message) for message in messages)
+        last = messages[-1]
+        if isinstance(last, HumanMessage) and last.content.startswith("Update the summary"):
+            message = AIMessage(content=" ".join(["summary"] * 100))
+        elif isinstance(last, ToolMessage):
+            message = AIMessage(content=" ".join(["answer"] * self.answer_words))
+        else:
+            message = AIMessage(content="", tool_calls=[{
+                "name": "search_documents", "args": {"query": last.content}, "id": f"call_{len(messages)}"
+            }])
+        output_tokens = len(message.content.split()) or 10
+        time.sleep((prompt_tokens * self.prefill_ms_per_token + output_tokens * self.decode_ms_per_token) / 1000)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def run_conversation(agent, recorder: PromptRecorder, turns: int) -> List[dict]:
+    history = []
+    results = []
+    for turn in range(turns):
+        question = QA_PAIRS[turn % len(QA_PAIRS)][0]
+        recorder.calls.clear()
+        started = time.perf_counter()
+        answer, _ = asyncio.run(agent.query(question, history))
+        results.append({
+            "turn": turn + 1,
+            "prompt_tokens": sum(recorder.calls),
+            "llm_calls": len(recorder.calls),
+            "latency_ms": round((time.perf_counter() - started) * 1000),
+        })
+        history += [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--model", help="Ollama model (default: simulated LLM)")
+    parser.add_argument("--history-budget", type=int, default=2000)
+    parser.add_argument("--prompt-budget", type=int, default=6000)
+    args = parser.parse_args()
+
+    from create_test_document import create_test_document
+    from app.core.agent import RAGAgent
+
+    recorder = PromptRecorder()
+
+    class BenchmarkAgent(RAGAgent):
+        def _create_llm(self, model: str, temperature: float):
+            llm = super()._create_llm(model, temperature) if args.model else SimulatedChatModel()
+            llm.callbacks = [recorder]
+            return llm
+
+    work_dir = tempfile.mkdtemp(prefix="history_bench_")
+    try:
+        handbook = create_test_document(work_dir)
+        report = {"turns": args.turns, "model": args.model or "simulated"}
+        for label, budgets in (("full_history", (0, 0)), ("compacted", (args.history_budget, args.prompt_budget))):
+            agent = BenchmarkAgent(
+                model=args.model or "simulated",
+                chroma_dir=os.path.join(work_dir, f"chroma_{label}"),
+                ingest_workers=1,
+                history_token_budget=budgets[0],
+                prompt_token_budget=budgets[1],
+            )
+            agent.ingest_document(handbook, os.path.basename(handbook))
+            agent._ingest_pool.shutdown()
+
+            per_turn = run_conversation(agent, recorder, args.turns)
+            report[label] = {
+                "total_prompt_tokens": sum(t["prompt_tokens"] for t in per_turn),
+                "total_seconds": round(sum(t["latency_ms"] for t in per_turn) / 1000, 1),
+                "last_turn": per_turn[-1],
+                "summary_cache": agent.history.summaries.stats(),
+                "per_turn": per_turn,
+            }
+        print(json.dumps(report, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
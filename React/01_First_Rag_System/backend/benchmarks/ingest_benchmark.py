@@ -0,0 +1,97 @@
+"""
+Ingestion throughput benchmark.
+
+Generates a synthetic PDF corpus, ingests it with RAGAgent.ingest_document and
+reports chunks/sec and peak RSS (main process and worker processes).
+
+Usage (from the backend directory):
+    python -m benchmarks.ingest_benchmark --pages 1000 --workers 2
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def create_corpus(output_dir: str, pages: int, pages_per_file: int = 100) -> list:
+    """Write synthetic handbook-like PDFs totalling `pages` pages"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    paths = []
+    for file_index in range(0, pages, pages_per_file):
+        path = os.path.join(output_dir, f"corpus_{file_index // pages_per_file:03d}.pdf")
+        pdf = canvas.Canvas(path, pagesize=letter)
+        for page in range(file_index, min(file_index + pages_per_file, pages)):
+            y = 740
+            for line in range(40):
+                pdf.drawString(
+                    54, y,
+                    f"Section {page}.{line}: policy NT-{page:04d}-{line:02d} covers travel, "
+                    f"expenses and security for team {line % 7}."
+                )
+                y -= 17
+            pdf.showPage()
+        pdf.save()
+        paths.append(path)
+    return paths
+
+
+def peak_rss_mb(who: int) -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--pages-per-file", type=int, default=100)
+    args = parser.parse_args()
+
+    from app.core.agent import RAGAgent
+
+    work_dir = tempfile.mkdtemp(prefix="ingest_bench_")
+    try:
+        paths = create_corpus(work_dir, args.pages, args.pages_per_file)
+        agent = RAGAgent(
+            chroma_dir=os.path.join(work_dir, "chroma"),
+            ingest_workers=args.workers,
+            embed_batch_size=args.batch_size,
+        )
+
+        start = time.perf_counter()
+        chunks = 0
+        for path in paths:
+            chunks += agent.ingest_document(path, os.path.basename(path))
+        elapsed = time.perf_counter() - start
+
+        # Reap the worker processes so their peak RSS is reported
+        if agent._ingest_pool is not None:
+            agent._ingest_pool.shutdown()
+
+        print(json.dumps({
+            "pages": args.pages,
+            "files": len(paths),
+            "workers": args.workers,
+            "batch_size": args.batch_size,
+            "chunks": chunks,
+            "seconds": round(elapsed, 2),
+            "chunks_per_sec": round(chunks / elapsed, 1),
+            "peak_rss_main_mb": round(peak_rss_mb(resource.RUSAGE_SELF), 1),
+            "peak_rss_worker_mb": round(peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+        }, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Offline stand-ins for the embedding model and chat LLM.
+
+They let the benchmarks exercise every backend's real ingestion and retrieval
+code without model downloads, Ollama or API keys. Retrieval quality measured
+with them reflects lexical overlap, not the production models: compare runs
+against each other, not against numbers from the real models.
+"""
+
+import math
+import random
+import re
+import time
+import zlib
+from typing import Callable, List
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Feature-hashed bag-of-words vectors (signed hashing, sublinear term
+    frequency, L2-normalized). Deterministic across processes, so it can be
+    passed as `embeddings_factory` to the ingestion workers.
+    """
+
+    def __init__(self, model_name: str = "hashing", dimensions: int = 384):
+        self.model_name = model_name
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        counts = {}
+        for word in WORD_PATTERN.findall(text.lower()):
+            counts[word] = counts.get(word, 0) + 1
+
+        vector = [0.0] * self.dimensions
+        for word, count in counts.items():
+            digest = zlib.crc32(word.encode("utf-8"))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dimensions] += sign * (1.0 + math.log(count))
+
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model whose reply is computed from the prompt text by `respond`"""
+
+    respond: Callable[[str], str]
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        prompt = "\n".join(str(message.content) for message in messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.respond(prompt)))])
+
+
+class SearchingChatModel(FakeChatModel):
+    """
+    Tool-calling chat model: searches the knowledge base once for the user's
+    question, then replies with `respond(question)`. Every call waits
+    `latency_ms` plus up to `jitter_ms`, so concurrent runs interleave.
+    """
+
+    jitter_ms: float = 0.0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep((self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000)
+        question = [message for message in messages if isinstance(message, HumanMessage)][-1].content
+        if isinstance(messages[-1], ToolMessage):
+            message = AIMessage(content=self.respond(question))
+        else:
+            message = AIMessage(content="", tool_calls=[{
+                "name": "search_documents", "args": {"query": question}, "id": f"call_{len(messages)}"
+            }])
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,96 @@
+"""
+Retrieval quality evaluation: recall@k and MRR per retrieval mode.
+
+Ingests the handbook generated by create_test_document.py (optionally
+alongside synthetic distractor pages) and checks, for each question, whether
+a chunk containing the expected evidence is among the top-k results of the
+dense, sparse (BM25) and hybrid (RRF) retrievers.
+
+Usage (from the backend directory):
+    python -m benchmarks.retrieval_eval --chunk-size 300 --distractor-pages 50
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ingest_benchmark import create_corpus
+from create_test_document import QA_PAIRS
+
+
+MODES = ("dense", "sparse", "hybrid")
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def evaluate(agent, ks=(1, 3, 5)) -> dict:
+    """Recall@k and MRR (over the top max(ks) results) for every mode"""
+    depth = max(ks)
+    report = {}
+    for mode in MODES:
+        hits = {k: 0 for k in ks}
+        reciprocal_ranks = 0.0
+        for question, evidence in QA_PAIRS:
+            results = agent.search(question, k=depth, mode=mode)
+            rank = next(
+                (i for i, (doc, _) in enumerate(results, start=1)
+                 if normalize(evidence) in normalize(doc.page_content)),
+                None
+            )
+            if rank is not None:
+                reciprocal_ranks += 1 / rank
+                for k in ks:
+                    hits[k] += rank <= k
+        report[mode] = {
+            **{f"recall@{k}": round(hits[k] / len(QA_PAIRS), 3) for k in ks},
+            "mrr": round(reciprocal_ranks / len(QA_PAIRS), 3),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=300)
+    parser.add_argument("--chunk-overlap", type=int, default=50)
+    parser.add_argument("--distractor-pages", type=int, default=50)
+    args = parser.parse_args()
+
+    from create_test_document import create_test_document
+    from app.core.agent import RAGAgent
+
+    work_dir = tempfile.mkdtemp(prefix="retrieval_eval_")
+    try:
+        handbook = create_test_document(work_dir)
+        paths = [handbook]
+        if args.distractor_pages:
+            paths += create_corpus(work_dir, args.distractor_pages)
+
+        agent = RAGAgent(
+            chroma_dir=os.path.join(work_dir, "chroma"),
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            ingest_workers=1,
+        )
+        chunks = sum(agent.ingest_document(path, os.path.basename(path)) for path in paths)
+        agent._ingest_pool.shutdown()
+
+        print(json.dumps({
+            "questions": len(QA_PAIRS),
+            "chunks": chunks,
+            "chunk_size": args.chunk_size,
+            "results": evaluate(agent),
+        }, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
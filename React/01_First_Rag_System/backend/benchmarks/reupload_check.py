@@ -0,0 +1,117 @@
+"""
+Identical re-upload check: a document that is already indexed is not ingested again.
+
+Uploads a synthetic --pages page PDF through POST /api/documents/upload and
+waits for its ingestion job, then uploads the same bytes again. The second
+upload must return the existing record (same id, no ingestion job) within
+--max-ms, and leave the number of indexed chunks unchanged. Embeddings are
+the offline hashing stand-in (benchmarks/offline.py).
+
+Exits with status 1 if the re-upload was ingested again or took too long.
+
+Usage (from the backend directory):
+    python -m benchmarks.reupload_check --pages 200 --max-ms 250
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ingest_benchmark import create_corpus
+from benchmarks.offline import HashingEmbeddings
+
+
+def upload(client, path: str):
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        response = client.post(
+            "/api/documents/upload",
+            files={"file": (os.path.basename(path), f, "application/pdf")},
+        )
+    response.raise_for_status()
+    return response.json(), (time.perf_counter() - started) * 1000
+
+
+def wait_for_job(client, job_id: str) -> dict:
+    while True:
+        job = client.get(f"/api/documents/jobs/{job_id}").json()
+        if job["status"] in ("success", "error"):
+            return job
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--max-ms", type=float, default=250.0, help="limit for the identical re-upload")
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    from app.api.deps import get_document_registry, get_ingestion_manager, get_rag_agent
+    from app.config import get_settings
+    from app.core.agent import RAGAgent
+    from app.core.ingestion import IngestionManager
+    from app.core.registry import DocumentRegistry
+    from app.main import app
+
+    work_dir = tempfile.mkdtemp(prefix="reupload_check_")
+    try:
+        get_settings().UPLOAD_DIR = os.path.join(work_dir, "uploads")
+        os.makedirs(get_settings().UPLOAD_DIR)
+        pdf = create_corpus(work_dir, args.pages, pages_per_file=args.pages)[0]
+
+        agent = RAGAgent(
+            chroma_dir=os.path.join(work_dir, "chroma"),
+            embeddings_factory=HashingEmbeddings,
+        )
+        registry = DocumentRegistry(os.path.join(work_dir, "documents.db"))
+        ingestion = IngestionManager()
+        app.dependency_overrides = {
+            get_rag_agent: lambda: agent,
+            get_document_registry: lambda: registry,
+            get_ingestion_manager: lambda: ingestion,
+        }
+
+        with TestClient(app) as client:
+            started = time.perf_counter()
+            first, _ = upload(client, pdf)
+            job = wait_for_job(client, first["job_id"])
+            first_seconds = time.perf_counter() - started
+            chunks = agent.vectorstore._collection.count()
+
+            second, second_ms = upload(client, pdf)
+            chunks_after = agent.vectorstore._collection.count()
+        agent._ingest_pool.shutdown()
+
+        failures = []
+        if job["status"] != "success":
+            failures.append(f"first upload failed: {job['error']}")
+        if second["id"] != first["id"] or second.get("job_id"):
+            failures.append("identical re-upload started a new ingestion")
+        if chunks_after != chunks:
+            failures.append(f"chunk count changed from {chunks} to {chunks_after}")
+        if second_ms > args.max_ms:
+            failures.append(f"identical re-upload took {second_ms:.0f} ms (limit {args.max_ms:.0f} ms)")
+
+        print(json.dumps({
+            "pages": args.pages,
+            "chunks": chunks,
+            "first_upload_s": round(first_seconds, 2),
+            "reupload_ms": round(second_ms, 1),
+            "failures": failures,
+        }, indent=2))
+    finally:
+        app.dependency_overrides = {}
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
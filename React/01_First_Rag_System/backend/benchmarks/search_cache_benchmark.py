@@ -0,0 +1,102 @@
+"""
+Repeated-question benchmark for the search_documents caches.
+
+Ingests a synthetic corpus, then replays a skewed workload of repeated
+questions (with case/whitespace variations, as different users type them)
+through the search_documents tool, with and without the retrieval caches.
+A document upload halfway through invalidates cached results.
+
+Usage (from the backend directory):
+    python -m benchmarks.search_cache_benchmark --queries 2000 --questions 50
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ingest_benchmark import create_corpus
+
+
+def make_workload(queries: int, questions: int, seed: int = 7) -> list:
+    """Zipf-like mix of questions, each typed in a few different ways"""
+    rng = random.Random(seed)
+    base = [
+        f"What does policy NT-{i * 7:04d}-{i % 40:02d} say about travel for team {i % 7}?"
+        for i in range(questions)
+    ]
+    weights = [1 / (rank + 1) for rank in range(questions)]
+    workload = []
+    for question in rng.choices(base, weights=weights, k=queries):
+        variant = rng.randrange(3)
+        if variant == 1:
+            question = question.lower()
+        elif variant == 2:
+            question = "  " + question.replace(" ", "  ")
+        workload.append(question)
+    return workload
+
+
+def run(agent, workload: list, upload_path: str) -> dict:
+    search = agent.tools[0]
+    latencies = []
+    start = time.perf_counter()
+    for i, query in enumerate(workload):
+        if i == len(workload) // 2:
+            agent.ingest_document(upload_path, os.path.basename(upload_path))
+        started = time.perf_counter()
+        search.invoke({"query": query})
+        latencies.append((time.perf_counter() - started) * 1000)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "seconds": round(elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)], 2),
+        "cache": agent.retrieval_cache.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=50)
+    args = parser.parse_args()
+
+    from app.core.agent import RAGAgent
+
+    work_dir = tempfile.mkdtemp(prefix="search_bench_")
+    try:
+        corpus = create_corpus(work_dir, args.pages + 10, pages_per_file=args.pages)
+        workload = make_workload(args.queries, args.questions)
+        report = {"pages": args.pages, "queries": args.queries, "questions": args.questions}
+
+        for label, cache_size in (("uncached", 0), ("cached", None)):
+            cache_kwargs = {} if cache_size is None else {
+                "query_embedding_cache_size": cache_size,
+                "search_cache_size": cache_size,
+            }
+            agent = RAGAgent(
+                chroma_dir=os.path.join(work_dir, f"chroma_{label}"),
+                ingest_workers=1,
+                **cache_kwargs,
+            )
+            agent.ingest_document(corpus[0], os.path.basename(corpus[0]))
+            report[label] = run(agent, workload, corpus[1])
+            agent._ingest_pool.shutdown()
+
+        print(json.dumps(report, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Settings change check: chats running while the model settings flip must not fail.
+
+Sends --rounds batches of --chats concurrent RAGAgent.query calls while
+another thread keeps calling update_settings with a different model and
+temperature (more combinations than MODEL_CACHE_SIZE, so graphs are also
+evicted and rebuilt). The chat model is FakeChatModel from
+benchmarks/offline.py, answering with the model and temperature it was built
+for. Every third chat pins its own model for that request only.
+
+Exits with status 1 if any chat failed or a pinned chat was answered by
+another model.
+
+Usage (from the backend directory):
+    python -m benchmarks.settings_flip_check --chats 20 --rounds 3
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.offline import FakeChatModel, HashingEmbeddings
+
+MODELS = ("model-a", "model-b", "model-c")
+TEMPERATURES = (0.0, 0.7)
+PINNED = ("model-pinned", 0.2)
+
+
+def flip_settings(agent, stop: threading.Event, flips: list) -> None:
+    for model, temperature in itertools.cycle(itertools.product(MODELS, TEMPERATURES)):
+        if stop.is_set():
+            return
+        agent.update_settings(model=model, temperature=temperature)
+        flips.append((model, temperature))
+        time.sleep(0.001)
+
+
+async def run_chats(agent, chats: int) -> list:
+    requests = [
+        (f"Question {i} about the travel policy", PINNED if i % 3 == 0 else None)
+        for i in range(chats)
+    ]
+    results = await asyncio.gather(
+        *(
+            agent.query(question, model=pin[0], temperature=pin[1]) if pin else agent.query(question)
+            for question, pin in requests
+        ),
+        return_exceptions=True,
+    )
+    return [(pin, result) for (_, pin), result in zip(requests, results)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=20, help="concurrent chats per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    from app.core.agent import RAGAgent
+
+    class CheckAgent(RAGAgent):
+        def _create_llm(self, model: str, temperature: float):
+            return FakeChatModel(respond=lambda prompt: f"{model}@{temperature}", latency_ms=args.latency_ms)
+
+    work_dir = tempfile.mkdtemp(prefix="settings_check_")
+    try:
+        agent = CheckAgent(
+            model=MODELS[0],
+            temperature=TEMPERATURES[0],
+            chroma_dir=os.path.join(work_dir, "chroma"),
+            chat_workers=args.chats,
+            embeddings_factory=HashingEmbeddings,
+        )
+        valid = {f"{model}@{t}" for model in MODELS for t in TEMPERATURES}
+
+        stop = threading.Event()
+        flips = []
+        flipper = threading.Thread(target=flip_settings, args=(agent, stop, flips))
+        flipper.start()
+        results = []
+        try:
+            for _ in range(args.rounds):
+                results += asyncio.run(run_chats(agent, args.chats))
+        finally:
+            stop.set()
+            flipper.join()
+
+        def answered_by_expected_model(pin, answer: str) -> bool:
+            # Unpinned chats may run on any of the defaults set meanwhile
+            return answer == f"{pin[0]}@{pin[1]}" if pin else answer in valid
+
+        failed = [repr(result) for _, result in results if isinstance(result, BaseException)]
+        wrong_model = [
+            result[0] for pin, result in results
+            if not isinstance(result, BaseException) and not answered_by_expected_model(pin, result[0])
+        ]
+        print(json.dumps({
+            "chats": len(results),
+            "settings_changes": len(flips),
+            "failed": len(failed),
+            "wrong_model": len(wrong_model),
+            "examples": (failed + wrong_model)[:5],
+        }, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    sys.exit(1 if failed or wrong_model else 0)
+
+
+if __name__ == "__main__":
+    main()
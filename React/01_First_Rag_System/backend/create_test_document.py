@@ -8,13 +8,50 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER
+import json
 import os
 
-def create_test_document():
-    """Create a test PDF document for RAG system testing."""
+
+# (question, answer span): every answer span appears verbatim in the document
+QA_PAIRS = [
+    ("Who founded NeuralTech and when?", "founded in 2019"),
+    ("How many days of PTO do employees get after 3 years?", "25 days after 3 years"),
+    ("What is the parental leave policy?", "16 weeks of fully paid parental leave"),
+    ("What is the per diem meal allowance for international travel?", "per diem meal allowance is $75"),
+    ("What is the deadline for Project Aurora?", "Deadline: September 30, 2026"),
+    ("Who are the stakeholders for major projects?", "CEO Dr. Sarah Chen"),
+    ("What are the password requirements?", "minimum 14 characters"),
+    ("What was NeuralTech's Q3 2025 revenue?", "total revenue of $47.3 million"),
+    ("What is the company's customer retention rate?", "94.7%"),
+    ("How much is the annual learning budget per employee?", "$5,000 annual learning budget"),
+    ("What is the hotel limit for New York City?", "$400 per night"),
+    ("What is the budget for Project Sentinel?", "Budget: $1.2 million"),
+    ("Who leads Project Nexus and what is it about?", "Lead: Priya Sharma"),
+    ("What is the company's mission statement?", "mission is to democratize"),
+    ("How much is the 401k company match?", "company match of up to 6%"),
+    # Exact identifiers and acronyms
+    ("1-888-NT-SECURE", "1-888-687-3287"),
+    ("SOC email address", "security@neuraltech.io"),
+    ("ARR", "Annual Recurring Revenue (ARR)"),
+    ("NPS score", "Net Promoter Score (NPS)"),
+    ("MFA", "Multi-factor authentication (MFA)"),
+    ("Cisco AnyConnect", "Cisco AnyConnect"),
+    ("TravelPerk", "TravelPerk"),
+    ("Expensify deadline", "within 30 days of the trip completion"),
+    ("BlueCross BlueShield premiums", "90% of employee premiums"),
+    ("Series D", "Series D funding round of $75 million"),
+    ("CA 94107", "1250 Innovation Drive"),
+]
+
+
+def create_test_document(output_dir: str = None):
+    """
+    Create a test PDF document for RAG system testing, along with a
+    <name>_qa.json file of question/answer-span pairs.
+    """
     
     # Output path
-    output_dir = os.path.join(os.path.dirname(__file__), "test_documents")
+    output_dir = output_dir or os.path.join(os.path.dirname(__file__), "test_documents")
     os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, "NeuralTech_Company_Handbook.pdf")
     
@@ -369,30 +406,18 @@ def create_test_document():
     doc.build(story)
     print(f"✅ Test document created successfully: {output_path}")
     
+    # Question/answer-span pairs for retrieval benchmarks
+    qa_path = os.path.splitext(output_path)[0] + "_qa.json"
+    with open(qa_path, "w", encoding="utf-8") as f:
+        json.dump([{"question": q, "answer": a} for q, a in QA_PAIRS], f, indent=2)
+    print(f"✅ Question/answer pairs written to: {qa_path}")
+    
     # Print sample questions
     print("\n" + "="*60)
     print("📝 SAMPLE TEST QUESTIONS FOR RAG SYSTEM")
     print("="*60)
     
-    questions = [
-        "Who founded NeuralTech and when?",
-        "How many days of PTO do employees get after 3 years?",
-        "What is the parental leave policy?",
-        "What is the per diem meal allowance for international travel?",
-        "What is the deadline for Project Aurora?",
-        "Who are the stakeholders for major projects?",
-        "What are the password requirements?",
-        "What was NeuralTech's Q3 2025 revenue?",
-        "What is the company's customer retention rate?",
-        "How much is the annual learning budget per employee?",
-        "What is the hotel limit for New York City?",
-        "What is the budget for Project Sentinel?",
-        "Who leads Project Nexus and what is it about?",
-        "What is the company's mission statement?",
-        "How much is the 401k company match?",
-    ]
-    
-    for i, q in enumerate(questions, 1):
+    for i, (q, _) in enumerate(QA_PAIRS, 1):
         print(f"{i:2}. {q}")
     
     print("\n" + "="*60)
@@ -20,7 +20,11 @@ const MessageBubble = ({ message }) => {
     setDocumentData(null);
     
     try {
-      const data = await apiService.viewDocument(source.filename, source.highlight_text || source.excerpt);
+      const data = await apiService.viewDocument(
+        source.filename,
+        source.highlight_text || source.excerpt,
+        { page: source.page, start: source.start_index }
+      );
       setDocumentData(data);
     } catch (err) {
       console.error('Failed to load document:', err);
@@ -30,6 +34,27 @@ const MessageBubble = ({ message }) => {
     }
   };
 
+  // PDFs are served one page at a time; fetch others on navigation
+  const handlePageChange = async (page) => {
+    if (!selectedSource) return;
+    setIsLoadingDoc(true);
+    setDocError(null);
+    
+    try {
+      const data = await apiService.viewDocument(
+        selectedSource.filename,
+        selectedSource.highlight_text || selectedSource.excerpt,
+        page === selectedSource.page ? { page, start: selectedSource.start_index } : { page }
+      );
+      setDocumentData(data);
+    } catch (err) {
+      console.error('Failed to load page:', err);
+      setDocError(err.message || 'Failed to load page');
+    } finally {
+      setIsLoadingDoc(false);
+    }
+  };
+
   const handleCloseViewer = () => {
     setSelectedSource(null);
     setDocumentData(null);
@@ -176,6 +201,7 @@ const MessageBubble = ({ message }) => {
         onClose={handleCloseViewer}
         source={selectedSource}
         documentData={documentData}
+        onPageChange={handlePageChange}
         isLoading={isLoadingDoc}
         error={docError}
       />
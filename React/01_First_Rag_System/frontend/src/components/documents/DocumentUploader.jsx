@@ -147,6 +147,18 @@ const DocumentUploader = () => {
                              <span className="text-xs text-blue-600 dark:text-blue-400 font-medium">Uploading...</span>
                          </div>
                      )}
+                     {fileObj.status === 'processing' && (
+                         <div className="flex items-center gap-2">
+                             <Loader2 size={16} className="animate-spin text-blue-500" />
+                             <span className="text-xs text-blue-600 dark:text-blue-400 font-medium">Indexing...</span>
+                         </div>
+                     )}
+                     {fileObj.status === 'error' && (
+                       <div className="flex items-center text-red-600 dark:text-red-400 bg-red-50 dark:bg-red-900/20 px-3 py-1 rounded-full">
+                         <AlertCircle size={14} className="mr-1.5" />
+                         <span className="text-xs font-bold">Failed</span>
+                       </div>
+                     )}
                      {fileObj.status === 'success' && (
                        <div className="flex items-center text-emerald-600 dark:text-emerald-400 bg-emerald-50 dark:bg-emerald-900/20 px-3 py-1 rounded-full">
                          <CheckCircle size={14} className="mr-1.5" />
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useRef } from 'react';
+import React, { useEffect, useRef } from 'react';
 import { X, FileText, ChevronLeft, ChevronRight, Search, ExternalLink, CheckCircle, Loader2 } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { cn } from '../../lib/utils';
@@ -9,9 +9,10 @@ import { cn } from '../../lib/utils';
  * Displays document content with highlighted text passages that were used
  * to generate the AI response. Allows users to verify the authenticity of answers.
  */
-const SourceViewer = ({ isOpen, onClose, source, documentData, isLoading, error }) => {
-  const [currentPage, setCurrentPage] = useState(1);
+const SourceViewer = ({ isOpen, onClose, source, documentData, onPageChange, isLoading, error }) => {
   const highlightRef = useRef(null);
+  // PDF responses contain only the requested page
+  const currentPage = documentData?.page || 1;
 
   // Auto-scroll to highlighted section when data loads
   useEffect(() => {
@@ -22,16 +23,6 @@ const SourceViewer = ({ isOpen, onClose, source, documentData, isLoading, error
     }
   }, [documentData, currentPage]);
 
-  // Find the page with highlight for PDFs
-  useEffect(() => {
-    if (documentData?.type === 'pdf' && documentData?.pages) {
-      const highlightPage = documentData.pages.find(p => p.has_highlight);
-      if (highlightPage) {
-        setCurrentPage(highlightPage.page);
-      }
-    }
-  }, [documentData]);
-
   if (!isOpen) return null;
 
   const renderHighlightedText = (text, highlightText, start, end) => {
@@ -60,7 +51,7 @@ const SourceViewer = ({ isOpen, onClose, source, documentData, isLoading, error
   const renderPDFContent = () => {
     if (!documentData?.pages) return null;
     
-    const page = documentData.pages[currentPage - 1];
+    const page = documentData.pages[0];
     if (!page) return null;
 
     return (
@@ -68,7 +59,7 @@ const SourceViewer = ({ isOpen, onClose, source, documentData, isLoading, error
         {/* Page Navigation */}
         <div className="flex items-center justify-between px-4 py-2 border-b border-gray-200 dark:border-gray-700 bg-gray-50 dark:bg-gray-800/50">
           <button
-            onClick={() => setCurrentPage(p => Math.max(1, p - 1))}
+            onClick={() => onPageChange(Math.max(1, currentPage - 1))}
             disabled={currentPage === 1}
             className="p-1.5 rounded-lg hover:bg-gray-200 dark:hover:bg-gray-700 disabled:opacity-30 disabled:cursor-not-allowed transition-colors"
           >
@@ -80,7 +71,7 @@ const SourceViewer = ({ isOpen, onClose, source, documentData, isLoading, error
           </span>
           
           <button
-            onClick={() => setCurrentPage(p => Math.min(documentData.total_pages, p + 1))}
+            onClick={() => onPageChange(Math.min(documentData.total_pages, currentPage + 1))}
             disabled={currentPage === documentData.total_pages}
             className="p-1.5 rounded-lg hover:bg-gray-200 dark:hover:bg-gray-700 disabled:opacity-30 disabled:cursor-not-allowed transition-colors"
           >
@@ -129,22 +129,30 @@ export const AppProvider = ({ children }) => {
 
     addFile(fileObj);
 
+    let id = fileObj.id;
     try {
       const response = await apiService.uploadDocument(file, (progress) => {
         // Update progress if needed
       });
 
-      updateFileStatus(fileObj.id, 'success');
-      
-      // Update with server ID
-      setFiles(prev => prev.map(f => 
-        f.id === fileObj.id ? { ...f, id: response.id, status: 'success' } : f
-      ));
-      
+      // Update with server ID; indexing runs in the background
+      id = response.id;
+      // (a new version of a listed file takes the old entry's place)
+      setFiles(prev => prev
+        .filter(f => f.id !== id)
+        .map(f => f.id === fileObj.id ? { ...f, id, status: response.status } : f)
+      );
+
+      // Unchanged content that is already indexed comes back without a job
+      if (response.job_id) {
+        await apiService.watchIngestion(response.job_id);
+        updateFileStatus(id, 'success');
+      }
+
       return response;
     } catch (err) {
       console.error('Upload error:', err);
-      updateFileStatus(fileObj.id, 'error');
+      updateFileStatus(id, 'error');
       throw err;
     }
   }, []);
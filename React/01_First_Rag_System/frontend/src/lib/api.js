@@ -42,7 +42,7 @@ class ApiService {
     });
   }
 
-  async streamMessage(messages, onChunk) {
+  async streamMessage(messages, onChunk, { onToolCall, onSources } = {}) {
     const url = `${this.baseUrl}/api/chat/stream`;
     
     try {
@@ -60,19 +60,31 @@ class ApiService {
 
       const reader = response.body.getReader();
       const decoder = new TextDecoder();
+      let buffer = '';
+      let eventType = 'message';
 
       while (true) {
         const { done, value } = await reader.read();
         if (done) break;
         
-        const chunk = decoder.decode(value);
-        const lines = chunk.split('\n');
+        // Events can be split across network chunks; keep the incomplete last line
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
         
         for (const line of lines) {
-          if (line.startsWith('data: ')) {
+          if (line.startsWith('event: ')) {
+            eventType = line.slice(7);
+          } else if (line.startsWith('data: ')) {
             const data = line.slice(6);
-            if (data === '[DONE]') break;
-            onChunk(data);
+            if (data === '[DONE]') return;
+            const payload = JSON.parse(data);
+            if (eventType === 'token') onChunk(payload.content);
+            else if (eventType === 'tool_call') onToolCall?.(payload);
+            else if (eventType === 'sources') onSources?.(payload.sources);
+            else if (eventType === 'error') throw new Error(payload.detail);
+          } else if (line === '') {
+            eventType = 'message';
           }
         }
       }
@@ -114,6 +126,50 @@ class ApiService {
     });
   }
 
+  async getIngestionJob(jobId) {
+    return this.request(`/api/documents/jobs/${jobId}`);
+  }
+
+  // Resolves when the ingestion job is done, rejects when it fails.
+  // Follows the job's progress events; polls the job if the stream drops.
+  watchIngestion(jobId, onProgress) {
+    return new Promise((resolve, reject) => {
+      const source = new EventSource(`${this.baseUrl}/api/documents/jobs/${jobId}/events`);
+
+      const poll = async () => {
+        try {
+          while (true) {
+            const job = await this.getIngestionJob(jobId);
+            if (job.status === 'success') return resolve(job);
+            if (job.status === 'error') return reject(new Error(job.error || 'Ingestion failed'));
+            await new Promise(r => setTimeout(r, 1000));
+          }
+        } catch (error) {
+          reject(error);
+        }
+      };
+
+      source.onmessage = (event) => {
+        if (event.data === '[DONE]') return;
+        const payload = JSON.parse(event.data);
+        if (payload.stage === 'done') {
+          source.close();
+          resolve(payload);
+        } else if (payload.stage === 'error') {
+          source.close();
+          reject(new Error(payload.error || 'Ingestion failed'));
+        } else {
+          onProgress?.(payload);
+        }
+      };
+
+      source.onerror = () => {
+        source.close();
+        poll();
+      };
+    });
+  }
+
   async getDocuments() {
     return this.request('/api/documents');
   }
@@ -125,11 +181,18 @@ class ApiService {
   }
 
   // Document viewer endpoint
-  async viewDocument(filename, highlightText = null) {
+  async viewDocument(filename, highlightText = null, { page = null, start = null } = {}) {
     const params = new URLSearchParams();
     if (highlightText) {
       params.append('highlight', highlightText);
     }
+    // Page and offset of the cited chunk let the server skip searching for it
+    if (page != null) {
+      params.append('page', page);
+    }
+    if (start != null) {
+      params.append('start', start);
+    }
     const queryString = params.toString();
     const endpoint = `/api/documents/view/${encodeURIComponent(filename)}${queryString ? '?' + queryString : ''}`;
     return this.request(endpoint);
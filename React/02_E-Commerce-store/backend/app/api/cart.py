@@ -4,11 +4,11 @@ from typing import List
 
 from ..core.dependencies import get_db, get_current_user
 from ..models.user import User
-from ..models.cart import CartItem, WishlistItem
+from ..models.cart import CartItem, WishlistItem, WishlistNotification
 from ..models.product import Product
 from ..schemas.cart import (
     CartItemCreate, CartItemUpdate, CartItemResponse, CartResponse,
-    WishlistItemCreate, WishlistItemResponse
+    WishlistItemCreate, WishlistItemResponse, WishlistNotificationResponse
 )
 
 
@@ -270,6 +270,33 @@ async def add_to_wishlist(
     )
 
 
+@router.get("/wishlist/notifications", response_model=List[WishlistNotificationResponse])
+async def get_wishlist_notifications(
+    unread_only: bool = False,
+    limit: int = 50,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get back-in-stock and price-drop alerts for wishlisted products."""
+    query = db.query(WishlistNotification).filter(WishlistNotification.user_id == current_user.id)
+    if unread_only:
+        query = query.filter(WishlistNotification.is_read == False)
+    return query.order_by(WishlistNotification.id.desc()).limit(limit).all()
+
+
+@router.post("/wishlist/notifications/read", status_code=status.HTTP_204_NO_CONTENT)
+async def mark_wishlist_notifications_read(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark all wishlist alerts as read."""
+    db.query(WishlistNotification).filter(
+        WishlistNotification.user_id == current_user.id,
+        WishlistNotification.is_read == False
+    ).update({WishlistNotification.is_read: True}, synchronize_session=False)
+    db.commit()
+
+
 @router.delete("/wishlist/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_from_wishlist(
     item_id: int,
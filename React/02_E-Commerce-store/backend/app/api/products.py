@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, func
+from sqlalchemy import or_, func, false
 from typing import List, Optional
 import re
 
@@ -10,7 +10,11 @@ from ..models.user import User
 from ..models.product import Product, Category, product_categories
 from ..schemas.product import (
     ProductCreate, ProductUpdate, ProductResponse, ProductListResponse,
-    CategoryCreate, CategoryUpdate, CategoryResponse, ProductFilters
+    CategoryCreate, CategoryUpdate, CategoryResponse, CategoryTreeNode, ProductFilters
+)
+from ..services.categories import (
+    assign_category_path, move_category, product_ids_in_category,
+    get_category_tree_json, invalidate_category_tree
 )
 
 
@@ -38,6 +42,18 @@ async def get_categories(
     return query.all()
 
 
+@router.get("/categories/tree", response_model=List[CategoryTreeNode])
+async def get_category_tree(
+    include_inactive: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Get the full nested category tree (cached)."""
+    return Response(
+        content=get_category_tree_json(db, include_inactive),
+        media_type="application/json"
+    )
+
+
 @router.post("/categories", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 async def create_category(
     category_data: CategoryCreate,
@@ -53,14 +69,25 @@ async def create_category(
             detail="Category with this name already exists"
         )
     
+    if category_data.parent_id is not None:
+        parent = db.query(Category.id).filter(Category.id == category_data.parent_id).first()
+        if not parent:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parent category not found"
+            )
+    
     category = Category(
         **category_data.model_dump(),
         slug=slugify(category_data.name)
     )
     
     db.add(category)
+    db.flush()
+    assign_category_path(db, category)
     db.commit()
     db.refresh(category)
+    invalidate_category_tree()
     
     return category
 
@@ -81,7 +108,19 @@ async def update_category(
             detail="Category not found"
         )
     
-    for field, value in category_data.model_dump(exclude_unset=True).items():
+    update_data = category_data.model_dump(exclude_unset=True)
+    
+    # Re-parenting rewrites the materialized paths of the whole subtree
+    if "parent_id" in update_data:
+        try:
+            move_category(db, category, update_data.pop("parent_id"))
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    for field, value in update_data.items():
         setattr(category, field, value)
     
     if category_data.name:
@@ -89,6 +128,7 @@ async def update_category(
     
     db.commit()
     db.refresh(category)
+    invalidate_category_tree()
     
     return category
 
@@ -114,7 +154,12 @@ async def get_products(
     
     # Apply filters
     if category:
-        query = query.join(Product.categories).filter(Category.slug == category)
+        # Includes products of all descendant categories
+        category_product_ids = product_ids_in_category(db, category)
+        if category_product_ids is None:
+            query = query.filter(false())
+        else:
+            query = query.filter(Product.id.in_(category_product_ids))
     
     if min_price is not None:
         query = query.filter(Product.price >= min_price)
@@ -33,11 +33,26 @@ class Settings(BaseSettings):
     DEFAULT_PAGE_SIZE: int = 12
     MAX_PAGE_SIZE: int = 100
     
+    # Caching
+    CATEGORY_TREE_CACHE_TTL: int = 300  # Seconds; bounds staleness across workers
+    
     # AI Settings (placeholders for your AI integration)
     AI_ENABLED: bool = False
     AI_MODEL_PATH: str = ""
     AI_API_KEY: str = ""
     
+    # Wishlist notifications
+    WISHLIST_NOTIFICATIONS_ENABLED: bool = True
+    WISHLIST_NOTIFY_BATCH_SIZE: int = 1000
+    WISHLIST_NOTIFY_DEDUP_MINUTES: int = 60  # Don't repeat the same alert within this window
+    
+    # Profiling & Metrics
+    METRICS_ENABLED: bool = True
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fraction of requests to profile, 0 disables
+    PROFILING_THRESHOLD_MS: float = 500.0  # Only keep profiles of slower requests
+    PROFILING_BACKEND: str = "cprofile"  # "cprofile" or "pyinstrument"
+    PROFILING_DIR: str = "profiles"
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,261 @@
+"""
+Request Profiling & Metrics
+
+Per-request wall time, SQL statement counting and sampled profiling for the API.
+
+- SQL statements are counted through SQLAlchemy cursor events and attributed to
+  the request that issued them via a context variable.
+- Every response carries a ``Server-Timing`` header (``app``, ``db``).
+- Prometheus-format histograms are rendered by ``render_metrics`` for ``/metrics``.
+- A fraction of requests can be profiled with cProfile or pyinstrument; dumps are
+  only kept when the request was slower than the configured threshold.
+
+When sampling is disabled the per-request cost is a few ``perf_counter`` calls
+and a context variable lookup per SQL statement.
+"""
+
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+
+class RequestStats:
+    """Timing counters collected for a single request."""
+
+    __slots__ = ("start", "sql_count", "sql_time")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def get_request_stats() -> Optional[RequestStats]:
+    """Get the stats of the request currently being handled, if any."""
+    return _current_stats.get()
+
+
+# SQL instrumentation
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Stored on the execution context so failed statements leave nothing behind
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.sql_count += 1
+        started = getattr(context, "_query_start", None)
+        if started is not None:
+            stats.sql_time += time.perf_counter() - started
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach SQL counting listeners to an engine (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# Prometheus histograms
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Minimal thread-safe Prometheus histogram with (method, route) labels."""
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, str], value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Bucket counts, then +Inf count and sum
+                series = [0.0] * (len(self.buckets) + 2)
+                self._series[labels] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for (method, route), series in sorted(items):
+            label = f'method="{method}",route="{route}"'
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {int(count)}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {int(series[-2])}')
+            lines.append(f"{self.name}_count{{{label}}} {int(series[-2])}")
+            lines.append(f"{self.name}_sum{{{label}}} {series[-1]}")
+        return lines
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request wall time.", DURATION_BUCKETS
+)
+request_db_duration = Histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL per request.", DURATION_BUCKETS
+)
+request_query_count = Histogram(
+    "http_request_sql_queries", "SQL statements executed per request.", QUERY_COUNT_BUCKETS
+)
+
+
+def render_metrics() -> str:
+    """Render all histograms in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for histogram in (request_duration, request_db_duration, request_query_count):
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+# Sampled profiling
+_profiler_lock = threading.Lock()
+
+
+class _SampledProfiler:
+    """Wraps cProfile or pyinstrument for a single sampled request."""
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        if backend == "pyinstrument":
+            from pyinstrument import Profiler
+            self._profiler = Profiler(async_mode="enabled")
+        else:
+            import cProfile
+            self._profiler = cProfile.Profile()
+
+    def start(self) -> None:
+        if self.backend == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self) -> None:
+        if self.backend == "pyinstrument":
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+
+    def dump(self, name: str) -> str:
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+        if self.backend == "pyinstrument":
+            path = os.path.join(settings.PROFILING_DIR, f"{name}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self._profiler.output_html())
+        else:
+            path = os.path.join(settings.PROFILING_DIR, f"{name}.prof")
+            self._profiler.dump_stats(path)
+        return path
+
+
+def _start_sampled_profiler() -> Optional[_SampledProfiler]:
+    """Start a profiler if this request is sampled and no other profile is running."""
+    if random.random() >= settings.PROFILING_SAMPLE_RATE:
+        return None
+    # cProfile can only profile one request at a time per interpreter
+    if not _profiler_lock.acquire(blocking=False):
+        return None
+    try:
+        profiler = _SampledProfiler(settings.PROFILING_BACKEND)
+        profiler.start()
+    except Exception:
+        _profiler_lock.release()
+        return None
+    return profiler
+
+
+def _finish_sampled_profiler(
+    profiler: _SampledProfiler, method: str, route: str, elapsed: float
+) -> None:
+    try:
+        profiler.stop()
+        if elapsed * 1000 >= settings.PROFILING_THRESHOLD_MS:
+            safe_route = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+            stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S-%f")
+            path = profiler.dump(f"{stamp}-{method}-{safe_route}-{int(elapsed * 1000)}ms")
+            print(f"🐢 Slow request profiled: {method} {route} -> {path}")
+    finally:
+        _profiler_lock.release()
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    # Unmatched paths share one label to keep metric cardinality bounded
+    return getattr(route, "path", None) or "unmatched"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware recording wall time, SQL count and DB time per request.
+
+    Adds a ``Server-Timing`` header to every HTTP response and feeds the
+    Prometheus histograms exposed at ``/metrics``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        profiler = _start_sampled_profiler() if settings.PROFILING_SAMPLE_RATE > 0 else None
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                header = (
+                    f'app;dur={stats.elapsed * 1000:.1f}, '
+                    f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.sql_count} queries"'
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", header.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = stats.elapsed
+            _current_stats.reset(token)
+            method = scope.get("method", "")
+            route = _route_label(scope)
+            if profiler is not None:
+                _finish_sampled_profiler(profiler, method, route, elapsed)
+            if settings.METRICS_ENABLED:
+                labels = (method, route)
+                request_duration.observe(labels, elapsed)
+                request_db_duration.observe(labels, stats.sql_time)
+                request_query_count.observe(labels, stats.sql_count)
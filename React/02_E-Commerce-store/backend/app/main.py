@@ -5,15 +5,19 @@ A futuristic luxury AI-powered e-commerce backend built with FastAPI.
 """
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import os
 
 from .core.config import settings
-from .db.session import engine
+from .core.profiling import ProfilingMiddleware, instrument_engine, render_metrics
+from .db.session import engine, SessionLocal
 from .db.base import Base
 from .api import auth, users, products, orders, reviews, cart, ai
+from .services.categories import backfill_category_paths, ensure_category_schema
+from .services.wishlist_notifier import init_wishlist_notifier
 
 
 @asynccontextmanager
@@ -22,6 +26,20 @@ async def lifespan(app: FastAPI):
     # Startup: Create database tables
     Base.metadata.create_all(bind=engine)
     
+    # Databases from before materialized category paths lack the column and indexes
+    ensure_category_schema(engine)
+    
+    # Fill in materialized category paths for pre-existing categories
+    db = SessionLocal()
+    try:
+        backfill_category_paths(db)
+    finally:
+        db.close()
+    
+    # Start the wishlist back-in-stock / price-drop notifier
+    if settings.WISHLIST_NOTIFICATIONS_ENABLED:
+        init_wishlist_notifier(SessionLocal).start()
+    
     # Create upload directory if it doesn't exist
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     
@@ -31,6 +49,8 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    if settings.WISHLIST_NOTIFICATIONS_ENABLED:
+        init_wishlist_notifier(SessionLocal).stop()
     print("👋 Shutting down...")
 
 
@@ -73,8 +93,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Request timing, SQL counting and sampled profiling
+instrument_engine(engine)
+app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix=settings.API_PREFIX)
 app.include_router(users.router, prefix=settings.API_PREFIX)
@@ -110,3 +135,13 @@ async def health_check():
         "status": "healthy",
         "database": "connected"
     }
+
+
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request latency and SQL histograms in Prometheus text format."""
+    return PlainTextResponse(
+        render_metrics(),
+        media_type="text/plain; version=0.0.4"
+    )
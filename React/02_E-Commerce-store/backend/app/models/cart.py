@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 
 from ..db.base import Base, TimestampMixin
@@ -28,3 +28,26 @@ class WishlistItem(Base, TimestampMixin):
     # Relationships
     user = relationship("User", back_populates="wishlist_items")
     product = relationship("Product", back_populates="wishlist_items")
+
+    __table_args__ = (
+        # Fan-out walks a product's wishlisters in user_id order
+        Index('ix_wishlist_items_product_user', 'product_id', 'user_id'),
+    )
+
+
+class WishlistNotification(Base, TimestampMixin):
+    __tablename__ = "wishlist_notifications"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
+    kind = Column(String(20), nullable=False)  # back_in_stock, price_drop
+    payload = Column(JSON, nullable=True)  # e.g., {"old_price": 120.0, "new_price": 99.0}
+    is_read = Column(Boolean, default=False, nullable=False)
+    sent_at = Column(DateTime, nullable=True)  # Set by the delivery channel (email, push)
+
+    __table_args__ = (
+        # Deduplication window lookups
+        Index('ix_wishlist_notifications_dedup', 'product_id', 'kind', 'user_id', 'created_at'),
+        Index('ix_wishlist_notifications_user', 'user_id', 'is_read'),
+    )
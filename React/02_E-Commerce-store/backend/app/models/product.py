@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, ForeignKey, Table, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, ForeignKey, Table, JSON, Index
 from sqlalchemy.orm import relationship
 import enum
 
@@ -10,7 +10,8 @@ product_categories = Table(
     'product_categories',
     Base.metadata,
     Column('product_id', Integer, ForeignKey('products.id'), primary_key=True),
-    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True)
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True),
+    Index('ix_product_categories_category_id', 'category_id')
 )
 
 
@@ -23,6 +24,8 @@ class Category(Base, TimestampMixin):
     description = Column(Text, nullable=True)
     image = Column(String(500), nullable=True)
     parent_id = Column(Integer, ForeignKey('categories.id'), nullable=True)
+    # Materialized ancestor path of ids, e.g. "/1/5/12/" (see services/categories.py)
+    path = Column(String(255), nullable=True, index=True)
     is_active = Column(Boolean, default=True)
     
     # Relationships
@@ -53,3 +53,15 @@ class WishlistItemResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class WishlistNotificationResponse(BaseModel):
+    id: int
+    product_id: int
+    kind: str
+    payload: Optional[dict] = None
+    is_read: bool
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -18,6 +18,7 @@ class CategoryUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = None
     image: Optional[str] = None
+    parent_id: Optional[int] = None
     is_active: Optional[bool] = None
 
 
@@ -31,6 +32,11 @@ class CategoryResponse(CategoryBase):
         from_attributes = True
 
 
+class CategoryTreeNode(CategoryResponse):
+    depth: int = 0
+    children: List["CategoryTreeNode"] = []
+
+
 # Product schemas
 class ProductBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -15,6 +15,7 @@ from app.db.base import Base
 from app.models.user import User, UserRole
 from app.models.product import Product, Category
 from app.core.security import get_password_hash
+from app.services.categories import backfill_category_paths
 
 
 def seed_users(db: Session):
@@ -81,6 +82,7 @@ def seed_categories(db: Session):
             print(f"⏭️ Category already exists: {cat_data['name']}")
     
     db.commit()
+    backfill_category_paths(db)
 
 
 def seed_products(db: Session):
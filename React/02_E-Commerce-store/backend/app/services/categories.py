@@ -0,0 +1,204 @@
+"""
+Category Tree Service
+
+Categories form a tree through ``parent_id``. To avoid recursive lazy loads, every
+category stores its materialized ancestor path of ids (``/1/5/12/``), so all
+descendants of a category are one indexed range scan on ``categories.path``:
+
+    path >= "/1/5/"  AND  path < "/1/50"
+
+('0' is the character right after '/', so the upper bound excludes siblings such
+as "/1/50/" while including every "/1/5/..." path.)
+
+The full tree is built from a single ordered query and cached as pre-rendered
+JSON until a category changes.
+"""
+
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import String, and_, inspect, literal, func, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.product import Category, product_categories
+
+
+def path_range(path: str) -> Tuple[str, str]:
+    """Get the [low, high) bounds matching a path and all of its descendants."""
+    return path, path[:-1] + "0"
+
+
+def subtree_filter(path: str):
+    """SQL condition selecting the category with ``path`` and its descendants."""
+    low, high = path_range(path)
+    return and_(Category.path >= low, Category.path < high)
+
+
+def product_ids_in_category(db: Session, slug: str):
+    """
+    Subquery of product ids in a category or any of its descendants.
+
+    Returns None if the category doesn't exist.
+    """
+    root_path = db.query(Category.path).filter(Category.slug == slug).scalar()
+    if root_path is None:
+        return None
+    return (
+        select(product_categories.c.product_id)
+        .join(Category, Category.id == product_categories.c.category_id)
+        .where(subtree_filter(root_path))
+    )
+
+
+def assign_category_path(db: Session, category: Category) -> None:
+    """Set the path of a new category (must be flushed so it has an id)."""
+    parent_path = "/"
+    if category.parent_id is not None:
+        parent_path = db.query(Category.path).filter(Category.id == category.parent_id).scalar() or "/"
+    category.path = f"{parent_path}{category.id}/"
+
+
+def move_category(db: Session, category: Category, new_parent_id: Optional[int]) -> None:
+    """
+    Re-parent a category, rewriting the paths of its whole subtree in one UPDATE.
+
+    Raises:
+        ValueError: If the new parent doesn't exist or is inside the subtree
+    """
+    old_path = category.path
+    new_parent_path = "/"
+    if new_parent_id is not None:
+        new_parent_path = db.query(Category.path).filter(Category.id == new_parent_id).scalar()
+        if new_parent_path is None:
+            raise ValueError("Parent category not found")
+        if new_parent_path.startswith(old_path):
+            raise ValueError("A category cannot be moved under itself or its descendants")
+    new_path = f"{new_parent_path}{category.id}/"
+
+    category.parent_id = new_parent_id
+    if new_path == old_path:
+        return
+
+    db.execute(
+        update(Category)
+        .where(subtree_filter(old_path))
+        .values(path=literal(new_path, String) + func.substr(Category.path, len(old_path) + 1))
+        .execution_options(synchronize_session=False)
+    )
+    category.path = new_path
+
+
+def ensure_category_schema(engine: Engine) -> None:
+    """
+    Bring a database created before materialized paths up to date: add
+    ``categories.path`` and create the indexes on ``categories.path`` and
+    ``product_categories.category_id`` (``create_all`` creates missing
+    tables, not missing columns or indexes of existing ones).
+    """
+    columns = {column["name"] for column in inspect(engine).get_columns(Category.__tablename__)}
+    with engine.begin() as conn:
+        if "path" not in columns:
+            conn.execute(text("ALTER TABLE categories ADD COLUMN path VARCHAR(255)"))
+        for index in (*Category.__table__.indexes, *product_categories.indexes):
+            index.create(conn, checkfirst=True)
+
+
+def backfill_category_paths(db: Session) -> int:
+    """
+    Compute paths for categories created before paths existed.
+
+    Returns the number of categories updated.
+    """
+    if not db.query(Category.id).filter(Category.path.is_(None)).first():
+        return 0
+
+    parents = dict(db.query(Category.id, Category.parent_id).all())
+    paths: Dict[int, str] = {}
+
+    def resolve(category_id: int) -> str:
+        chain = []
+        current = category_id
+        while current is not None and current not in paths and current not in chain:
+            chain.append(current)
+            current = parents.get(current)
+        prefix = paths.get(current, "/")
+        for node in reversed(chain):
+            prefix = f"{prefix}{node}/"
+            paths[node] = prefix
+        return paths[category_id]
+
+    for category_id in parents:
+        resolve(category_id)
+
+    db.execute(
+        update(Category),
+        [{"id": category_id, "path": path} for category_id, path in paths.items()],
+    )
+    db.commit()
+    invalidate_category_tree()
+    return len(paths)
+
+
+# Cached category tree
+_tree_cache: Dict[bool, Tuple[float, bytes]] = {}
+_tree_lock = threading.Lock()
+
+
+def invalidate_category_tree() -> None:
+    """Drop the cached tree; call after any category change."""
+    with _tree_lock:
+        _tree_cache.clear()
+
+
+def _build_category_tree(db: Session, include_inactive: bool) -> List[dict]:
+    query = db.query(Category)
+    if not include_inactive:
+        query = query.filter(Category.is_active == True)
+    # Path order guarantees every parent is seen before its children
+    categories = query.order_by(Category.path).all()
+
+    nodes: Dict[int, dict] = {}
+    roots: List[dict] = []
+    for category in categories:
+        node = {
+            "id": category.id,
+            "name": category.name,
+            "slug": category.slug,
+            "description": category.description,
+            "image": category.image,
+            "is_active": category.is_active,
+            "parent_id": category.parent_id,
+            "depth": category.path.count("/") - 2 if category.path else 0,
+            "children": [],
+        }
+        nodes[category.id] = node
+        parent = nodes.get(category.parent_id)
+        if parent is not None:
+            parent["children"].append(node)
+        elif category.parent_id is None:
+            roots.append(node)
+        # Children of hidden (inactive) parents are left out of the tree
+
+    # Path order compares ids as strings ("/10/" < "/2/"): list siblings by name
+    for node in nodes.values():
+        node["children"].sort(key=lambda child: child["name"].lower())
+    roots.sort(key=lambda root: root["name"].lower())
+    return roots
+
+
+def get_category_tree_json(db: Session, include_inactive: bool = False) -> bytes:
+    """Get the full category tree as JSON, building it at most once per TTL."""
+    now = time.monotonic()
+    with _tree_lock:
+        cached = _tree_cache.get(include_inactive)
+    if cached and now - cached[0] < settings.CATEGORY_TREE_CACHE_TTL:
+        return cached[1]
+
+    body = json.dumps(_build_category_tree(db, include_inactive)).encode("utf-8")
+    with _tree_lock:
+        _tree_cache[include_inactive] = (now, body)
+    return body
@@ -0,0 +1,258 @@
+"""
+Wishlist Notification Service
+
+Notifies users when a wishlisted product comes back in stock or drops in price.
+
+Change detection runs inside the session flush, so every code path that updates a
+product (seller edits, order cancellations restoring stock, ...) is covered.
+Detected changes are handed to a background worker only after the transaction
+commits, so the request that changed the product never waits for the fan-out.
+
+The worker walks a product's wishlisters with keyset pagination over the
+(product_id, user_id) index and bulk-inserts notifications one batch at a time.
+Users already notified about the same product and event within the
+deduplication window are skipped, so a flapping stock value doesn't spam.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, exists, insert, inspect, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..core.config import settings
+from ..models.cart import WishlistItem, WishlistNotification
+from ..models.product import Product
+
+
+BACK_IN_STOCK = "back_in_stock"
+PRICE_DROP = "price_drop"
+
+
+class ProductChange(NamedTuple):
+    product_id: int
+    kind: str
+    payload: dict
+
+
+# Change detection
+def _attribute_change(product: Product, name: str) -> Optional[Tuple[object, object]]:
+    history = inspect(product).attrs[name].history
+    if not history.has_changes():
+        return None
+    old = history.deleted[0] if history.deleted else None
+    new = history.added[0] if history.added else getattr(product, name)
+    return old, new
+
+
+def detect_product_changes(product: Product) -> List[ProductChange]:
+    """Get the wishlist-relevant changes of a modified (not yet flushed) product."""
+    changes = []
+
+    stock = _attribute_change(product, "stock")
+    if stock is not None:
+        old, new = stock
+        if (old or 0) <= 0 and (new or 0) > 0:
+            changes.append(ProductChange(product.id, BACK_IN_STOCK, {"stock": new}))
+
+    price = _attribute_change(product, "price")
+    if price is not None:
+        old, new = price
+        if old is not None and new is not None and new < old:
+            changes.append(ProductChange(product.id, PRICE_DROP, {"old_price": old, "new_price": new}))
+
+    return changes
+
+
+def _collect_changes(session: Session, flush_context) -> None:
+    # Attribute history is still available during after_flush
+    for obj in session.dirty:
+        if isinstance(obj, Product):
+            changes = detect_product_changes(obj)
+            if changes:
+                session.info.setdefault("wishlist_changes", []).extend(changes)
+
+
+def _submit_after_commit(session: Session) -> None:
+    changes = session.info.pop("wishlist_changes", None)
+    if changes:
+        wishlist_notifier.submit(changes)
+
+
+def _discard_after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop("wishlist_changes", None)
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+def register_change_hooks(session_factory: sessionmaker) -> None:
+    """Watch product stock/price updates on sessions from ``session_factory``."""
+    if not event.contains(session_factory, "after_flush", _collect_changes):
+        # Load the previous value on set, even if the attribute was expired by a commit
+        event.listen(Product.stock, "set", _load_old_value, active_history=True, retval=True)
+        event.listen(Product.price, "set", _load_old_value, active_history=True, retval=True)
+        event.listen(session_factory, "after_flush", _collect_changes)
+        event.listen(session_factory, "after_commit", _submit_after_commit)
+        event.listen(session_factory, "after_soft_rollback", _discard_after_rollback)
+
+
+# Fan-out
+def fan_out_change(
+    db: Session,
+    change: ProductChange,
+    batch_size: int,
+    dedup_window: timedelta
+) -> int:
+    """
+    Create notifications for every user wishlisting the changed product.
+
+    Returns the number of notifications created.
+    """
+    product = db.query(Product.is_active, Product.stock, Product.price).filter(
+        Product.id == change.product_id
+    ).first()
+    if product is None or not product.is_active:
+        return 0
+
+    # The product may have changed again before the worker got to it
+    if change.kind == BACK_IN_STOCK and product.stock <= 0:
+        return 0
+    if change.kind == PRICE_DROP and product.price >= change.payload["old_price"]:
+        return 0
+
+    cutoff = datetime.utcnow() - dedup_window
+    recently_notified = exists().where(
+        WishlistNotification.product_id == change.product_id,
+        WishlistNotification.kind == change.kind,
+        WishlistNotification.user_id == WishlistItem.user_id,
+        WishlistNotification.created_at >= cutoff
+    )
+
+    created = 0
+    last_user_id = 0
+    while True:
+        user_ids = db.execute(
+            select(WishlistItem.user_id)
+            .where(
+                WishlistItem.product_id == change.product_id,
+                WishlistItem.user_id > last_user_id,
+                ~recently_notified
+            )
+            .distinct()
+            .order_by(WishlistItem.user_id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not user_ids:
+            break
+
+        db.execute(
+            insert(WishlistNotification),
+            [
+                {
+                    "user_id": user_id,
+                    "product_id": change.product_id,
+                    "kind": change.kind,
+                    "payload": change.payload,
+                }
+                for user_id in user_ids
+            ]
+        )
+        db.commit()
+
+        created += len(user_ids)
+        last_user_id = user_ids[-1]
+
+    return created
+
+
+class WishlistNotifier:
+    """
+    Background worker turning product changes into wishlist notifications.
+
+    Pending changes are keyed by (product, kind), so repeated updates that arrive
+    before the worker runs collapse into a single fan-out.
+    """
+
+    def __init__(self, session_factory: sessionmaker):
+        self.session_factory = session_factory
+        self._pending: Dict[Tuple[int, str], ProductChange] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, changes: Iterable[ProductChange]) -> None:
+        """Queue changes for fan-out; never blocks on the database."""
+        if not self.running:
+            return
+        with self._lock:
+            for change in changes:
+                key = (change.product_id, change.kind)
+                previous = self._pending.get(key)
+                if previous is not None and change.kind == PRICE_DROP:
+                    # Report the drop from the price users last saw
+                    change = change._replace(
+                        payload={**change.payload, "old_price": previous.payload["old_price"]}
+                    )
+                self._pending[key] = change
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="wishlist-notifier", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            self.process_pending()
+
+    def process_pending(self) -> int:
+        """Fan out everything queued so far. Returns notifications created."""
+        with self._lock:
+            changes = list(self._pending.values())
+            self._pending.clear()
+
+        created = 0
+        dedup_window = timedelta(minutes=settings.WISHLIST_NOTIFY_DEDUP_MINUTES)
+        for change in changes:
+            db = self.session_factory()
+            try:
+                created += fan_out_change(
+                    db, change, settings.WISHLIST_NOTIFY_BATCH_SIZE, dedup_window
+                )
+            except Exception as e:
+                db.rollback()
+                print(f"❌ Wishlist notification fan-out failed for product {change.product_id}: {e}")
+            finally:
+                db.close()
+        return created
+
+
+wishlist_notifier: Optional[WishlistNotifier] = None
+
+
+def init_wishlist_notifier(session_factory: sessionmaker) -> WishlistNotifier:
+    """Create the global notifier and hook it into ``session_factory``."""
+    global wishlist_notifier
+    if wishlist_notifier is None:
+        wishlist_notifier = WishlistNotifier(session_factory)
+        register_change_hooks(session_factory)
+    return wishlist_notifier
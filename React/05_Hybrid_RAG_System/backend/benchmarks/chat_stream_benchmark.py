@@ -0,0 +1,361 @@
+"""
+Chat endpoint latency: time to first byte and throughput under concurrency
+for ``/chat``, ``/chat/stream`` and a copy of the previous handler that ran
+the pipeline and the answer LLM synchronously inside ``async def``
+(``/chat/blocking``).
+
+The backend's own chat router is served by uvicorn on a local port, with
+offline stand-ins for the remote models: query embeddings are feature-hashed
+and delayed by --embed-latency-ms, the LLMs (answer, LLM reranker, HyDE
+generator) wait --first-token-ms and then emit a fixed reply one word every
+--token-ms, through both their sync and async APIs. While the concurrent
+requests run, a trivial ``/ping`` endpoint is polled to measure how long the
+event loop is held up.
+
+--backend selects the hybrid backend (this one) or ``07_HyDE RAG``; each
+backend's top-level ``config``/``services``/``routes`` modules are imported
+from its own directory.
+
+Usage (from the backend directory):
+    python -m benchmarks.chat_stream_benchmark \\
+        --pdf ../../01_First_Rag_System/backend/test_documents/NeuralTech_Company_Handbook.pdf
+    python -m benchmarks.chat_stream_benchmark --backend hyde --pdf ...
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+REACT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+BACKEND_DIRS = {
+    "hybrid": os.path.join(REACT_DIR, "05_Hybrid_RAG_System", "backend"),
+    "hyde": os.path.join(REACT_DIR, "07_HyDE RAG", "backend"),
+}
+ENDPOINTS = ("/chat/blocking", "/chat", "/chat/stream")
+
+REPLY = (
+    "According to the handbook, employees accrue paid time off each month and "
+    "may carry over unused days into the next calendar year, subject to the "
+    "limits set by their department. Requests should be submitted through the "
+    "HR portal at least two weeks in advance, and managers approve them based "
+    "on team coverage. Sick leave is tracked separately and does not reduce the "
+    "vacation balance. For questions, contact the people operations team."
+)
+
+
+# ── offline models ──────────────────────────────────────────────────────
+
+class SlowHashingEmbeddings(Embeddings):
+    """Signed feature hashing; ``embed_query`` sleeps like a remote API call."""
+
+    def __init__(self, latency_ms: float, dimensions: int = 256):
+        self.latency_ms = latency_ms
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in text.lower().split():
+            digest = zlib.crc32(word.encode("utf-8"))
+            vector[digest % self.dimensions] += 1.0 if digest & 0x80000000 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency_ms / 1000)
+        return self._embed(text)
+
+
+class SlowStreamingChatModel(BaseChatModel):
+    """Fixed reply; waits ``first_token_ms``, then one word per ``token_ms``."""
+
+    reply: str = REPLY
+    first_token_ms: float = 300.0
+    token_ms: float = 20.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-streaming-fake"
+
+    def _words(self) -> List[str]:
+        return re.findall(r"\S+\s*", self.reply)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep((self.first_token_ms + self.token_ms * len(self._words())) / 1000)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep((self.first_token_ms + self.token_ms * len(self._words())) / 1000)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_ms / 1000)
+        for word in self._words():
+            time.sleep(self.token_ms / 1000)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.first_token_ms / 1000)
+        for word in self._words():
+            await asyncio.sleep(self.token_ms / 1000)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+
+# ── server ──────────────────────────────────────────────────────────────
+
+def build_app(backend: str, documents: List[Document], work_dir: str, args) -> FastAPI:
+    """The backend's chat router over an offline RAGManager, plus the old handler."""
+    from routes import chat
+    from schemas import ChatRequest, ChatResponse
+    from services.rag_manager import RAGManager
+    from services.state import app_state
+
+    def llm(first_token_ms: float) -> SlowStreamingChatModel:
+        return SlowStreamingChatModel(first_token_ms=first_token_ms, token_ms=args.token_ms)
+
+    embedding = SlowHashingEmbeddings(args.embed_latency_ms)
+    if backend == "hybrid":
+        # The LLM reranker answers with digits only: a short, fixed-cost call
+        reranker_llm = SlowStreamingChatModel(
+            reply=",".join(["5"] * 10), first_token_ms=args.rerank_latency_ms, token_ms=0
+        )
+        from services.rerankers import LLMReranker
+
+        app_state.rag_manager = RAGManager(
+            documents=documents,
+            persist_dir=work_dir,
+            embedding=embedding,
+            reranker=LLMReranker(reranker_llm),
+        )
+    else:
+        app_state.rag_manager = RAGManager(
+            documents,
+            persist_dir=work_dir,
+            embedding=embedding,
+            hyde_llm=llm(args.hyde_latency_ms),
+        )
+    chat._answer_llm = llm(args.first_token_ms)
+
+    app = FastAPI()
+    app.include_router(chat.router)
+
+    @app.post("/chat/blocking", response_model=ChatResponse)
+    async def chat_blocking(request: ChatRequest):
+        # The handler as it was: pipeline and LLM called on the event loop
+        if backend == "hybrid":
+            docs, _ = app_state.rag_manager.run_query_with_timings(request.message)
+        else:
+            docs = app_state.rag_manager.run_query(request.message)["final_results"]
+        context = "\n\n---\n\n".join(doc.page_content for doc in docs)
+        response = (chat._ANSWER_PROMPT | chat._answer_llm).invoke(
+            {"context": context, "question": request.message}
+        )
+        return ChatResponse(answer=response.content)
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    return app
+
+
+class Server:
+    """uvicorn in a background thread on a free local port."""
+
+    def __init__(self, app: FastAPI) -> None:
+        self._socket = socket.socket()
+        self._socket.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self._socket.getsockname()[1]}"
+        self._server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [self._socket]}, daemon=True
+        )
+
+    def __enter__(self) -> "Server":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+
+# ── client ──────────────────────────────────────────────────────────────
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 1)
+
+
+async def timed_request(client: httpx.AsyncClient, endpoint: str, question: str) -> dict:
+    """ms to the first body byte, to the first answer token, and to the end."""
+    started = time.perf_counter()
+    first_byte = first_token = None
+    async with client.stream("POST", endpoint, json={"message": question}) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            now = (time.perf_counter() - started) * 1000
+            if first_byte is None:
+                first_byte = now
+            if first_token is None and (b"event: token" in chunk or b'"answer"' in chunk):
+                first_token = now
+    return {
+        "ttfb_ms": first_byte,
+        "first_token_ms": first_token,
+        "total_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+async def poll_loop_lag(client: httpx.AsyncClient, stop: asyncio.Event, lags: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/ping")
+        lags.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.02)
+
+
+async def run_endpoint(url: str, endpoint: str, questions: List[str], concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=url, timeout=300, limits=limits) as client:
+        single = [await timed_request(client, endpoint, q) for q in questions[:3]]
+
+        lags: List[float] = []
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll_loop_lag(client, stop, lags))
+        started = time.perf_counter()
+        loaded = await asyncio.gather(
+            *(timed_request(client, endpoint, questions[i % len(questions)]) for i in range(concurrency))
+        )
+        wall = time.perf_counter() - started
+        stop.set()
+        await poller
+
+    def summary(results: List[dict], key: str) -> dict:
+        return {
+            "p50": percentile([r[key] for r in results], 50),
+            "p95": percentile([r[key] for r in results], 95),
+        }
+
+    return {
+        "single": {
+            "ttfb_ms": round(statistics.median(r["ttfb_ms"] for r in single), 1),
+            "first_token_ms": round(statistics.median(r["first_token_ms"] for r in single), 1),
+            "total_ms": round(statistics.median(r["total_ms"] for r in single), 1),
+        },
+        f"concurrent_{concurrency}": {
+            "ttfb_ms": summary(loaded, "ttfb_ms"),
+            "first_token_ms": summary(loaded, "first_token_ms"),
+            "total_ms": summary(loaded, "total_ms"),
+            "requests_per_s": round(concurrency / wall, 2),
+            "ping_ms": {"p50": percentile(lags, 50), "max": percentile(lags, 100)},
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", required=True, help="PDF with a <name>_qa.json file next to it")
+    parser.add_argument("--backend", choices=sorted(BACKEND_DIRS), default="hybrid")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--embed-latency-ms", type=float, default=150.0)
+    parser.add_argument("--rerank-latency-ms", type=float, default=400.0)
+    parser.add_argument("--hyde-latency-ms", type=float, default=400.0)
+    parser.add_argument("--first-token-ms", type=float, default=300.0)
+    parser.add_argument("--token-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIRS[args.backend])
+    # routes.chat builds its Gemini client at import; every model is replaced
+    # before a request is made, so a placeholder key is enough offline
+    os.environ.setdefault("Gemini_APi_Key", "offline-benchmark")
+    from services.document import chunk_text, extract_text_from_pdf
+
+    with open(os.path.splitext(args.pdf)[0] + "_qa.json", encoding="utf-8") as f:
+        questions = [qa["question"] for qa in json.load(f)]
+    source = os.path.basename(args.pdf)
+    documents = [
+        Document(page_content=chunk, metadata={"source": source})
+        for chunk in chunk_text(extract_text_from_pdf(args.pdf))
+    ]
+
+    work_dir = tempfile.mkdtemp(prefix="chat_stream_bench_")
+    try:
+        app = build_app(args.backend, documents, work_dir, args)
+        with Server(app) as server:
+            results = {
+                endpoint: asyncio.run(run_endpoint(server.url, endpoint, questions, args.concurrency))
+                for endpoint in ENDPOINTS
+            }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "backend": args.backend,
+        "chunks": len(documents),
+        "latencies_ms": {
+            "embed": args.embed_latency_ms,
+            "rerank": args.rerank_latency_ms if args.backend == "hybrid" else None,
+            "hyde": args.hyde_latency_ms if args.backend == "hyde" else None,
+            "first_token": args.first_token_ms,
+            "per_token": args.token_ms,
+        },
+        **results,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
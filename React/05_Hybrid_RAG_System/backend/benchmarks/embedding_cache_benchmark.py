@@ -0,0 +1,203 @@
+"""
+Embedding cache benchmark: embedding API calls and texts sent while a corpus
+is uploaded, changed and rebuilt, with and without ``EmbeddingCache``.
+
+The embedding API is simulated: vectors are feature-hashed locally, and every
+``embed_documents`` call waits --call-latency-ms plus --text-latency-ms per
+text. The corpus is --files synthetic files of --chunks chunks each.
+
+--backend hybrid replays this backend's incremental index: the files are
+uploaded one by one, one file is uploaded again (its chunks are replaced),
+then the Chroma collection is lost and restored from the corpus store.
+
+--backend hyde replays ``07_HyDE RAG``, whose every upload and delete
+rebuilds the vector store from all documents: the files are uploaded one by
+one, one is deleted, then the unchanged corpus is rebuilt.
+
+Usage (from the backend directory):
+    python -m benchmarks.embedding_cache_benchmark --backend hybrid
+    python -m benchmarks.embedding_cache_benchmark --backend hyde
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from benchmarks.chat_stream_benchmark import BACKEND_DIRS, SlowHashingEmbeddings, SlowStreamingChatModel
+
+WORDS = (
+    "policy employee leave benefit manager review salary project team office "
+    "remote schedule training security access report budget quarter client "
+    "contract approval request process system data support onboarding payroll"
+).split()
+
+
+class MeteredEmbeddings(Embeddings):
+    """Hashing embeddings that wait and count like a batched remote API."""
+
+    model = "offline-hashing"
+
+    def __init__(self, call_latency_ms: float, text_latency_ms: float) -> None:
+        self._hashing = SlowHashingEmbeddings(latency_ms=0)
+        self.call_latency_ms = call_latency_ms
+        self.text_latency_ms = text_latency_ms
+        self.calls = 0
+        self.texts = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.texts += len(texts)
+        time.sleep((self.call_latency_ms + self.text_latency_ms * len(texts)) / 1000)
+        return self._hashing.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._hashing.embed_query(text)
+
+
+def make_files(files: int, chunks: int, seed: int = 0) -> List[List[Document]]:
+    rng = random.Random(seed)
+    return [
+        [
+            Document(
+                page_content=f"file {f} chunk {c}: " + " ".join(rng.choices(WORDS, k=80)),
+                metadata={"source": f"file_{f}.pdf"},
+            )
+            for c in range(chunks)
+        ]
+        for f in range(files)
+    ]
+
+
+def step(name: str, meter: MeteredEmbeddings, action: Callable[[], None]) -> dict:
+    calls, texts = meter.calls, meter.texts
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        action()
+    return {
+        "step": name,
+        "embedding_calls": meter.calls - calls,
+        "texts_embedded": meter.texts - texts,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def run_hybrid(files: List[List[Document]], meter: MeteredEmbeddings, cache, work_dir: str) -> List[dict]:
+    from services.rag_manager import RAGManager
+    from services.rerankers import LexicalReranker
+
+    def manager(persist_dir: str) -> RAGManager:
+        return RAGManager(
+            persist_dir=os.path.join(work_dir, persist_dir),
+            embedding=meter,
+            reranker=LexicalReranker(),
+            embedding_cache=cache,
+        )
+
+    rag = manager("chroma")
+    steps = [
+        step(f"upload {docs[0].metadata['source']}", meter, lambda docs=docs: rag.add_documents(docs))
+        for docs in files
+    ]
+
+    def reupload():
+        rag.delete_source(files[1][0].metadata["source"])
+        rag.add_documents(files[1])
+
+    steps.append(step(f"re-upload {files[1][0].metadata['source']}", meter, reupload))
+
+    corpus = [doc for docs in files for doc in docs]
+    ids = RAGManager.chunk_ids(corpus)
+    steps.append(step(
+        "restore into an empty Chroma",
+        meter,
+        lambda: manager("chroma_restored").restore(ids, corpus, os.path.join(work_dir, "bm25"), 1),
+    ))
+    return steps
+
+
+def run_hyde(files: List[List[Document]], meter: MeteredEmbeddings, cache, work_dir: str) -> List[dict]:
+    from services.rag_manager import RAGManager
+
+    documents: List[Document] = []
+    hyde_llm = SlowStreamingChatModel(first_token_ms=0, token_ms=0)
+
+    def rebuild() -> None:
+        # AppState.rebuild_rag: a new vector store with every document embedded.
+        # A fresh directory each time: chromadb's client cache would keep using
+        # a wiped one within a process
+        persist_dir = os.path.join(work_dir, f"vector_store_{len(steps)}")
+        RAGManager(
+            documents, persist_dir=persist_dir, embedding=meter, hyde_llm=hyde_llm, embedding_cache=cache
+        )
+
+    steps = []
+    for docs in files:
+        documents.extend(docs)
+        steps.append(step(f"upload {docs[0].metadata['source']}", meter, rebuild))
+
+    deleted = files[2][0].metadata["source"]
+    documents[:] = [d for d in documents if d.metadata["source"] != deleted]
+    steps.append(step(f"delete {deleted}", meter, rebuild))
+    steps.append(step("rebuild unchanged corpus", meter, rebuild))
+    return steps
+
+
+def totals(steps: List[dict]) -> Tuple[int, int, float]:
+    return (
+        sum(s["embedding_calls"] for s in steps),
+        sum(s["texts_embedded"] for s in steps),
+        round(sum(s["seconds"] for s in steps), 2),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=sorted(BACKEND_DIRS), default="hybrid")
+    parser.add_argument("--files", type=int, default=5)
+    parser.add_argument("--chunks", type=int, default=200, help="chunks per file")
+    parser.add_argument("--call-latency-ms", type=float, default=300.0)
+    parser.add_argument("--text-latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIRS[args.backend])
+    os.environ.setdefault("Gemini_APi_Key", "offline-benchmark")
+    from services.embedding_cache import EmbeddingCache
+
+    files = make_files(args.files, args.chunks)
+    run = run_hybrid if args.backend == "hybrid" else run_hyde
+    report = {"backend": args.backend, "files": args.files, "chunks_per_file": args.chunks}
+    for mode in ("no_cache", "cache"):
+        work_dir = tempfile.mkdtemp(prefix="embedding_cache_bench_")
+        try:
+            cache = EmbeddingCache(os.path.join(work_dir, "cache.db"), 100_000) if mode == "cache" else None
+            meter = MeteredEmbeddings(args.call_latency_ms, args.text_latency_ms)
+            steps = run(files, meter, cache, work_dir)
+            calls, texts, seconds = totals(steps)
+            report[mode] = {
+                "steps": steps,
+                "embedding_calls": calls,
+                "texts_embedded": texts,
+                "seconds": seconds,
+            }
+            if cache is not None:
+                report[mode]["entries"] = len(cache)
+                cache.close()
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+End-to-end pipeline benchmark with the configured model providers.
+
+The whole app (``main.app``: lifespan, routes, state, RAGManager) is served
+by uvicorn on a local port, with every path of config.py moved into a
+temporary directory. --embedding and --llm set ``EMBEDDING_PROVIDER`` and
+``LLM_PROVIDER``: ``fake`` runs fully offline and deterministic, ``local``
+uses FastEmbed and an Ollama server on this machine, ``gemini`` the API.
+
+The corpus is a PDF with a ``<name>_qa.json`` file of question/answer-span
+pairs next to it, such as the handbook written by
+``React/01_First_Rag_System/backend/create_test_document.py``. The PDF is
+uploaded through ``POST /upload``, then every question is asked through
+``POST /chat/stream``. Reported: the upload time, the share of questions
+whose answer span is in a returned chunk, and per question the ms to the
+``sources`` event (retrieval and reranking, or HyDE generation and search),
+to the first answer token and to the end of the stream.
+
+--backend selects the hybrid backend (this one) or ``07_HyDE RAG``.
+
+Usage (from the backend directory):
+    python -m benchmarks.pipeline_benchmark --embedding fake --llm fake \\
+        --pdf ../../01_First_Rag_System/backend/test_documents/NeuralTech_Company_Handbook.pdf
+    python -m benchmarks.pipeline_benchmark --backend hyde --embedding local --llm local --pdf ...
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.chat_stream_benchmark import BACKEND_DIRS, Server, percentile
+
+PROVIDERS = ("gemini", "local", "fake")
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def ask(client: httpx.Client, question: str, answer: str) -> dict:
+    """Timings (ms) of one streamed answer, and whether the answer span was retrieved."""
+    started = time.perf_counter()
+    timings = {}
+    chunks = []
+    event = None
+    with client.stream("POST", "/chat/stream", json={"message": question}) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: ") and event:
+                now = round((time.perf_counter() - started) * 1000, 1)
+                if event == "sources":
+                    timings["sources_ms"] = now
+                    chunks = [chunk["text"] for chunk in json.loads(line[len("data: "):])["chunks"]]
+                elif event == "token":
+                    timings.setdefault("first_token_ms", now)
+                elif event == "error":
+                    raise RuntimeError(json.loads(line[len("data: "):])["detail"])
+                event = None
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    timings["hit"] = any(normalize(answer) in normalize(chunk) for chunk in chunks)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=sorted(BACKEND_DIRS), default="hybrid")
+    parser.add_argument("--pdf", required=True, help="PDF with a <name>_qa.json file next to it")
+    parser.add_argument("--embedding", choices=PROVIDERS, default="fake")
+    parser.add_argument("--llm", choices=PROVIDERS, default="fake")
+    parser.add_argument("--reranker", help="hybrid only: overrides RERANKER")
+    args = parser.parse_args()
+
+    with open(os.path.splitext(args.pdf)[0] + "_qa.json") as f:
+        qa_pairs = json.load(f)
+
+    # Read by config.py, so set before any backend module is imported
+    os.environ["EMBEDDING_PROVIDER"] = args.embedding
+    os.environ["LLM_PROVIDER"] = args.llm
+    sys.path.insert(0, BACKEND_DIRS[args.backend])
+    import config
+
+    work_dir = tempfile.mkdtemp(prefix="pipeline_bench_")
+    for name, value in vars(config).copy().items():
+        if isinstance(value, str) and value.startswith(config.BASE_DIR + os.sep):
+            setattr(config, name, work_dir + value[len(config.BASE_DIR):])
+    if args.reranker:
+        config.RERANKER = args.reranker
+
+    from main import app
+
+    try:
+        with Server(app) as server, httpx.Client(base_url=server.url, timeout=600) as client:
+            started = time.perf_counter()
+            with open(args.pdf, "rb") as f:
+                response = client.post(
+                    "/upload",
+                    files={"files": (os.path.basename(args.pdf), f, "application/pdf")},
+                )
+            response.raise_for_status()
+            upload_s = round(time.perf_counter() - started, 2)
+
+            results = [ask(client, qa["question"], qa["answer"]) for qa in qa_pairs]
+            health = client.get("/health").json()
+
+        def summary(key: str) -> dict:
+            values = [r[key] for r in results if key in r]
+            return {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+
+        report = {
+            "backend": args.backend,
+            "providers": health["providers"],
+            "cpus": os.cpu_count(),
+            "upload": {"seconds": upload_s, "chunks": response.json()["total_chunks"]},
+            "questions": len(results),
+            "answer_retrieved": round(sum(r["hit"] for r in results) / len(results), 3),
+            "sources_ms": summary("sources_ms"),
+            "first_token_ms": summary("first_token_ms"),
+            "total_ms": summary("total_ms"),
+        }
+        print(json.dumps(report, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
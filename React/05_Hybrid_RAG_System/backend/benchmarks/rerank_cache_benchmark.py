@@ -0,0 +1,151 @@
+"""
+Rerank cache benchmark: replays a query log through the full retrieve →
+rerank pipeline with and without the cache and counts reranker calls.
+
+The log is built from the questions in the PDF's ``_qa.json`` file: each
+query is a question drawn with a Zipf-like skew (popular questions recur),
+sometimes rewritten as a near-duplicate (case, punctuation, spacing). The
+reranker is the lexical one slowed down by --reranker-latency-ms to stand
+in for an LLM call. Halfway through, the PDF is deleted and re-uploaded to
+exercise invalidation.
+
+Usage (from the backend directory):
+    python -m benchmarks.rerank_cache_benchmark \\
+        --pdf ../../01_First_Rag_System/backend/test_documents/NeuralTech_Company_Handbook.pdf
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import List, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+
+from benchmarks.retrieval_latency_benchmark import SlowHashingEmbeddings
+from services.document import chunk_text, extract_text_from_pdf
+from services.rag_manager import RAGManager
+from services.rerank_cache import RerankCache, normalize_query
+from services.rerankers import LexicalReranker, Reranker
+
+
+class SlowReranker(Reranker):
+    """Lexical scores, with a fixed delay per call like a remote LLM."""
+
+    name = "slow_lexical"
+
+    def __init__(self, latency_ms: float) -> None:
+        self._lexical = LexicalReranker()
+        self.threshold = self._lexical.threshold
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self.pairs = 0
+
+    def score(self, query: str, docs: Sequence[Document]) -> List[float]:
+        self.calls += 1
+        self.pairs += len(docs)
+        time.sleep(self.latency_ms / 1000)
+        return self._lexical.score(query, docs)
+
+
+def near_duplicate(question: str, rng: random.Random) -> str:
+    rewrites = [
+        str.lower,
+        lambda q: q.rstrip("?"),
+        lambda q: "  " + q.upper() + " ",
+        lambda q: q.replace(" ", "  ").replace("?", " ?"),
+    ]
+    return rng.choice(rewrites)(question)
+
+
+def build_log(questions: List[str], size: int, duplicate_rate: float, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(questions))]
+    log = []
+    for question in rng.choices(questions, weights=weights, k=size):
+        log.append(near_duplicate(question, rng) if rng.random() < duplicate_rate else question)
+    return log
+
+
+def replay(documents: List[Document], log: List[str], latency_ms: float, cache_path: str = None) -> dict:
+    work_dir = tempfile.mkdtemp(prefix="rerank_cache_bench_")
+    try:
+        reranker = SlowReranker(latency_ms)
+        cache = RerankCache(cache_path, max_entries=100_000) if cache_path else None
+        manager = RAGManager(
+            documents=documents,
+            persist_dir=work_dir,
+            embedding=SlowHashingEmbeddings(latency_ms=0),
+            reranker=reranker,
+            rerank_cache=cache,
+        )
+        source = documents[0].metadata["source"]
+        started = time.perf_counter()
+        for i, query in enumerate(log):
+            if i == len(log) // 2:
+                # Re-upload: the file's cached scores must not be reused
+                manager.delete_source(source)
+                manager.add_documents(documents)
+            manager.run_query(query)
+        report = {
+            "queries": len(log),
+            "reranker_calls": reranker.calls,
+            "pairs_scored": reranker.pairs,
+            "seconds": round(time.perf_counter() - started, 1),
+        }
+        if cache is not None:
+            report["cache"] = manager.rerank_stats()
+            cache.close()
+        return report
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", required=True, help="PDF with a <name>_qa.json file next to it")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--duplicate-rate", type=float, default=0.3)
+    parser.add_argument("--reranker-latency-ms", type=float, default=50.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(os.path.splitext(args.pdf)[0] + "_qa.json", encoding="utf-8") as f:
+        questions = [qa["question"] for qa in json.load(f)]
+    source = os.path.basename(args.pdf)
+    documents = [
+        Document(page_content=chunk, metadata={"source": source})
+        for chunk in chunk_text(extract_text_from_pdf(args.pdf))
+    ]
+    log = build_log(questions, args.queries, args.duplicate_rate, args.seed)
+
+    cache_dir = tempfile.mkdtemp(prefix="rerank_cache_")
+    try:
+        uncached = replay(documents, log, args.reranker_latency_ms)
+        cached = replay(documents, log, args.reranker_latency_ms, os.path.join(cache_dir, "cache.db"))
+        # A second process start: scores persisted by the first run are reused
+        restarted = replay(documents, log, args.reranker_latency_ms, os.path.join(cache_dir, "cache.db"))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    report = {
+        "queries": len(log),
+        "distinct_query_strings": len(set(log)),
+        "distinct_normalized_queries": len({normalize_query(q) for q in log}),
+        "reranker_latency_ms": args.reranker_latency_ms,
+        "no_cache": uncached,
+        "cache": cached,
+        "cache_after_restart": restarted,
+        "reranker_calls_avoided": uncached["reranker_calls"] - cached["reranker_calls"],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Reranker comparison: latency and ranking quality of every reranker in
+services/rerankers.py on the same retrieved candidates.
+
+The corpus is a PDF with a ``<name>_qa.json`` file of question/answer-span
+pairs next to it, such as the handbook written by
+``React/01_First_Rag_System/backend/create_test_document.py``. For each
+question, the hybrid retrieve step (offline hashing embeddings + BM25)
+produces the candidates; each reranker then orders them. A candidate is
+relevant if it contains the answer span. Reported per reranker:
+recall@1/3 and MRR of the reranked list, the share of questions whose
+relevant chunk survives the reranker's threshold, and the scoring latency.
+"retrieval" is the fused order without reranking.
+
+Rerankers that cannot run here are reported as skipped (the LLM one needs
+Gemini_APi_Key, or a running Ollama server with LLM_PROVIDER=local; the
+cross-encoder needs FastEmbed and its model download).
+
+Usage (from the backend directory):
+    python -m benchmarks.reranker_benchmark \
+        --pdf ../../01_First_Rag_System/backend/test_documents/NeuralTech_Company_Handbook.pdf
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+
+from benchmarks.retrieval_latency_benchmark import SlowHashingEmbeddings
+from benchmarks.sparse_index_benchmark import percentile
+from config import GEMINI_API_KEY, LLM_PROVIDER
+from services.document import chunk_text, extract_text_from_pdf
+from services.rag_manager import RAGManager
+from services.rerankers import Reranker, create_reranker
+
+RERANKERS = ("lexical", "cross_encoder", "llm")
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def relevant_rank(docs: List[Document], answer: str) -> int:
+    """1-based rank of the first chunk containing *answer*, 0 if none."""
+    answer = normalize(answer)
+    return next(
+        (rank for rank, doc in enumerate(docs, start=1) if answer in normalize(doc.page_content)),
+        0,
+    )
+
+
+def evaluate(candidates: List[List[Document]], qa_pairs: List[dict], reranker: Reranker = None) -> Dict:
+    ranks, kept, latencies = [], [], []
+    for docs, qa in zip(candidates, qa_pairs):
+        if reranker is None:
+            ordered, survivors = docs, docs
+        else:
+            started = time.perf_counter()
+            scores = reranker.score(qa["question"], docs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            order = sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)
+            ordered = [docs[i] for i in order]
+            survivors = [docs[i] for i in order if scores[i] > reranker.threshold]
+        ranks.append(relevant_rank(ordered, qa["answer"]))
+        kept.append(relevant_rank(survivors, qa["answer"]) > 0)
+
+    report = {
+        "recall@1": round(sum(0 < r <= 1 for r in ranks) / len(ranks), 3),
+        "recall@3": round(sum(0 < r <= 3 for r in ranks) / len(ranks), 3),
+        "mrr": round(statistics.mean(1 / r if r else 0 for r in ranks), 3),
+        "relevant_kept": round(sum(kept) / len(kept), 3),
+    }
+    if latencies:
+        report["latency_ms"] = {"p50": percentile(latencies, 50), "p95": percentile(latencies, 95)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", required=True, help="PDF with a <name>_qa.json file next to it")
+    parser.add_argument("--rerankers", nargs="+", choices=RERANKERS, default=list(RERANKERS))
+    args = parser.parse_args()
+
+    with open(os.path.splitext(args.pdf)[0] + "_qa.json", encoding="utf-8") as f:
+        qa_pairs = json.load(f)
+    source = os.path.basename(args.pdf)
+    documents = [
+        Document(page_content=chunk, metadata={"source": source})
+        for chunk in chunk_text(extract_text_from_pdf(args.pdf))
+    ]
+
+    work_dir = tempfile.mkdtemp(prefix="reranker_bench_")
+    try:
+        manager = RAGManager(
+            documents=documents,
+            persist_dir=work_dir,
+            embedding=SlowHashingEmbeddings(latency_ms=0),
+            reranker=create_reranker("lexical"),
+        )
+        candidates = [manager.retrieve(qa["question"])[0] for qa in qa_pairs]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "chunks": len(documents),
+        "questions": len(qa_pairs),
+        "mean_candidates": round(statistics.mean(len(c) for c in candidates), 1),
+        "retrieval": evaluate(candidates, qa_pairs),
+    }
+    for name in args.rerankers:
+        if name == "llm" and LLM_PROVIDER == "gemini" and not GEMINI_API_KEY:
+            report[name] = {"status": "skipped: Gemini_APi_Key is not set"}
+            continue
+        try:
+            reranker = create_reranker(name)
+            reranker.score("warm up", candidates[0][:1])
+        except Exception as e:
+            report[name] = {"status": f"skipped: {type(e).__name__}: {e}"}
+            continue
+        report[name] = evaluate(candidates, qa_pairs, reranker)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Retrieve-step latency: dense and sparse branches run one after the other vs
+concurrently (``RAGManager.retrieve``).
+
+The embedding API is simulated: query embeddings are feature-hashed locally
+and delayed by --embed-latency-ms to stand in for the Gemini round trip, so
+the benchmark runs offline. Documents are embedded without delay.
+
+``--sparse bm25_retriever`` swaps the BM25 branch for LangChain's
+BM25Retriever (tens of ms per query at this size instead of ~1 ms), to show
+the overlap when both branches are slow.
+
+Usage (from the backend directory):
+    python -m benchmarks.retrieval_latency_benchmark --chunks 20000 --embed-latency-ms 150
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from benchmarks.sparse_index_benchmark import make_corpus, make_queries, percentile
+from services.rag_manager import RAGManager
+
+
+class SlowHashingEmbeddings(Embeddings):
+    """Signed feature hashing; ``embed_query`` sleeps like a remote API call."""
+
+    def __init__(self, latency_ms: float, dimensions: int = 256):
+        self.latency_ms = latency_ms
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in text.lower().split():
+            digest = zlib.crc32(word.encode("utf-8"))
+            vector[digest % self.dimensions] += 1.0 if digest & 0x80000000 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency_ms / 1000)
+        return self._embed(text)
+
+
+def summarize(values: List[float]) -> dict:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "mean": round(statistics.mean(values), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--embed-latency-ms", type=float, default=150.0)
+    parser.add_argument("--sparse", choices=("sparse_index", "bm25_retriever"), default="sparse_index")
+    args = parser.parse_args()
+
+    documents = make_corpus(args.chunks)
+    queries = make_queries(documents, args.queries)
+    work_dir = tempfile.mkdtemp(prefix="retrieval_latency_")
+    try:
+        manager = RAGManager(
+            persist_dir=work_dir,
+            embedding=SlowHashingEmbeddings(args.embed_latency_ms),
+            reranker_llm=FakeListChatModel(responses=["5"]),
+        )
+        manager.add_documents(documents)
+        if args.sparse == "bm25_retriever":
+            from langchain_community.retrievers import BM25Retriever
+
+            from services.sparse_index import tokenize
+
+            bm25 = BM25Retriever.from_documents(documents, preprocess_func=tokenize, k=5)
+            manager._sparse_search = lambda query: [(doc, 0.0) for doc in bm25.invoke(query)]
+
+        dense, sparse, sequential, parallel = [], [], [], []
+        for query in queries:
+            started = time.perf_counter()
+            _, dense_ms = manager._timed(manager._dense_search, query)
+            _, sparse_ms = manager._timed(manager._sparse_search, query)
+            sequential.append((time.perf_counter() - started) * 1000)
+            dense.append(dense_ms)
+            sparse.append(sparse_ms)
+
+            _, timings = manager.retrieve(query)
+            parallel.append(timings["retrieve_ms"])
+
+        report = {
+            "chunks": args.chunks,
+            "queries": args.queries,
+            "embed_latency_ms": args.embed_latency_ms,
+            "sparse": args.sparse,
+            "dense_ms": summarize(dense),
+            "sparse_ms": summarize(sparse),
+            "sequential_ms": summarize(sequential),
+            "parallel_ms": summarize(parallel),
+            "max_branch_ms": summarize(list(np.maximum(dense, sparse))),
+        }
+        print(json.dumps(report, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Sparse retrieval benchmark: SparseIndex vs LangChain's BM25Retriever.
+
+Builds both over the same synthetic corpus (Zipf-distributed vocabulary,
+~90 words per chunk) and reports build time, retained memory, query latency
+and the cost of a small upload / delete. Both use the same tokenizer and
+BM25 parameters; rank_bm25 floors the IDF of terms found in most chunks
+differently, so the top-k overlap is 1 for queries of selective terms and
+lower for queries containing very common ones.
+
+Each index is measured in its own subprocess so that memory numbers do not
+include the other one.
+
+Usage (from the backend directory):
+    python -m benchmarks.sparse_index_benchmark --chunks 100000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from langchain_core.documents import Document
+
+from services.sparse_index import SparseIndex, tokenize
+
+INDEXES = ("sparse_index", "bm25_retriever")
+UPLOAD_CHUNKS = 12  # a 2-page PDF
+
+
+def make_corpus(chunks: int, vocabulary: int = 50_000, words: int = 90, seed: int = 0) -> List[Document]:
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, vocabulary + 1)
+    terms = rng.choice(vocabulary, size=(chunks, words), p=weights / weights.sum())
+    return [
+        Document(
+            page_content=" ".join(f"t{t}" for t in row),
+            metadata={"source": f"file{i // 500}.pdf"},
+        )
+        for i, row in enumerate(terms)
+    ]
+
+
+def make_queries(documents: List[Document], count: int, seed: int = 1) -> List[str]:
+    rng = np.random.default_rng(seed)
+    queries = []
+    for i in rng.choice(len(documents), size=count):
+        words = documents[i].page_content.split()
+        queries.append(" ".join(rng.choice(words, size=3, replace=False)))
+    return queries
+
+
+def build(kind: str, documents: List[Document]):
+    if kind == "sparse_index":
+        index = SparseIndex()
+        index.add([f"{d.metadata['source']}:{i}" for i, d in enumerate(documents)], documents)
+        return index
+    from langchain_community.retrievers import BM25Retriever
+
+    return BM25Retriever.from_documents(documents, preprocess_func=tokenize, k=5)
+
+
+def search(kind: str, index, query: str, k: int) -> List[str]:
+    if kind == "sparse_index":
+        return [d.page_content for d, _ in index.search(query, k)]
+    return [d.page_content for d in index.invoke(query)[:k]]
+
+
+def percentile(values: List[float], q: float) -> float:
+    return round(float(np.percentile(values, q)), 2)
+
+
+def run_index(kind: str, chunks: int, queries: int, k: int) -> Dict:
+    documents = make_corpus(chunks)
+    upload = make_corpus(UPLOAD_CHUNKS, seed=2)
+    for d in upload:
+        d.metadata["source"] = "upload.pdf"
+
+    # Memory is measured on a separate build: tracing slows allocation down
+    tracemalloc.start()
+    index = build(kind, documents)
+    memory_mb = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    del index
+
+    started = time.perf_counter()
+    index = build(kind, documents)
+    build_seconds = time.perf_counter() - started
+
+    latencies, results = [], []
+    query_texts = make_queries(documents, queries)
+    for query in query_texts:
+        started = time.perf_counter()
+        results.append(search(kind, index, query, k))
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    report = {
+        "build_seconds": round(build_seconds, 2),
+        "memory_mb": round(memory_mb, 1),
+        "query_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "mean": round(statistics.mean(latencies), 2),
+        },
+    }
+
+    # An upload and a delete: in place for SparseIndex, a full rebuild for BM25Retriever
+    started = time.perf_counter()
+    if kind == "sparse_index":
+        index.add([f"upload.pdf:{i}" for i in range(len(upload))], upload)
+    else:
+        index = build(kind, documents + upload)
+    report["upload_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    started = time.perf_counter()
+    if kind == "sparse_index":
+        index.remove_source("upload.pdf")
+    else:
+        index = build(kind, documents)
+    report["delete_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    if kind == "sparse_index":
+        work_dir = tempfile.mkdtemp(prefix="sparse_bench_")
+        try:
+            started = time.perf_counter()
+            index.save(work_dir, stamp=1)
+            report["save_seconds"] = round(time.perf_counter() - started, 2)
+
+            by_id = dict(zip(index._chunk_ids, index._documents))
+            restored = SparseIndex()
+            started = time.perf_counter()
+            restored.load(work_dir, by_id, stamp=1)
+            report["mmap_load_seconds"] = round(time.perf_counter() - started, 2)
+            report["restored_results_match"] = all(
+                search(kind, restored, query, k) == result
+                for query, result in zip(query_texts, results)
+            )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report["results"] = results
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--indexes", nargs="+", choices=INDEXES, default=list(INDEXES))
+    parser.add_argument("--run-index", choices=INDEXES, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_index:
+        with open(args.result, "w") as f:
+            json.dump(run_index(args.run_index, args.chunks, args.queries, args.k), f)
+        return
+
+    reports = {}
+    with tempfile.TemporaryDirectory(prefix="sparse_bench_") as work_dir:
+        for kind in args.indexes:
+            result_path = os.path.join(work_dir, f"{kind}.json")
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.sparse_index_benchmark", "--run-index", kind,
+                 "--chunks", str(args.chunks), "--queries", str(args.queries), "-k", str(args.k),
+                 "--result", result_path],
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                check=True, stdout=sys.stderr,
+            )
+            with open(result_path) as f:
+                reports[kind] = json.load(f)
+
+    if len(reports) == len(INDEXES):
+        overlaps = [
+            len(set(a) & set(b)) / max(len(b), 1)
+            for a, b in zip(reports["sparse_index"]["results"], reports["bm25_retriever"]["results"])
+        ]
+        reports["top_k_overlap"] = round(statistics.mean(overlaps), 3)
+    for kind in INDEXES:
+        reports.get(kind, {}).pop("results", None)
+
+    print(json.dumps({"chunks": args.chunks, "queries": args.queries, "k": args.k, **reports}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Upload benchmark: a multi-file PDF upload processed the previous way vs
+with ``load_documents``.
+
+Generates --files PDFs of --pages pages each (paragraphs of synthetic
+sentences, ~2.5k characters per page, plus a noise image of --image-kb so
+file sizes resemble scanned or illustrated documents), then measures:
+
+* save – copying each upload to disk: ``f.write(await file.read())`` (the
+  whole file in memory) vs ``shutil.copyfileobj`` in UPLOAD_CHUNK_SIZE blocks;
+  peak traced memory of the copy
+* sequential – the previous route: files one after the other, every page
+  appended with ``text += page.get_text()``, then the whole text chunked
+* parallel – ``load_documents`` with --workers processes, all page windows
+  of all files queued at once, chunked per page; "cold" includes starting
+  the pool, "warm" reuses it
+* upload – the whole POST /upload (save, parse, chunk, offline embedding
+  and BM25 indexing), via the real route with an in-memory test client
+
+Usage (from the backend directory):
+    python -m benchmarks.upload_benchmark --files 20 --pages 100 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+
+import services.document as document
+from benchmarks.retrieval_latency_benchmark import SlowHashingEmbeddings
+from config import UPLOAD_CHUNK_SIZE
+from services.document import chunk_text, load_documents, shutdown_parse_pool
+
+WORDS = (
+    "policy employee leave benefit manager review salary project team office "
+    "remote schedule training security access report budget quarter client "
+    "contract approval request process system data support onboarding payroll "
+    "holiday insurance travel expense device password network meeting goal"
+).split()
+
+
+def make_pdfs(directory: str, files: int, pages: int, image_kb: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    side = max(1, int((image_kb * 1024 / 3) ** 0.5))
+    paths = []
+    for i in range(files):
+        path = os.path.join(directory, f"report_{i:02d}.pdf")
+        with fitz.open() as pdf:
+            for _ in range(pages):
+                paragraphs = [
+                    " ".join(
+                        " ".join(rng.choices(WORDS, k=rng.randint(8, 16))).capitalize() + "."
+                        for _ in range(4)
+                    )
+                    for _ in range(5)
+                ]
+                page = pdf.new_page()
+                page.insert_textbox(fitz.Rect(50, 50, 545, 700), "\n\n".join(paragraphs), fontsize=9)
+                if image_kb:
+                    noise = fitz.Pixmap(fitz.csRGB, side, side, rng.randbytes(side * side * 3), False)
+                    page.insert_image(fitz.Rect(50, 710, 130, 790), pixmap=noise)
+            pdf.save(path)
+        paths.append(path)
+    return paths
+
+
+def previous_extract(file_path: str) -> str:
+    """``extract_text_from_pdf`` as it was."""
+    text = ""
+    with fitz.open(file_path) as doc:
+        for page in doc:
+            text += page.get_text()
+    return text
+
+
+def measure_save(paths: List[str], directory: str) -> dict:
+    """Seconds and peak traced MB of copying the uploads to disk, both ways."""
+
+    def read_all(upload: UploadFile, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(asyncio.run(upload.read()))
+
+    def copy_blocks(upload: UploadFile, path: str) -> None:
+        with open(path, "wb") as f:
+            shutil.copyfileobj(upload.file, f, UPLOAD_CHUNK_SIZE)
+
+    report = {}
+    for name, save in (("read_all", read_all), ("copy_blocks", copy_blocks)):
+        tracemalloc.start()
+        started = time.perf_counter()
+        for path in paths:
+            with open(path, "rb") as source:
+                save(UploadFile(source, filename=os.path.basename(path)), os.path.join(directory, "copy.pdf"))
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        report[name] = {"seconds": round(seconds, 2), "peak_mb": round(peak / 2**20, 1)}
+    return report
+
+
+def measure_upload(paths: List[str], work_dir: str) -> dict:
+    """POST /upload through the real route, with offline embeddings."""
+    import routes.upload
+    from routes import upload_router
+    from services.corpus_store import CorpusStore
+    from services.rag_manager import RAGManager
+    from services.rerankers import LexicalReranker
+    from services.state import app_state
+
+    # Keep the benchmark's files out of the backend's uploads/ and vector_store/
+    routes.upload.UPLOAD_DIR = os.path.join(work_dir, "uploads")
+    os.makedirs(routes.upload.UPLOAD_DIR)
+    app_state._store = CorpusStore(os.path.join(work_dir, "corpus.db"))
+    app_state.rag_manager = RAGManager(
+        persist_dir=os.path.join(work_dir, "chroma"),
+        embedding=SlowHashingEmbeddings(latency_ms=0),
+        reranker=LexicalReranker(),
+    )
+
+    app = FastAPI()
+    app.include_router(upload_router)
+    client = TestClient(app)
+    handles = [open(path, "rb") for path in paths]
+    try:
+        started = time.perf_counter()
+        response = client.post(
+            "/upload",
+            files=[("files", (os.path.basename(h.name), h, "application/pdf")) for h in handles],
+        )
+        seconds = time.perf_counter() - started
+    finally:
+        for handle in handles:
+            handle.close()
+        app_state._store.close()
+    response.raise_for_status()
+    return {"seconds": round(seconds, 2), "total_chunks": response.json()["total_chunks"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--image-kb", type=int, default=50, help="noise image per page (0: text only)")
+    parser.add_argument("--workers", type=int, default=document.PARSE_WORKERS)
+    args = parser.parse_args()
+    document.PARSE_WORKERS = args.workers
+
+    work_dir = tempfile.mkdtemp(prefix="upload_bench_")
+    try:
+        started = time.perf_counter()
+        paths = make_pdfs(work_dir, args.files, args.pages, args.image_kb)
+        generated_s = time.perf_counter() - started
+        files = [(os.path.basename(path), path) for path in paths]
+
+        started = time.perf_counter()
+        sequential_chunks = sum(len(chunk_text(previous_extract(path))) for path in paths)
+        sequential_s = time.perf_counter() - started
+
+        parallel = {}
+        for run in ("cold", "warm"):
+            started = time.perf_counter()
+            chunks = load_documents(files)
+            parallel[run] = round(time.perf_counter() - started, 2)
+        docs = [doc for file_docs in chunks.values() for doc in file_docs]
+
+        started = time.perf_counter()
+        for path in paths:
+            previous_extract(path)
+        concat_s = time.perf_counter() - started
+        started = time.perf_counter()
+        for path in paths:
+            document.extract_text_from_pdf(path)
+        join_s = time.perf_counter() - started
+
+        report = {
+            "files": args.files,
+            "pages": args.files * args.pages,
+            "mb": round(sum(os.path.getsize(p) for p in paths) / 2**20, 1),
+            "cpus": os.cpu_count(),
+            "workers": args.workers,
+            "generate_seconds": round(generated_s, 1),
+            "save": measure_save(paths, work_dir),
+            "extract_seconds": {"concatenate": round(concat_s, 2), "join": round(join_s, 2)},
+            "sequential": {
+                "seconds": round(sequential_s, 2),
+                "pages_per_s": round(args.files * args.pages / sequential_s),
+                "chunks": sequential_chunks,
+            },
+            "parallel": {
+                "seconds_cold": parallel["cold"],
+                "seconds_warm": parallel["warm"],
+                "pages_per_s": round(args.files * args.pages / parallel["warm"]),
+                "chunks": len(docs),
+                "chunks_with_page": sum("page" in doc.metadata for doc in docs),
+            },
+            "upload": measure_upload(paths, work_dir),
+        }
+        print(json.dumps(report, indent=2))
+    finally:
+        shutdown_parse_pool()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,20 +12,47 @@ load_dotenv()
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
 VECTOR_STORE_DIR = os.path.join(BASE_DIR, "vector_store")
+CORPUS_DB_PATH = os.path.join(VECTOR_STORE_DIR, "corpus.db")  # file registry + chunk texts
+SPARSE_INDEX_DIR = os.path.join(VECTOR_STORE_DIR, "bm25_index")  # memory-mapped postings
+RERANK_CACHE_PATH = os.path.join(VECTOR_STORE_DIR, "rerank_cache.db")
+EMBEDDING_CACHE_PATH = os.path.join(VECTOR_STORE_DIR, "embedding_cache.db")
 
 # ── Model settings ───────────────────────────────────────────────────────
+# "gemini" (Google API), "local" (FastEmbed / Ollama, offline) or "fake" (deterministic, for benchmarks)
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "gemini")
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
 GEMINI_MODEL = "gemini-2.5-flash"
 EMBEDDING_MODEL = "gemini-embedding-001"
 GEMINI_API_KEY = os.getenv("Gemini_APi_Key")
+LOCAL_EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"  # FastEmbed ONNX, 384 dims
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2:1b")
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+FAKE_EMBEDDING_DIM = 384
+EMBEDDING_CACHE_SIZE = 100_000  # cached chunk vectors (~12 KB each at 3,072 dims); 0 disables
 
 # ── Chunking ─────────────────────────────────────────────────────────────
 CHUNK_SIZE = 500
 CHUNK_OVERLAP = 100
 
+# ── Uploads ──────────────────────────────────────────────────────────────
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # bytes copied to disk at a time
+PARSE_WORKERS = min(8, os.cpu_count() or 1)  # processes parsing PDF pages
+PAGES_PER_TASK = 25  # PDF pages parsed and chunked per worker task
+
 # ── Retrieval ────────────────────────────────────────────────────────────
 DENSE_WEIGHT = 0.7
+FUSION_METHOD = "rrf"  # "rrf" (reciprocal rank) or "weighted" (normalized scores)
+RRF_C = 60
 RETRIEVER_K = 5
+
+# ── Reranking ────────────────────────────────────────────────────────────
+RERANKER = "llm"  # "llm" (LLM_PROVIDER), "cross_encoder" (local ONNX) or "lexical"
 RERANK_THRESHOLD = 3  # min score (1-10) to keep a document
+CROSS_ENCODER_MODEL = "Xenova/ms-marco-MiniLM-L-6-v2"
+CROSS_ENCODER_BATCH_SIZE = 32
+CROSS_ENCODER_THRESHOLD = 0.0  # min logit to keep a document
+LEXICAL_THRESHOLD = 0.0  # min share of query words found in a document
+RERANK_CACHE_SIZE = 100_000  # cached (query, chunk) scores; 0 disables the cache
 
 # ── CORS origins ─────────────────────────────────────────────────────────
 CORS_ORIGINS = [
@@ -13,6 +13,8 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from config import CORS_ORIGINS, UPLOAD_DIR
 from routes import upload_router, chat_router, files_router, health_router
+from services.document import shutdown_parse_pool, start_parse_pool
+from services.state import app_state
 
 
 # ── Lifespan ─────────────────────────────────────────────────────────────
@@ -20,7 +22,13 @@ from routes import upload_router, chat_router, files_router, health_router
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     os.makedirs(UPLOAD_DIR, exist_ok=True)
+    # Reload the persisted corpus and indexes (no re-embedding)
+    app_state.load()
+    # PDF parsing workers start in the background, ready for the first upload
+    start_parse_pool()
     yield
+    app_state.close()
+    shutdown_parse_pool()
 
 
 # ── App ──────────────────────────────────────────────────────────────────
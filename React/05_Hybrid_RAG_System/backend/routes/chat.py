@@ -1,26 +1,31 @@
 """
-POST /chat – query the RAG pipeline and return an LLM-generated answer.
+POST /chat        – query the RAG pipeline and return an LLM-generated answer.
+POST /chat/stream – the same, as Server-Sent Events: the retrieved sources
+                    first, then the answer token by token.
+
+Retrieval and reranking are synchronous (Chroma, BM25, the reranker), so they
+run in the threadpool; the answer LLM is called through its async API. The
+event loop is never blocked and concurrent requests overlap.
 """
 
-from typing import List
+import json
+import time
+from typing import Dict, List, Tuple
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 
-from config import GEMINI_API_KEY, GEMINI_MODEL
 from schemas import ChatRequest, ChatResponse
+from services.providers import create_chat_model
 from services.state import app_state
 
 router = APIRouter()
 
 # LLM used to synthesise a final answer from retrieved context
-_answer_llm = ChatGoogleGenerativeAI(
-    model=GEMINI_MODEL,
-    api_key=GEMINI_API_KEY,
-    temperature=0.3,
-)
+_answer_llm = create_chat_model(temperature=0.3)
 
 _ANSWER_PROMPT = ChatPromptTemplate.from_template(
     "You are a helpful AI assistant. Answer the user's question based ONLY on "
@@ -31,36 +36,100 @@ _ANSWER_PROMPT = ChatPromptTemplate.from_template(
     "Answer:"
 )
 
+_NO_RESULTS = "I couldn't find any relevant information in the uploaded documents."
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    if app_state.rag_manager is None:
+
+async def _retrieve(message: str) -> Tuple[List[Document], Dict[str, float]]:
+    """Retrieve + rerank in the threadpool; raises 400 before any upload."""
+    rag_manager = app_state.rag_manager
+    if rag_manager is None:
         raise HTTPException(
             status_code=400,
             detail="No documents uploaded yet. Please upload documents first.",
         )
+    return await run_in_threadpool(rag_manager.run_query_with_timings, message)
+
 
+def _answer_inputs(docs: List[Document], message: str) -> Tuple[dict, List[str]]:
+    context = "\n\n---\n\n".join(doc.page_content for doc in docs)
+    sources = list({doc.metadata.get("source", "Unknown") for doc in docs})
+    return {"context": context, "question": message}, sources
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
     try:
-        relevant_docs: List[Document] = app_state.rag_manager.run_query(
-            request.message
-        )
+        relevant_docs, timings = await _retrieve(request.message)
 
         if not relevant_docs:
-            return ChatResponse(
-                answer="I couldn't find any relevant information in the uploaded documents.",
-                sources=[],
-            )
-
-        context = "\n\n---\n\n".join(doc.page_content for doc in relevant_docs)
-        sources = list(
-            {doc.metadata.get("source", "Unknown") for doc in relevant_docs}
-        )
+            return ChatResponse(answer=_NO_RESULTS, sources=[], timings=timings)
 
-        response = (_ANSWER_PROMPT | _answer_llm).invoke(
-            {"context": context, "question": request.message}
-        )
+        inputs, sources = _answer_inputs(relevant_docs, request.message)
+        started = time.perf_counter()
+        response = await (_ANSWER_PROMPT | _answer_llm).ainvoke(inputs)
+        timings["generate_ms"] = round((time.perf_counter() - started) * 1000, 2)
 
-        return ChatResponse(answer=response.content, sources=sources)
+        return ChatResponse(answer=response.content, sources=sources, timings=timings)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing query: {e}")
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Stream the answer using Server-Sent Events.
+
+    Events: ``sources`` (source files, chunk texts and retrieval timings),
+    then one ``token`` per answer delta, then ``done`` with the final timings
+    (``first_token_ms``, ``generate_ms``), or ``error``. The stream ends with
+    ``data: [DONE]``.
+    """
+    try:
+        relevant_docs, timings = await _retrieve(request.message)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing query: {e}")
+
+    async def generate():
+        inputs, sources = _answer_inputs(relevant_docs, request.message)
+        yield _sse("sources", {
+            "sources": sources,
+            "chunks": [
+                {"source": doc.metadata.get("source", "Unknown"), "text": doc.page_content}
+                for doc in relevant_docs
+            ],
+            "timings": timings,
+        })
+        try:
+            if not relevant_docs:
+                yield _sse("token", {"content": _NO_RESULTS})
+            else:
+                started = time.perf_counter()
+                async for chunk in (_ANSWER_PROMPT | _answer_llm).astream(inputs):
+                    if not chunk.content:
+                        continue
+                    if "first_token_ms" not in timings:
+                        timings["first_token_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                    yield _sse("token", {"content": chunk.content})
+                timings["generate_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            yield _sse("done", {"timings": timings})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Error generating answer: {e}"})
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
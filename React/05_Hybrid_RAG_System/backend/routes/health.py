@@ -4,6 +4,7 @@ GET /health – lightweight status probe.
 
 from fastapi import APIRouter
 
+from config import EMBEDDING_PROVIDER, LLM_PROVIDER
 from services.state import app_state
 
 router = APIRouter()
@@ -16,4 +17,11 @@ async def health_check():
         "documents_loaded": len(app_state.all_documents),
         "files_uploaded": len(app_state.uploaded_file_names),
         "rag_initialized": app_state.rag_manager is not None,
+        "providers": {"embedding": EMBEDDING_PROVIDER, "llm": LLM_PROVIDER},
+        "rerank_cache": (
+            app_state.rag_manager.rerank_stats() if app_state.rag_manager else None
+        ),
+        "embedding_cache": (
+            app_state.rag_manager.embedding_stats() if app_state.rag_manager else None
+        ),
     }
@@ -1,87 +1,93 @@
 """
-POST /upload – accept PDF / TXT files, extract text, chunk, and rebuild the RAG index.
+POST /upload – accept PDF / TXT files, extract text, chunk, and add them to the RAG index.
+
+Uploads are copied to disk in ``UPLOAD_CHUNK_SIZE`` blocks rather than read
+into memory, under temporary names: a file replaces an earlier upload of the
+same name only once it has been parsed and indexed. Parsing (page-parallel for PDFs), chunking and embedding are
+blocking, so they run in the threadpool and the event loop keeps serving
+other requests.
 """
 
 import os
-from typing import List
+import shutil
+import uuid
+from typing import List, Tuple
 
 from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from langchain_core.documents import Document
 
-from config import UPLOAD_DIR
-from services.document import extract_text_from_pdf, chunk_text
+from config import UPLOAD_CHUNK_SIZE, UPLOAD_DIR
+from services.document import load_documents
 from services.state import app_state
 
 router = APIRouter()
 
+_SUPPORTED = (".pdf", ".txt")
+
+
+def _save(file: UploadFile, path: str) -> None:
+    with open(path, "wb") as f:
+        shutil.copyfileobj(file.file, f, UPLOAD_CHUNK_SIZE)
+
+
+def _discard(saved: List[Tuple[str, str]]) -> None:
+    for _, temp_path in saved:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
 
 @router.post("/upload")
 async def upload_files(files: List[UploadFile] = File(...)):
-    new_documents: List[Document] = []
-
+    # ── unsupported ──
     for file in files:
         filename = file.filename or "unknown"
-        ext = os.path.splitext(filename)[1].lower()
-
-        # ── TXT ──
-        if ext == ".txt":
-            raw = await file.read()
-            text = raw.decode("utf-8", errors="ignore")
-            for chunk in chunk_text(text):
-                new_documents.append(
-                    Document(page_content=chunk, metadata={"source": filename})
-                )
-            app_state.uploaded_file_names.append(filename)
-            continue
-
-        # ── PDF ──
-        if ext == ".pdf":
-            file_path = os.path.join(UPLOAD_DIR, filename)
-            with open(file_path, "wb") as f:
-                f.write(await file.read())
-
-            try:
-                text = extract_text_from_pdf(file_path)
-            except Exception as e:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Failed to read PDF '{filename}': {e}",
-                )
-
-            if not text.strip():
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"No extractable text found in '{filename}'.",
-                )
-
-            for chunk in chunk_text(text):
-                new_documents.append(
-                    Document(page_content=chunk, metadata={"source": filename})
-                )
-            app_state.uploaded_file_names.append(filename)
-            continue
-
-        # ── unsupported ──
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file type: '{filename}'. Only PDF and TXT are accepted.",
-        )
-
-    if not new_documents:
-        raise HTTPException(
-            status_code=400,
-            detail="No text could be extracted from the uploaded files.",
-        )
-
-    app_state.all_documents.extend(new_documents)
-
+        if os.path.splitext(filename)[1].lower() not in _SUPPORTED:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported file type: '{filename}'. Only PDF and TXT are accepted.",
+            )
+
+    # Temporary names keep the extension, which selects the parser
+    saved = []
     try:
-        app_state.rebuild_rag()
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to build RAG index: {e}",
-        )
+        for file in files:
+            filename = file.filename or "unknown"
+            temp_path = os.path.join(
+                UPLOAD_DIR, f".{uuid.uuid4().hex}{os.path.splitext(filename)[1].lower()}"
+            )
+            saved.append((filename, temp_path))
+            await run_in_threadpool(_save, file, temp_path)
+
+        try:
+            chunks = await run_in_threadpool(load_documents, saved)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to parse uploads: {e}")
+
+        new_documents: List[Document] = [doc for docs in chunks.values() for doc in docs]
+        if not new_documents:
+            raise HTTPException(
+                status_code=400,
+                detail="No text could be extracted from the uploaded files.",
+            )
+
+        try:
+            # Only the new chunks are embedded; the rest of the index is untouched
+            await run_in_threadpool(app_state.add_documents, new_documents)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to update RAG index: {e}",
+            )
+    except BaseException:
+        # Earlier uploads of the same names stay as they were
+        await run_in_threadpool(_discard, saved)
+        raise
+
+    for filename, temp_path in saved:
+        os.replace(temp_path, os.path.join(UPLOAD_DIR, filename))
 
     return {
         "message": f"Successfully processed {len(files)} file(s)",
@@ -2,7 +2,7 @@
 Pydantic request / response models for the chat endpoint.
 """
 
-from typing import List
+from typing import Dict, List
 
 from pydantic import BaseModel
 
@@ -14,3 +14,4 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     answer: str
     sources: List[str] = []
+    timings: Dict[str, float] = {}  # ms per pipeline stage
@@ -0,0 +1,136 @@
+"""
+SQLite-backed corpus: the registry of uploaded files and the text of every
+indexed chunk.
+
+It is the source of truth across restarts. Chroma (dense) and the BM25 index
+(sparse) are derived from it and are reconciled against it at startup, so a
+restart never has to re-embed chunks that are already in Chroma.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import List, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name        TEXT PRIMARY KEY,
+    chunk_count INTEGER NOT NULL,
+    uploaded_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    id       TEXT PRIMARY KEY,
+    source   TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    content  TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source, position);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class CorpusStore:
+    """Persistent file registry and chunk table (one SQLite file)."""
+
+    def __init__(self, db_path: str) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ── reads ────────────────────────────────────────────────────────────
+
+    @property
+    def revision(self) -> int:
+        """Bumped on every change; tags derived index files so stale ones are detected."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'revision'"
+            ).fetchone()
+        return int(row[0]) if row else 0
+
+    def files(self) -> List[str]:
+        """File names in upload order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name FROM files ORDER BY uploaded_at, rowid"
+            ).fetchall()
+        return [name for (name,) in rows]
+
+    def load(self) -> Tuple[List[str], List[Document]]:
+        """Every chunk as ``(ids, documents)``, grouped by file in upload order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT c.id, c.content, c.metadata FROM chunks c "
+                "JOIN files f ON f.name = c.source "
+                "ORDER BY f.uploaded_at, f.rowid, c.position"
+            ).fetchall()
+        ids = [chunk_id for chunk_id, _, _ in rows]
+        documents = [
+            Document(page_content=content, metadata=json.loads(metadata))
+            for _, content, metadata in rows
+        ]
+        return ids, documents
+
+    # ── writes ───────────────────────────────────────────────────────────
+
+    def _bump_revision(self) -> None:
+        # Caller holds the lock, inside a transaction
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('revision', '1') "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def add(self, ids: Sequence[str], documents: Sequence[Document]) -> None:
+        """Register the files of *documents* and store their chunks.
+
+        Files already present are replaced as a whole.
+        """
+        uploaded_at = datetime.now(timezone.utc).isoformat()
+        counts = {}
+        for doc in documents:
+            source = doc.metadata.get("source", "")
+            counts[source] = counts.get(source, 0) + 1
+
+        with self._lock, self._conn:
+            for source, count in counts.items():
+                self._conn.execute("DELETE FROM chunks WHERE source = ?", (source,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (name, chunk_count, uploaded_at) "
+                    "VALUES (?, ?, ?)",
+                    (source, count, uploaded_at),
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (id, source, position, content, metadata) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        chunk_id,
+                        doc.metadata.get("source", ""),
+                        position,
+                        doc.page_content,
+                        json.dumps(doc.metadata),
+                    )
+                    for position, (chunk_id, doc) in enumerate(zip(ids, documents))
+                ),
+            )
+            self._bump_revision()
+
+    def delete_source(self, source: str) -> None:
+        """Forget one file and its chunks."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunks WHERE source = ?", (source,))
+            self._conn.execute("DELETE FROM files WHERE name = ?", (source,))
+            self._bump_revision()
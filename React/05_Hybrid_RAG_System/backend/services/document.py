@@ -1,13 +1,24 @@
 """
 Document-processing helpers: PDF text extraction and text chunking.
+
+Uploads are parsed with ``load_documents``: PDF pages are extracted and
+chunked in windows of ``PAGES_PER_TASK`` pages across a process pool (all
+files of an upload at once), and each page is chunked on its own so every
+chunk carries the page it came from.
 """
 
-from typing import List
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
 
 import fitz  # PyMuPDF
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from config import CHUNK_SIZE, CHUNK_OVERLAP
+from config import CHUNK_SIZE, CHUNK_OVERLAP, PAGES_PER_TASK, PARSE_WORKERS
 
 # Splits at paragraphs → sentences → words, keeping chunks coherent
 _text_splitter = RecursiveCharacterTextSplitter(
@@ -17,16 +28,135 @@ _text_splitter = RecursiveCharacterTextSplitter(
     length_function=len,
 )
 
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
 
 def extract_text_from_pdf(file_path: str) -> str:
     """Extract all text from a PDF using PyMuPDF."""
-    text = ""
     with fitz.open(file_path) as doc:
-        for page in doc:
-            text += page.get_text()
-    return text
+        return "".join(page.get_text() for page in doc)
 
 
 def chunk_text(text: str) -> List[str]:
     """Split *text* into overlapping chunks using RecursiveCharacterTextSplitter."""
     return _text_splitter.split_text(text)
+
+
+# ── page-parallel parsing ────────────────────────────────────────────────
+
+def chunk_pdf_pages(file_path: str, start: int, end: int) -> List[Tuple[int, List[str]]]:
+    """(zero-based page, chunks) for pages [start, end) of a PDF.
+
+    Runs in the worker processes, so it must stay a top-level function.
+    """
+    with fitz.open(file_path) as doc:
+        return [
+            (page, chunk_text(doc[page].get_text()))
+            for page in range(start, min(end, doc.page_count))
+        ]
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            # spawn: forking a process that runs server threads is unsafe
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _parse_pool
+
+
+def start_parse_pool() -> None:
+    """Spawn the workers now (each imports the backend) instead of on the first upload."""
+    pool = _get_parse_pool()
+    for _ in range(PARSE_WORKERS):
+        pool.submit(os.getpid)
+
+
+def shutdown_parse_pool() -> None:
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(cancel_futures=True)
+            _parse_pool = None
+
+
+def _page_windows(file_path: str) -> List[Tuple[int, int]]:
+    with fitz.open(file_path) as doc:
+        pages = doc.page_count
+    return [(start, start + PAGES_PER_TASK) for start in range(0, pages, PAGES_PER_TASK)]
+
+
+def _unreadable_pdf(filename: str, path: str, error: Exception) -> ValueError:
+    # The parser's message names the saved (temporary) path: log it, don't return it
+    print(f"Failed to read PDF '{filename}' ({path}): {error!r}")
+    return ValueError(f"Failed to read PDF '{filename}'. The file may be damaged or not a PDF.")
+
+
+def load_documents(files: List[Tuple[str, str]]) -> Dict[str, List[Document]]:
+    """Chunk uploaded files, given as (file name, saved path) pairs.
+
+    Returns the chunks of each file, in page order, with ``source`` and (for
+    PDFs) zero-based ``page`` metadata. Raises ``ValueError`` naming the file
+    when a PDF cannot be read or has no extractable text, and
+    ``BrokenProcessPool`` if a worker died. Blocking: run it off the event loop.
+    """
+    windows: Dict[str, List[Tuple[int, int]]] = {}
+    for filename, path in files:
+        if path.lower().endswith(".pdf"):
+            try:
+                windows[filename] = _page_windows(path)
+            except Exception as e:
+                raise _unreadable_pdf(filename, path, e) from e
+
+    # Every window of every file is queued at once; a single window is parsed
+    # in-process, where the pool would only add overhead
+    paths = dict(files)
+    futures = {}
+    if sum(len(w) for w in windows.values()) > 1:
+        pool = _get_parse_pool()
+        try:
+            futures = {
+                filename: [pool.submit(chunk_pdf_pages, paths[filename], *window) for window in file_windows]
+                for filename, file_windows in windows.items()
+            }
+        except BrokenProcessPool:
+            shutdown_parse_pool()  # a worker died; the next upload starts a new pool
+            raise
+
+    def parse(filename: str) -> List[List[Tuple[int, List[str]]]]:
+        if futures:
+            return [future.result() for future in futures[filename]]
+        return [chunk_pdf_pages(paths[filename], *window) for window in windows[filename]]
+
+    documents: Dict[str, List[Document]] = {}
+    for filename, path in files:
+        if filename not in windows:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                documents[filename] = [
+                    Document(page_content=chunk, metadata={"source": filename})
+                    for chunk in chunk_text(f.read())
+                ]
+            continue
+
+        try:
+            pages = [page for window in parse(filename) for page in window]
+        except Exception as e:
+            for pending in futures.values():
+                for future in pending:
+                    future.cancel()
+            if isinstance(e, BrokenProcessPool):
+                shutdown_parse_pool()
+                raise
+            raise _unreadable_pdf(filename, path, e) from e
+        documents[filename] = [
+            Document(page_content=chunk, metadata={"source": filename, "page": page})
+            for page, chunks in pages
+            for chunk in chunks
+        ]
+        if not documents[filename]:
+            raise ValueError(f"No extractable text found in '{filename}'.")
+    return documents
@@ -0,0 +1,151 @@
+"""
+Content-addressed cache of chunk embeddings.
+
+Vectors are keyed by the SHA-256 of the embedding model name and the chunk
+text, so a chunk embedded before (by an earlier upload, a re-upload of the
+same file or a rebuilt index) is read from SQLite instead of being sent to
+the embedding API. Each ``embed_documents`` call looks its texts up in
+batches and sends all the misses to the API in a single call. Query
+embeddings are not cached. Entries are evicted least recently used beyond
+``max_entries``.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vectors (
+    key     TEXT PRIMARY KEY,
+    vector  BLOB NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vectors_used_at ON vectors (used_at);
+"""
+
+# SQLite's default limit on bound parameters is 999
+_BATCH_SIZE = 900
+
+
+def content_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+
+def model_name(embeddings: Embeddings) -> str:
+    """The model an embedding client uses, or its class name if it has none."""
+    for attr in ("model", "model_name"):
+        # Some clients keep the loaded model object, not its name, in ``model``
+        value = getattr(embeddings, attr, None)
+        if isinstance(value, str) and value:
+            return value
+    return type(embeddings).__name__
+
+
+class EmbeddingCache:
+    """SQLite-backed LRU map of content key → float32 vector."""
+
+    def __init__(self, db_path: str, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Cached vectors of the given keys (missing ones are left out)."""
+        found: Dict[str, List[float]] = {}
+        now = time.time()
+        with self._lock, self._conn:
+            for start in range(0, len(keys), _BATCH_SIZE):
+                batch = keys[start:start + _BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM vectors WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE vectors SET used_at = ? "
+                        f"WHERE key IN ({','.join('?' * len(rows))})",
+                        (now, *(key for key, _ in rows)),
+                    )
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, List[float]]]) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, vector, used_at) VALUES (?, ?, ?)",
+                [(key, array("f", vector).tobytes(), now) for key, vector in items],
+            )
+            excess = self._count() - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM vectors WHERE rowid IN "
+                    "(SELECT rowid FROM vectors ORDER BY used_at LIMIT ?)",
+                    (excess,),
+                )
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps an embedding client: known chunk texts are not embedded again."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache: EmbeddingCache,
+        model: Optional[str] = None,
+    ) -> None:
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model or model_name(embeddings)
+        self.calls = 0  # embed_documents calls that reached the wrapped client
+        self.texts_embedded = 0
+        self.texts_cached = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [content_key(self.model, text) for text in texts]
+        vectors = self.cache.get_many(list(dict.fromkeys(keys)))
+
+        # Deduplicated: a text repeated within the call is embedded once
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if missing:
+            self.calls += 1
+            fresh = dict(zip(missing, self.embeddings.embed_documents(list(missing.values()))))
+            self.cache.put_many(fresh.items())
+            vectors.update(fresh)
+        self.texts_embedded += len(missing)
+        self.texts_cached += len(texts) - len(missing)
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "embedding_calls": self.calls,
+            "texts_embedded": self.texts_embedded,
+            "texts_cached": self.texts_cached,
+            "entries": len(self.cache),
+        }
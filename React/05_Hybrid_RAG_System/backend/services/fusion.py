@@ -0,0 +1,57 @@
+"""
+Rank fusion for hybrid retrieval.
+
+Each fusion takes one ranked list of ``(document, score)`` pairs per
+retriever (best first, higher score = better) and one weight per list, and
+returns the union of the documents, best first. A chunk found by both
+retrievers appears once.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+Ranked = Sequence[Tuple[Document, float]]
+
+
+def _key(document: Document) -> Tuple[str, str]:
+    return document.metadata.get("source", ""), document.page_content
+
+
+def _fuse(results: Sequence[Ranked], contribution) -> List[Document]:
+    scores: Dict[Tuple[str, str], float] = {}
+    documents: Dict[Tuple[str, str], Document] = {}
+    for list_index, ranked in enumerate(results):
+        for rank, (document, score) in enumerate(ranked):
+            key = _key(document)
+            documents.setdefault(key, document)
+            scores[key] = scores.get(key, 0.0) + contribution(list_index, rank, score, ranked)
+    order = sorted(scores, key=scores.__getitem__, reverse=True)
+    return [documents[key] for key in order]
+
+
+def reciprocal_rank_fusion(
+    results: Sequence[Ranked], weights: Sequence[float], c: int = 60
+) -> List[Document]:
+    """Weighted RRF: a document scores ``weight / (c + rank)`` in every list it is in."""
+    return _fuse(
+        results,
+        lambda i, rank, score, ranked: weights[i] / (c + rank + 1),
+    )
+
+
+def weighted_score_fusion(
+    results: Sequence[Ranked], weights: Sequence[float]
+) -> List[Document]:
+    """Weighted sum of the scores, min-max normalized to [0, 1] within each list."""
+    bounds = [
+        (min(s for _, s in ranked), max(s for _, s in ranked)) if ranked else (0.0, 0.0)
+        for ranked in results
+    ]
+
+    def contribution(i, rank, score, ranked):
+        low, high = bounds[i]
+        normalized = (score - low) / (high - low) if high > low else 1.0
+        return weights[i] * normalized
+
+    return _fuse(results, contribution)
@@ -1,29 +1,49 @@
 """
-RAGManager – Hybrid (dense + sparse) retrieval with LLM-based reranking.
+RAGManager – Hybrid (dense + sparse) retrieval with reranking.
 
 Pipeline (LangGraph):  START → retrieve → rerank → END
+
+The retrieve node runs the dense (Chroma) and sparse (BM25) searches
+concurrently, so its latency is close to the slower branch rather than the sum
+of both, and fuses them with RRF or weighted score fusion (``FUSION_METHOD``).
+The rerank node delegates to the reranker selected by ``RERANKER``.
+
+The index is long-lived and updated incrementally: uploads add only their own
+chunks (embedded once, under stable ids), deletes remove chunks by ``source``.
+After a restart, ``restore`` reattaches to the persisted Chroma collection and
+BM25 postings instead of re-embedding the corpus.
 """
 
-import re
-from typing import List, Optional, TypedDict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, TypedDict
 
-from langchain_classic.retrievers import EnsembleRetriever
-from langchain_community.retrievers import BM25Retriever
 from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
 from langgraph.graph import END, START, StateGraph
 
 from config import (
     DENSE_WEIGHT,
     EMBEDDING_MODEL,
-    GEMINI_API_KEY,
-    GEMINI_MODEL,
-    RERANK_THRESHOLD,
+    FUSION_METHOD,
     RETRIEVER_K,
+    RRF_C,
     VECTOR_STORE_DIR,
 )
+from services.embedding_cache import CachedEmbeddings, EmbeddingCache, model_name
+from services.fusion import reciprocal_rank_fusion, weighted_score_fusion
+from services.providers import create_embeddings
+from services.rerank_cache import CachedReranker, RerankCache
+from services.rerankers import Reranker, create_reranker
+from services.sparse_index import SparseIndex
+
+_ADD_BATCH_SIZE = 1000
+
+# Shared by all managers: the dense branch waits on the embedding API and
+# BM25 scoring runs in NumPy, so both release the GIL
+_retrieval_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="retrieval")
 
 
 class _AgentState(TypedDict):
@@ -31,115 +51,255 @@ class _AgentState(TypedDict):
     query: str
     documents: List[Document]
     final_results: List[Document]
+    timings: Dict[str, float]  # milliseconds per stage
 
 
 class RAGManager:
-    """Encapsulates hybrid retrieval with LLM-based reranking."""
+    """Encapsulates hybrid retrieval with reranking."""
 
     def __init__(
         self,
-        documents: List[Document],
+        documents: Optional[List[Document]] = None,
         persist_dir: str = VECTOR_STORE_DIR,
+        embedding: Optional[Embeddings] = None,
+        reranker_llm: Optional[BaseChatModel] = None,
+        reranker: Optional[Reranker] = None,
+        rerank_cache: Optional[RerankCache] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
     ) -> None:
+        """*embedding* defaults to the ``EMBEDDING_PROVIDER`` model.
+
+        *reranker* defaults to the one selected by ``RERANKER``; when that is
+        the LLM reranker, *reranker_llm* (default: ``LLM_PROVIDER``) does the
+        scoring.
+        With a *rerank_cache*, only (query, chunk) pairs it has not seen are
+        sent to the reranker; with an *embedding_cache*, only chunk texts it
+        has not seen are sent to the embedding model.
+        """
         self._persist_dir = persist_dir
         self._collection = "hybrid_rag_collection"
 
-        self._embedding = GoogleGenerativeAIEmbeddings(
-            model=EMBEDDING_MODEL,
-            google_api_key=GEMINI_API_KEY,
-        )
+        self._embedding = embedding or create_embeddings()
+        if embedding_cache is not None:
+            self._embedding = CachedEmbeddings(self._embedding, embedding_cache)
 
-        self._reranker_llm = ChatGoogleGenerativeAI(
-            model=GEMINI_MODEL,
-            api_key=GEMINI_API_KEY,
-            temperature=0,
-        )
+        self._reranker = reranker or create_reranker(llm=reranker_llm)
+        if rerank_cache is not None:
+            self._reranker = CachedReranker(self._reranker, rerank_cache)
+
+        if FUSION_METHOD not in ("rrf", "weighted"):
+            raise ValueError(
+                f"Unknown FUSION_METHOD {FUSION_METHOD!r}; expected 'rrf' or 'weighted'"
+            )
 
         self._vector_store: Optional[Chroma] = None
-        self._hybrid_retriever: Optional[EnsembleRetriever] = None
-        self._init_retriever(documents)
+        self._sparse_index = SparseIndex()
+        self._init_retriever()
+        if documents:
+            self.add_documents(documents)
 
         self._app = self._build_graph().compile()
 
     # ── retriever setup ──────────────────────────────────────────────────
 
-    def _init_retriever(self, documents: List[Document]) -> None:
-        self._vector_store = Chroma.from_documents(
-            documents=documents,
-            embedding=self._embedding,
-            persist_directory=self._persist_dir,
+    def _open_collection(self, model: str) -> Chroma:
+        return Chroma(
             collection_name=self._collection,
+            embedding_function=self._embedding,
+            persist_directory=self._persist_dir,
+            collection_metadata={"embedding_model": model},
         )
 
-        dense = self._vector_store.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": RETRIEVER_K},
-        )
-
-        sparse = BM25Retriever.from_documents(documents=documents)
-        sparse.k = RETRIEVER_K
+    def _init_retriever(self) -> None:
+        model = model_name(self._embedding)
+        self._vector_store = self._open_collection(model)
+
+        # Vectors of another model (or size) cannot be searched with this one:
+        # start empty, and ``restore`` re-embeds the corpus. Untagged
+        # collections predate the providers and hold Gemini vectors.
+        metadata = self._vector_store._collection.metadata or {}
+        stored = metadata.get("embedding_model", EMBEDDING_MODEL)
+        if stored != model:
+            print(f"Embedding model changed ({stored} → {model}); clearing the vector store.")
+            self._vector_store.delete_collection()
+            self._vector_store = self._open_collection(model)
+
+    @staticmethod
+    def _timed(search, query: str) -> Tuple[List[Tuple[Document, float]], float]:
+        started = time.perf_counter()
+        results = search(query)
+        return results, (time.perf_counter() - started) * 1000
+
+    def _dense_search(self, query: str) -> List[Tuple[Document, float]]:
+        """Top-k chunks by embedding similarity (negated distance: higher is better)."""
+        if not self._vector_store._collection.count():
+            return []
+        hits = self._vector_store.similarity_search_with_score(query, k=RETRIEVER_K)
+        return [(doc, -distance) for doc, distance in hits]
+
+    def _sparse_search(self, query: str) -> List[Tuple[Document, float]]:
+        """Top-k chunks by BM25 score."""
+        return self._sparse_index.search(query, RETRIEVER_K)
+
+    def retrieve(self, query: str) -> Tuple[List[Document], Dict[str, float]]:
+        """Run both branches concurrently and fuse them.
+
+        Returns the fused chunks (best first) and the timings in ms of each
+        branch, the fusion, and the whole step.
+        """
+        started = time.perf_counter()
+        dense = _retrieval_pool.submit(self._timed, self._dense_search, query)
+        sparse = _retrieval_pool.submit(self._timed, self._sparse_search, query)
+        dense_results, dense_ms = dense.result()
+        sparse_results, sparse_ms = sparse.result()
+
+        fused_at = time.perf_counter()
+        results = [dense_results, sparse_results]
+        weights = [DENSE_WEIGHT, 1.0 - DENSE_WEIGHT]
+        if FUSION_METHOD == "rrf":
+            docs = reciprocal_rank_fusion(results, weights, c=RRF_C)
+        else:
+            docs = weighted_score_fusion(results, weights)
+        finished = time.perf_counter()
+
+        return docs, {
+            "dense_ms": round(dense_ms, 2),
+            "sparse_ms": round(sparse_ms, 2),
+            "fusion_ms": round((finished - fused_at) * 1000, 2),
+            "retrieve_ms": round((finished - started) * 1000, 2),
+        }
+
+    # ── incremental updates ──────────────────────────────────────────────
+
+    @staticmethod
+    def chunk_ids(documents: List[Document]) -> List[str]:
+        """Stable ids: ``<source>:<chunk number within that source>``."""
+        counters: Dict[str, int] = {}
+        ids = []
+        for doc in documents:
+            source = doc.metadata.get("source", "unknown")
+            index = counters.get(source, 0)
+            counters[source] = index + 1
+            ids.append(f"{source}:{index}")
+        return ids
+
+    def _embed(self, ids: List[str], documents: List[Document]) -> None:
+        # Every vector is computed before the first write, so an embedding
+        # error leaves the chunks already stored under these ids untouched
+        embeddings = self._embedding.embed_documents([doc.page_content for doc in documents])
+        # Chroma caps the number of records per write
+        for start in range(0, len(documents), _ADD_BATCH_SIZE):
+            end = start + _ADD_BATCH_SIZE
+            self._vector_store._collection.upsert(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=[doc.page_content for doc in documents[start:end]],
+                metadatas=[doc.metadata for doc in documents[start:end]],
+            )
 
-        self._hybrid_retriever = EnsembleRetriever(
-            retrievers=[dense, sparse],
-            weights=[DENSE_WEIGHT, 1.0 - DENSE_WEIGHT],
+    def add_documents(
+        self, documents: List[Document], ids: Optional[List[str]] = None
+    ) -> int:
+        """Embed and index *documents* only; returns the number of chunks added."""
+        if not documents:
+            return 0
+        ids = ids or self.chunk_ids(documents)
+        self._embed(ids, documents)
+        self._sparse_index.add(ids, documents)
+        return len(ids)
+
+    def delete_source(self, source: str, keep: Sequence[str] = ()) -> None:
+        """Remove every chunk of one file from both indexes, except the ids in *keep*."""
+        collection = self._vector_store._collection
+        if keep:
+            kept = set(keep)
+            stale = [
+                chunk_id
+                for chunk_id in collection.get(where={"source": source}, include=[])["ids"]
+                if chunk_id not in kept
+            ]
+            for start in range(0, len(stale), _ADD_BATCH_SIZE):
+                collection.delete(ids=stale[start:start + _ADD_BATCH_SIZE])
+        else:
+            collection.delete(where={"source": source})
+        self._sparse_index.remove_source(source, keep)
+        if isinstance(self._reranker, CachedReranker):
+            self._reranker.cache.invalidate_source(source)
+
+    # ── persistence ──────────────────────────────────────────────────────
+
+    def restore(
+        self,
+        ids: List[str],
+        documents: List[Document],
+        sparse_index_dir: str,
+        stamp: int,
+    ) -> None:
+        """Reattach to a persisted corpus (*ids*/*documents* from the corpus store).
+
+        Chroma is reconciled with the corpus: only chunks it is missing (e.g.
+        after a crash mid-upload) are embedded, and chunks the corpus no longer
+        has are dropped. The BM25 postings are loaded from *sparse_index_dir*
+        when they were saved for *stamp*, and re-tokenized otherwise.
+        """
+        collection = self._vector_store._collection
+        stored = set(collection.get(include=[])["ids"])
+        wanted = set(ids)
+
+        orphans = list(stored - wanted)
+        for start in range(0, len(orphans), _ADD_BATCH_SIZE):
+            collection.delete(ids=orphans[start:start + _ADD_BATCH_SIZE])
+        missing = [i for i, chunk_id in enumerate(ids) if chunk_id not in stored]
+        if missing:
+            self._embed([ids[i] for i in missing], [documents[i] for i in missing])
+
+        by_id = dict(zip(ids, documents))
+        if not self._sparse_index.load(sparse_index_dir, by_id, stamp):
+            self._sparse_index.add(ids, documents)
+            self.save_sparse_index(sparse_index_dir, stamp)
+        print(
+            f"Restored {len(ids)} chunks "
+            f"({len(missing)} re-embedded, {len(orphans)} orphans dropped)."
         )
 
+    def save_sparse_index(self, path: str, stamp: int) -> None:
+        """Persist the BM25 postings for the corpus revision *stamp*."""
+        self._sparse_index.save(path, stamp)
+
     # ── LangGraph nodes ──────────────────────────────────────────────────
 
     def _retrieve_node(self, state: _AgentState) -> dict:
         print("--- Executing Retrieval Node ---")
-        docs = self._hybrid_retriever.invoke(state["query"])
-        print(f"Retrieved {len(docs)} documents.")
+        docs, timings = self.retrieve(state["query"])
+        print(
+            f"Retrieved {len(docs)} documents in {timings['retrieve_ms']:.0f} ms "
+            f"(dense {timings['dense_ms']:.0f} ms, sparse {timings['sparse_ms']:.0f} ms)."
+        )
         for i, doc in enumerate(docs):
             print(f"  [{i}] {doc.page_content[:120]}")
-        return {"documents": docs}
-
-    def _score_all_documents(self, query: str, docs: list) -> list[int]:
-        """Score all documents in a single LLM call. Returns list of scores."""
-        doc_list = "\n".join(
-            f"[Doc {i}]: {doc.page_content}" for i, doc in enumerate(docs)
-        )
-        prompt = ChatPromptTemplate.from_template(
-            "You are a relevance scoring assistant. Rate each document's relevance "
-            "to the query on a scale of 1-10.\n"
-            "1 = completely irrelevant, 10 = directly answers the question.\n\n"
-            "Query: {query}\n\n"
-            "Documents:\n{documents}\n\n"
-            "Return ONLY a comma-separated list of integers (one per document, "
-            "in order). Example for 3 docs: 8,3,6\n"
-            "Nothing else."
-        )
-        try:
-            response = (prompt | self._reranker_llm).invoke(
-                {"query": query, "documents": doc_list}
-            )
-            numbers = re.findall(r"\d+", response.content)
-            scores = [min(max(int(n), 1), 10) for n in numbers]
-
-            # Pad or truncate to match doc count
-            while len(scores) < len(docs):
-                scores.append(1)
-            scores = scores[: len(docs)]
-
-            return scores
-        except Exception as e:
-            print(f"  ⚠ Reranker error: {e}")
-            return [1] * len(docs)
+        return {"documents": docs, "timings": timings}
 
     def _rerank_node(self, state: _AgentState) -> dict:
         print("--- Executing Rerank Node ---")
         query = state["query"]
         docs = state["documents"]
 
-        scores = self._score_all_documents(query, docs)
+        threshold = self._reranker.threshold
+        started = time.perf_counter()
+        try:
+            scores = self._reranker.score(query, docs)
+        except Exception as e:
+            print(f"  ⚠ Reranker error: {e}")
+            scores = [threshold] * len(docs)
+        rerank_ms = (time.perf_counter() - started) * 1000
 
         scored = list(zip(scores, range(len(docs)), docs))
         for score, idx, doc in scored:
-            print(f"  Doc[{idx}] score={score}: {doc.page_content[:100]}")
+            print(f"  Doc[{idx}] score={score:.3g}: {doc.page_content[:100]}")
 
         scored.sort(key=lambda x: x[0], reverse=True)
 
-        reranked = [doc for score, _, doc in scored if score > RERANK_THRESHOLD]
+        reranked = [doc for score, _, doc in scored if score > threshold]
         if not reranked:
             print("  All docs scored low — returning top 3 as fallback.")
             reranked = [doc for _, _, doc in scored[:3]]
@@ -148,7 +308,8 @@ class RAGManager:
         for i, doc in enumerate(reranked):
             print(f"  [{i}] {doc.page_content[:120]}")
 
-        return {"final_results": reranked}
+        timings = {**state.get("timings", {}), "rerank_ms": round(rerank_ms, 2)}
+        return {"final_results": reranked, "timings": timings}
 
     # ── graph wiring ─────────────────────────────────────────────────────
 
@@ -163,5 +324,24 @@ class RAGManager:
 
     # ── public API ───────────────────────────────────────────────────────
 
+    def rerank_stats(self) -> Optional[Dict[str, int]]:
+        """Rerank cache counters, or None without a cache."""
+        if isinstance(self._reranker, CachedReranker):
+            return self._reranker.stats()
+        return None
+
+    def embedding_stats(self) -> Optional[Dict[str, int]]:
+        """Embedding cache counters, or None without a cache."""
+        if isinstance(self._embedding, CachedEmbeddings):
+            return self._embedding.stats()
+        return None
+
     def run_query(self, user_query: str) -> List[Document]:
-        return self._app.invoke({"query": user_query})["final_results"]
+        return self.run_query_with_timings(user_query)[0]
+
+    def run_query_with_timings(
+        self, user_query: str
+    ) -> Tuple[List[Document], Dict[str, float]]:
+        """Like ``run_query``, plus the per-stage timings in ms."""
+        result = self._app.invoke({"query": user_query})
+        return result["final_results"], result["timings"]
@@ -0,0 +1,164 @@
+"""
+Persistent cache of reranker scores.
+
+Scores are keyed by (reranker and its model, normalized query, chunk content
+hash), so a repeated question, or one differing only in case, punctuation or
+spacing, is not sent to the reranker again for chunks it has already scored,
+and scores of another model are never reused. Only the unseen pairs of a
+query are scored. Entries are evicted least recently used
+beyond ``max_entries`` and dropped when their file is deleted.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Sequence
+
+from langchain_core.documents import Document
+
+from services.rerankers import Reranker
+from services.sparse_index import tokenize
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    reranker   TEXT NOT NULL,
+    query      TEXT NOT NULL,
+    chunk_hash TEXT NOT NULL,
+    source     TEXT NOT NULL,
+    score      REAL NOT NULL,
+    used_at    REAL NOT NULL,
+    PRIMARY KEY (reranker, query, chunk_hash)
+);
+CREATE INDEX IF NOT EXISTS scores_used_at ON scores (used_at);
+CREATE INDEX IF NOT EXISTS scores_source ON scores (source);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """Lowercased word tokens joined by single spaces."""
+    return " ".join(tokenize(query))
+
+
+def chunk_hash(document: Document) -> str:
+    return hashlib.sha256(document.page_content.encode("utf-8")).hexdigest()
+
+
+class RerankCache:
+    """SQLite-backed LRU map of (reranker, query, chunk) → score."""
+
+    def __init__(self, db_path: str, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, reranker: str, query: str, hashes: Sequence[str]) -> Dict[str, float]:
+        """Cached scores of the given chunk hashes (missing ones are left out)."""
+        if not hashes:
+            return {}
+        placeholders = ",".join("?" * len(hashes))
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT chunk_hash, score FROM scores WHERE reranker = ? AND query = ? "
+                f"AND chunk_hash IN ({placeholders})",
+                (reranker, query, *hashes),
+            ).fetchall()
+            if rows:
+                self._conn.execute(
+                    f"UPDATE scores SET used_at = ? WHERE reranker = ? AND query = ? "
+                    f"AND chunk_hash IN ({','.join('?' * len(rows))})",
+                    (time.time(), reranker, query, *(h for h, _ in rows)),
+                )
+        return dict(rows)
+
+    def put(
+        self,
+        reranker: str,
+        query: str,
+        entries: Sequence[tuple],  # (chunk hash, source, score)
+    ) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scores "
+                "(reranker, query, chunk_hash, source, score, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(reranker, query, h, source, score, now) for h, source, score in entries],
+            )
+            excess = self._count() - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM scores WHERE rowid IN "
+                    "(SELECT rowid FROM scores ORDER BY used_at LIMIT ?)",
+                    (excess,),
+                )
+
+    def invalidate_source(self, source: str) -> int:
+        """Drop every score of *source*'s chunks; returns how many were dropped."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM scores WHERE source = ?", (source,)
+            ).rowcount
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+
+class CachedReranker(Reranker):
+    """Wraps a reranker: cached pairs are reused, only unseen ones are scored."""
+
+    def __init__(self, reranker: Reranker, cache: RerankCache) -> None:
+        self.reranker = reranker
+        self.cache = cache
+        self.name = reranker.name
+        self.threshold = reranker.threshold
+        self.queries = 0
+        self.calls = 0  # calls that reached the wrapped reranker
+        self.pairs_scored = 0
+        self.pairs_cached = 0
+
+    @property
+    def cache_key(self) -> str:
+        return self.reranker.cache_key
+
+    def score(self, query: str, docs: Sequence[Document]) -> List[float]:
+        self.queries += 1
+        if not docs:
+            return []
+        normalized = normalize_query(query)
+        hashes = [chunk_hash(doc) for doc in docs]
+        cached = self.cache.get(self.cache_key, normalized, list(set(hashes)))
+
+        missing = [i for i, h in enumerate(hashes) if h not in cached]
+        self.pairs_cached += len(docs) - len(missing)
+        if missing:
+            self.calls += 1
+            self.pairs_scored += len(missing)
+            fresh = self.reranker.score(query, [docs[i] for i in missing])
+            entries = []
+            for i, score in zip(missing, fresh):
+                cached[hashes[i]] = score
+                entries.append((hashes[i], docs[i].metadata.get("source", ""), score))
+            self.cache.put(self.cache_key, normalized, entries)
+        return [cached[h] for h in hashes]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queries": self.queries,
+            "reranker_calls": self.calls,
+            "reranker_calls_avoided": self.queries - self.calls,
+            "pairs_scored": self.pairs_scored,
+            "pairs_cached": self.pairs_cached,
+            "entries": len(self.cache),
+        }
@@ -0,0 +1,198 @@
+"""
+Rerankers for the rerank node of the hybrid pipeline.
+
+A reranker scores every retrieved chunk against the query (higher = more
+relevant); the pipeline keeps the chunks scoring above the reranker's
+``threshold``, best first. ``RERANKER`` in config.py selects one:
+
+* ``"llm"``           – the chat model (``LLM_PROVIDER``) rates all chunks 1-10 in one prompt
+* ``"cross_encoder"`` – a local ONNX cross-encoder (FastEmbed), batched on CPU
+* ``"lexical"``       – share of the query's content words found in the chunk
+"""
+
+import re
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.prompts import ChatPromptTemplate
+
+from config import (
+    CROSS_ENCODER_BATCH_SIZE,
+    CROSS_ENCODER_MODEL,
+    CROSS_ENCODER_THRESHOLD,
+    LEXICAL_THRESHOLD,
+    RERANK_THRESHOLD,
+    RERANKER,
+)
+from services.embedding_cache import model_name
+from services.providers import create_chat_model
+from services.sparse_index import tokenize
+
+
+class Reranker(ABC):
+    """Scores (query, chunk) pairs; chunks scoring at or below ``threshold`` are dropped."""
+
+    name: str = ""
+    threshold: float = 0.0
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies the scores: the reranker and the model behind it."""
+        return self.name
+
+    @abstractmethod
+    def score(self, query: str, docs: Sequence[Document]) -> List[float]:
+        """One relevance score per document, in order. May raise on failure."""
+
+
+# ── LLM ──────────────────────────────────────────────────────────────────
+
+_LLM_PROMPT = ChatPromptTemplate.from_template(
+    "You are a relevance scoring assistant. Rate each document's relevance "
+    "to the query on a scale of 1-10.\n"
+    "1 = completely irrelevant, 10 = directly answers the question.\n\n"
+    "Query: {query}\n\n"
+    "Documents:\n{documents}\n\n"
+    "Return ONLY a comma-separated list of integers (one per document, "
+    "in order). Example for 3 docs: 8,3,6\n"
+    "Nothing else."
+)
+
+
+class LLMReranker(Reranker):
+    """Scores all documents 1-10 in a single LLM call."""
+
+    name = "llm"
+
+    def __init__(self, llm: BaseChatModel, threshold: float = RERANK_THRESHOLD) -> None:
+        self._llm = llm
+        self.threshold = threshold
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.name}:{model_name(self._llm)}"
+
+    def score(self, query: str, docs: Sequence[Document]) -> List[float]:
+        if not docs:
+            return []
+        doc_list = "\n".join(
+            f"[Doc {i}]: {doc.page_content}" for i, doc in enumerate(docs)
+        )
+        response = (_LLM_PROMPT | self._llm).invoke(
+            {"query": query, "documents": doc_list}
+        )
+        numbers = re.findall(r"\d+", response.content)
+        scores = [min(max(int(n), 1), 10) for n in numbers]
+
+        # Pad or truncate to match doc count
+        while len(scores) < len(docs):
+            scores.append(1)
+        return scores[: len(docs)]
+
+
+# ── Cross-encoder ────────────────────────────────────────────────────────
+
+class CrossEncoderReranker(Reranker):
+    """Local ONNX cross-encoder (FastEmbed ``TextCrossEncoder``), CPU only.
+
+    The model is downloaded on first use and cached by FastEmbed. Scores are
+    raw logits: above 0 roughly means relevant.
+    """
+
+    name = "cross_encoder"
+
+    def __init__(
+        self,
+        model_name: str = CROSS_ENCODER_MODEL,
+        batch_size: int = CROSS_ENCODER_BATCH_SIZE,
+        threshold: float = CROSS_ENCODER_THRESHOLD,
+        threads: Optional[int] = None,
+    ) -> None:
+        try:
+            from fastembed.rerank.cross_encoder import TextCrossEncoder
+        except ImportError as e:
+            raise ImportError(
+                'RERANKER = "cross_encoder" needs FastEmbed: pip install fastembed'
+            ) from e
+
+        started = time.perf_counter()
+        self._model = TextCrossEncoder(
+            model_name=model_name,
+            threads=threads,
+            providers=["CPUExecutionProvider"],
+        )
+        print(f"Loaded cross-encoder {model_name} in {time.perf_counter() - started:.1f}s")
+        self._model_name = model_name
+        self._batch_size = batch_size
+        self.threshold = threshold
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.name}:{self._model_name}"
+
+    def score(self, query: str, docs: Sequence[Document]) -> List[float]:
+        if not docs:
+            return []
+        return [
+            float(s)
+            for s in self._model.rerank(
+                query,
+                [doc.page_content for doc in docs],
+                batch_size=self._batch_size,
+            )
+        ]
+
+
+# ── Lexical ──────────────────────────────────────────────────────────────
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it its of on or "
+    "s the their there this to was we what when where which who why will with "
+    "you your".split()
+)
+
+
+class LexicalReranker(Reranker):
+    """Share of the query's distinct content words that occur in the chunk.
+
+    No model and no I/O; ties keep the retrieval order.
+    """
+
+    name = "lexical"
+
+    def __init__(self, threshold: float = LEXICAL_THRESHOLD) -> None:
+        self.threshold = threshold
+
+    def score(self, query: str, docs: Sequence[Document]) -> List[float]:
+        terms = set(tokenize(query)) - _STOPWORDS or set(tokenize(query))
+        if not terms:
+            return [0.0] * len(docs)
+        return [
+            len(terms & set(tokenize(doc.page_content))) / len(terms)
+            for doc in docs
+        ]
+
+
+# ── factory ──────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=None)
+def _cross_encoder() -> CrossEncoderReranker:
+    # Loaded once per process: RAGManager is recreated when the corpus empties
+    return CrossEncoderReranker()
+
+
+def create_reranker(name: str = RERANKER, llm: Optional[BaseChatModel] = None) -> Reranker:
+    """Build the reranker selected by *name*; the LLM one defaults to ``LLM_PROVIDER``."""
+    if name == "llm":
+        return LLMReranker(llm or create_chat_model(temperature=0))
+    if name == "cross_encoder":
+        return _cross_encoder()
+    if name == "lexical":
+        return LexicalReranker()
+    raise ValueError(
+        f"Unknown RERANKER {name!r}; expected 'llm', 'cross_encoder' or 'lexical'"
+    )
@@ -0,0 +1,300 @@
+"""
+Incremental BM25 index for the sparse half of hybrid retrieval.
+
+Unlike ``BM25Retriever.from_documents``, which re-tokenizes the whole corpus
+on every change and keeps a Python dict per chunk, the postings live in NumPy
+arrays in CSR layout (one run of ``(slot, tf)`` pairs per term, where a slot is
+the chunk's integer id):
+
+* **add** tokenizes only the new chunks and splices their postings into the
+  arrays (a memcpy-style insert, no re-sort of the corpus);
+* **delete** is a tombstone in the ``alive`` mask; dead slots are compacted
+  away once they make up a quarter of the index;
+* **search** scores one query term at a time with vectorized NumPy over the
+  term's postings, then takes the top *k* with ``argpartition``;
+* **save/load** write the arrays as ``.npy`` files and map them back with
+  ``mmap_mode="r"``, so a restart neither re-tokenizes nor copies the postings
+  into memory until the next update.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+_TOKEN = re.compile(r"\w+")
+_COMPACT_RATIO = 0.25  # compact once this share of slots is deleted
+_ARRAY_FILES = ("offsets", "slots", "tfs", "lengths")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+class SparseIndex:
+    """BM25 (Okapi) index over chunks identified by stable ids."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        # Postings in CSR layout: term id t owns slots[offsets[t]:offsets[t + 1]]
+        self._vocabulary: Dict[str, int] = {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._slots = np.zeros(0, dtype=np.int32)
+        self._tfs = np.zeros(0, dtype=np.float32)
+        # Per slot
+        self._lengths = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._chunk_ids: List[Optional[str]] = []
+        self._documents: List[Optional[Document]] = []
+        self._slot_of: Dict[str, int] = {}
+        self._by_source: Dict[str, Set[int]] = defaultdict(set)
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the posting and length arrays."""
+        return sum(getattr(self, f"_{name}").nbytes for name in _ARRAY_FILES)
+
+    # ── updates ──────────────────────────────────────────────────────────
+
+    def _remove_slots(self, slots: Sequence[int]) -> None:
+        # Caller holds the lock
+        for slot in slots:
+            document = self._documents[slot]
+            self._by_source[document.metadata.get("source", "")].discard(slot)
+            del self._slot_of[self._chunk_ids[slot]]
+            self._chunk_ids[slot] = None
+            self._documents[slot] = None
+            self._alive[slot] = False
+            self._total_length -= float(self._lengths[slot])
+
+        dead = len(self._alive) - len(self._slot_of)
+        if dead and dead >= _COMPACT_RATIO * len(self._alive):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Drop tombstoned slots and their postings, renumbering the rest."""
+        # Caller holds the lock
+        alive = self._alive
+        remap = np.cumsum(alive, dtype=np.int64) - 1
+        keep = alive[self._slots]
+        terms = np.repeat(np.arange(len(self._offsets) - 1), np.diff(self._offsets))
+        counts = np.bincount(terms[keep], minlength=len(self._offsets) - 1)
+
+        self._offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self._slots = remap[self._slots[keep]].astype(np.int32)
+        self._tfs = self._tfs[keep]
+        self._lengths = self._lengths[alive]
+        self._alive = np.ones(len(self._lengths), dtype=bool)
+
+        self._chunk_ids = [c for c in self._chunk_ids if c is not None]
+        self._documents = [d for d in self._documents if d is not None]
+        self._reindex_slots()
+
+    def _reindex_slots(self) -> None:
+        self._slot_of = {chunk_id: slot for slot, chunk_id in enumerate(self._chunk_ids)}
+        self._by_source = defaultdict(set)
+        for slot, document in enumerate(self._documents):
+            self._by_source[document.metadata.get("source", "")].add(slot)
+
+    def add(self, ids: Sequence[str], documents: Sequence[Document]) -> None:
+        """Index chunks, replacing any already indexed under the same ids."""
+        with self._lock:
+            self._remove_slots([self._slot_of[i] for i in ids if i in self._slot_of])
+
+            first_slot = len(self._chunk_ids)
+            for slot, (chunk_id, document) in enumerate(zip(ids, documents), first_slot):
+                self._chunk_ids.append(chunk_id)
+                self._documents.append(document)
+                self._slot_of[chunk_id] = slot
+                self._by_source[document.metadata.get("source", "")].add(slot)
+
+            tokens = [tokenize(document.page_content) for document in documents]
+            lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+            vocabulary = self._vocabulary
+            term_ids = np.fromiter(
+                (vocabulary.setdefault(t, len(vocabulary)) for words in tokens for t in words),
+                dtype=np.int64,
+                count=int(lengths.sum()),
+            )
+            slots = np.repeat(np.arange(first_slot, first_slot + len(tokens)), lengths)
+            # One key per (term, slot) occurrence; counting equal keys gives the tf
+            stride = first_slot + len(tokens)
+            keys, tfs = np.unique(term_ids * stride + slots, return_counts=True)
+
+            self._lengths = np.concatenate((self._lengths, lengths.astype(np.float32)))
+            self._alive = np.concatenate((self._alive, np.ones(len(tokens), dtype=bool)))
+            self._total_length += float(lengths.sum())
+            self._insert_postings(
+                keys // stride,
+                (keys % stride).astype(np.int32),
+                tfs.astype(np.float32),
+            )
+
+    def _insert_postings(self, terms: np.ndarray, slots: np.ndarray, tfs: np.ndarray) -> None:
+        # Caller holds the lock; postings come sorted by term, then slot. New
+        # slots are larger than every existing one, so appending them at the
+        # end of each term's run keeps the runs sorted.
+        vocabulary_size = len(self._vocabulary)
+        offsets = np.concatenate((
+            self._offsets,
+            np.full(vocabulary_size + 1 - len(self._offsets), self._offsets[-1], dtype=np.int64),
+        ))
+        positions = offsets[terms + 1]
+        self._slots = np.insert(self._slots, positions, slots)
+        self._tfs = np.insert(self._tfs, positions, tfs)
+
+        offsets[1:] += np.cumsum(np.bincount(terms, minlength=vocabulary_size))
+        self._offsets = offsets
+
+    def remove_source(self, source: str, keep: Sequence[str] = ()) -> int:
+        """Remove every chunk of *source* except the ids in *keep*; returns how many were removed."""
+        with self._lock:
+            kept = set(keep)
+            slots = [
+                slot for slot in self._by_source.get(source, ())
+                if self._chunk_ids[slot] not in kept
+            ]
+            self._remove_slots(slots)
+            if not self._by_source.get(source):
+                self._by_source.pop(source, None)
+            return len(slots)
+
+    # ── persistence ──────────────────────────────────────────────────────
+
+    def save(self, path: str, stamp: int) -> None:
+        """Write the index to the directory *path*, tagged with *stamp* (the corpus revision).
+
+        ``meta.json`` is written last: a save interrupted half-way leaves no
+        meta file, and ``load`` then refuses the directory. Nothing is written
+        if the directory already holds the index saved for *stamp*.
+        """
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        with self._lock:
+            if len(self._slot_of) < len(self._alive):
+                self._compact()
+            try:
+                with open(meta_path, encoding="utf-8") as f:
+                    if json.load(f).get("stamp") == stamp:
+                        return
+            except (OSError, ValueError):
+                pass
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+
+            # Arrays mapped by ``load`` may be these very files, and a mapped
+            # file cannot be replaced on Windows: read them into memory first
+            for name in _ARRAY_FILES:
+                array = getattr(self, f"_{name}")
+                if isinstance(array, np.memmap):
+                    setattr(self, f"_{name}", np.array(array))
+
+            for name in _ARRAY_FILES:
+                # Write beside the old file and swap
+                tmp_path = os.path.join(path, f"{name}.tmp.npy")
+                np.save(tmp_path, getattr(self, f"_{name}"))
+                os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+
+            meta = {
+                "stamp": stamp,
+                "k1": self.k1,
+                "b": self.b,
+                "vocabulary": sorted(self._vocabulary, key=self._vocabulary.__getitem__),
+                "chunk_ids": self._chunk_ids,
+            }
+            tmp_path = meta_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, meta_path)
+
+    def load(self, path: str, documents: Mapping[str, Document], stamp: int) -> bool:
+        """Replace the index with the one saved in *path*, memory-mapping its postings.
+
+        *documents* maps chunk ids to their chunks. Returns False (and leaves
+        the index untouched) if nothing was saved, it was saved for another
+        *stamp* or it does not cover exactly these chunks.
+        """
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            chunk_ids = meta["chunk_ids"]
+            if (
+                meta["stamp"] != stamp
+                or (meta["k1"], meta["b"]) != (self.k1, self.b)
+                or len(chunk_ids) != len(documents)
+                or not all(chunk_id in documents for chunk_id in chunk_ids)
+            ):
+                return False
+            arrays = {
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                for name in _ARRAY_FILES
+            }
+        except (OSError, ValueError, KeyError):
+            return False
+
+        with self._lock:
+            self._clear()
+            self._vocabulary = {term: i for i, term in enumerate(meta["vocabulary"])}
+            self._offsets = arrays["offsets"]
+            self._slots = arrays["slots"]
+            self._tfs = arrays["tfs"]
+            # Small and updated in place, so kept in memory
+            self._lengths = np.array(arrays["lengths"])
+            self._alive = np.ones(len(chunk_ids), dtype=bool)
+            self._chunk_ids = list(chunk_ids)
+            self._documents = [documents[chunk_id] for chunk_id in chunk_ids]
+            self._reindex_slots()
+            self._total_length = float(self._lengths.sum())
+        return True
+
+    # ── search ───────────────────────────────────────────────────────────
+
+    def search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        """Top-*k* (document, BM25 score) pairs for *query*, best first."""
+        with self._lock:
+            count = len(self._slot_of)
+            if not count or k <= 0:
+                return []
+            avg_length = self._total_length / count
+
+            scores = np.zeros(len(self._alive), dtype=np.float32)
+            for term in set(tokenize(query)):
+                term_id = self._vocabulary.get(term)
+                if term_id is None:
+                    continue
+                start, end = self._offsets[term_id], self._offsets[term_id + 1]
+                slots = self._slots[start:end]
+                alive = self._alive[slots]
+                df = int(np.count_nonzero(alive))
+                if not df:
+                    continue
+                tfs = self._tfs[start:end]
+                idf = np.log1p((count - df + 0.5) / (df + 0.5))
+                norm = tfs + self.k1 * (1 - self.b + self.b * self._lengths[slots] / avg_length)
+                # Slots are unique within a term's run, so a fancy-index add is safe
+                scores[slots] += alive * (idf * tfs * (self.k1 + 1) / norm)
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [
+                (self._documents[slot], float(scores[slot]))
+                for slot in top
+                if scores[slot] > 0
+            ]
+
@@ -3,15 +3,32 @@ Shared application state.
 
 Centralises the mutable globals (RAG manager, document list, file names)
 so that every route module can import and mutate the same objects.
+
+The file registry and chunk texts are persisted in a SQLite corpus store and
+reloaded at startup (``load``), together with the Chroma collection and the
+saved BM25 postings, so a restart does not re-embed anything. Chunk vectors
+are also cached by content (``EmbeddingCache``), so re-uploading a file or
+re-embedding chunks missing from Chroma only embeds text not seen before.
 """
 
 import os
-import shutil
+import threading
 from typing import List, Optional
 
 from langchain_core.documents import Document
 
-from config import VECTOR_STORE_DIR
+from config import (
+    CORPUS_DB_PATH,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_SIZE,
+    RERANK_CACHE_PATH,
+    RERANK_CACHE_SIZE,
+    SPARSE_INDEX_DIR,
+    VECTOR_STORE_DIR,
+)
+from services.corpus_store import CorpusStore
+from services.embedding_cache import EmbeddingCache
+from services.rerank_cache import RerankCache
 
 
 class AppState:
@@ -21,16 +38,115 @@ class AppState:
         self.rag_manager: Optional["RAGManager"] = None  # noqa: F821
         self.all_documents: List[Document] = []
         self.uploaded_file_names: List[str] = []
+        self._store: Optional[CorpusStore] = None
+        self._rerank_cache: Optional[RerankCache] = None
+        self._embedding_cache: Optional[EmbeddingCache] = None
+        # Uploads and deletes run in the threadpool; one index update at a time
+        self._lock = threading.RLock()
+
+    # ── lifecycle ────────────────────────────────────────────────────────
+
+    def load(self) -> None:
+        """Open the corpus store and bring the indexes back for its documents."""
+        if self._store is not None:
+            return
+        os.makedirs(VECTOR_STORE_DIR, exist_ok=True)
+        self._store = CorpusStore(CORPUS_DB_PATH)
+        if RERANK_CACHE_SIZE > 0:
+            self._rerank_cache = RerankCache(RERANK_CACHE_PATH, RERANK_CACHE_SIZE)
+        if EMBEDDING_CACHE_SIZE > 0:
+            self._embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_SIZE)
+        _, self.all_documents = self._store.load()
+        self.uploaded_file_names = self._store.files()
+        if self.all_documents:
+            self._get_rag_manager()
+
+    def close(self) -> None:
+        """Save the BM25 postings so the next start can load them as they are."""
+        if self._store is None:
+            return
+        if self.rag_manager is not None:
+            self.rag_manager.save_sparse_index(SPARSE_INDEX_DIR, self._store.revision)
+        # The manager holds the caches closed below; ``load`` builds a new one
+        self.rag_manager = None
+        self.all_documents = []
+        self.uploaded_file_names = []
+        self._store.close()
+        self._store = None
+        if self._rerank_cache is not None:
+            self._rerank_cache.close()
+            self._rerank_cache = None
+        if self._embedding_cache is not None:
+            self._embedding_cache.close()
+            self._embedding_cache = None
+
+    # ── internals ────────────────────────────────────────────────────────
+
+    def _get_store(self) -> CorpusStore:
+        if self._store is None:
+            self.load()
+        return self._store
 
-    def rebuild_rag(self) -> None:
-        """(Re-)initialise the RAGManager with current documents."""
+    def _get_rag_manager(self) -> "RAGManager":  # noqa: F821
+        """Return the RAGManager, reattaching it to the persisted corpus on first use."""
         from services.rag_manager import RAGManager  # lazy to avoid circular
 
-        if os.path.exists(VECTOR_STORE_DIR):
-            shutil.rmtree(VECTOR_STORE_DIR)
-        self.rag_manager = RAGManager(
-            self.all_documents, persist_dir=VECTOR_STORE_DIR
-        )
+        if self.rag_manager is None:
+            store = self._get_store()
+            manager = RAGManager(
+                persist_dir=VECTOR_STORE_DIR,
+                rerank_cache=self._rerank_cache,
+                embedding_cache=self._embedding_cache,
+            )
+            ids, documents = store.load()
+            manager.restore(ids, documents, SPARSE_INDEX_DIR, store.revision)
+            self.rag_manager = manager
+        return self.rag_manager
+
+    def _forget(self, filename: str) -> None:
+        if self.rag_manager is not None:
+            self.rag_manager.delete_source(filename)
+        self._get_store().delete_source(filename)
+        self.uploaded_file_names = [
+            f for f in self.uploaded_file_names if f != filename
+        ]
+        self.all_documents = [
+            d for d in self.all_documents if d.metadata.get("source") != filename
+        ]
+
+    # ── public API ───────────────────────────────────────────────────────
+
+    def add_documents(self, documents: List[Document]) -> None:
+        """Index new chunks; files uploaded again replace their earlier chunks.
+
+        The new chunks are embedded before anything of an earlier version is
+        dropped, so a failed upload leaves that version indexed.
+        """
+        with self._lock:
+            manager = self._get_rag_manager()
+            sources = list(dict.fromkeys(d.metadata.get("source") for d in documents))
+            replaced = {s for s in sources if s in self.uploaded_file_names}
+
+            ids = manager.chunk_ids(documents)
+            manager.add_documents(documents, ids)
+            # Chunks of the earlier versions that the new ones did not overwrite
+            for source in replaced:
+                manager.delete_source(source, keep=ids)
+            # Recorded only once both indexes hold the chunks
+            self._get_store().add(ids, documents)
+            self.all_documents = [
+                d for d in self.all_documents if d.metadata.get("source") not in replaced
+            ] + documents
+            self.uploaded_file_names = [
+                f for f in self.uploaded_file_names if f not in replaced
+            ] + sources
+
+    def remove_file(self, filename: str) -> None:
+        """Drop one file's chunks from the index and the document list."""
+        with self._lock:
+            self._forget(filename)
+            if not self.all_documents:
+                self.reset_rag()
 
     def reset_rag(self) -> None:
         """Clear the RAG manager (e.g. when all files are deleted)."""
@@ -12,11 +12,21 @@ load_dotenv()
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
 VECTOR_STORE_DIR = os.path.join(BASE_DIR, "vector_store")
+# Outside VECTOR_STORE_DIR, which every rebuild deletes
+EMBEDDING_CACHE_PATH = os.path.join(BASE_DIR, "embedding_cache.db")
 
 # ── Model settings ───────────────────────────────────────────────────────
+# "gemini" (Google API), "local" (FastEmbed / Ollama, offline) or "fake" (deterministic, for benchmarks)
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "gemini")
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
 GEMINI_MODEL = "gemini-2.5-flash"
 EMBEDDING_MODEL = "gemini-embedding-001"
 GEMINI_API_KEY = os.getenv("Gemini_APi_Key")
+LOCAL_EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"  # FastEmbed ONNX, 384 dims
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2:1b")
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+FAKE_EMBEDDING_DIM = 384
+EMBEDDING_CACHE_SIZE = 100_000  # cached chunk vectors (~12 KB each at 3,072 dims); 0 disables
 
 # ── Chunking ─────────────────────────────────────────────────────────────
 CHUNK_SIZE = 500
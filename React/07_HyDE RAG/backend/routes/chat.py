@@ -1,27 +1,32 @@
 """
-POST /chat – query the HyDE RAG pipeline and return an LLM-generated answer.
+POST /chat        – query the HyDE RAG pipeline and return an LLM-generated answer.
+POST /chat/stream – the same, as Server-Sent Events: the retrieved sources
+                    and trace first, then the answer token by token.
+
+The HyDE pipeline is synchronous (hypothetical document LLM call, embedding,
+Chroma search), so it runs in the threadpool; the answer LLM is called through
+its async API. The event loop is never blocked and concurrent requests overlap.
 """
 
+import json
 import time
-from typing import List
+from typing import List, Tuple
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 
-from config import GEMINI_API_KEY, GEMINI_MODEL
 from schemas import ChatRequest, ChatResponse
+from services.providers import create_chat_model
 from services.state import app_state
 
 router = APIRouter()
 
 # LLM used to synthesise a final answer from retrieved context
-_answer_llm = ChatGoogleGenerativeAI(
-    model=GEMINI_MODEL,
-    api_key=GEMINI_API_KEY,
-    temperature=0.3,
-)
+_answer_llm = create_chat_model(temperature=0.3)
+_answer_model = getattr(_answer_llm, "model", type(_answer_llm).__name__)
 
 _ANSWER_PROMPT = ChatPromptTemplate.from_template(
     "You are a helpful AI assistant. Answer the user's question based ONLY on "
@@ -32,73 +37,82 @@ _ANSWER_PROMPT = ChatPromptTemplate.from_template(
     "Answer:"
 )
 
+_NO_RESULTS = "I couldn't find any relevant information in the uploaded documents."
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    if app_state.rag_manager is None:
+
+async def _retrieve(message: str) -> Tuple[List[Document], List[dict]]:
+    """Run the HyDE pipeline in the threadpool; raises 400 before any upload."""
+    rag_manager = app_state.rag_manager
+    if rag_manager is None:
         raise HTTPException(
             status_code=400,
             detail="No documents uploaded yet. Please upload documents first.",
         )
+    # run_query returns {"final_results": [...], "trace": [...]}
+    result = await run_in_threadpool(rag_manager.run_query, message)
+    return result["final_results"], result.get("trace", [])
+
+
+def _assemble_context(docs: List[Document], message: str, trace: List[dict]) -> Tuple[dict, List[str]]:
+    context = "\n\n---\n\n".join(doc.page_content for doc in docs)
+    sources = list({doc.metadata.get("source", "Unknown") for doc in docs})
+
+    # ── Step 6: Context Assembled ──
+    trace.append({
+        "step": 6,
+        "label": "Context Assembled",
+        "status": "complete",
+        "metadata": {
+            "context_length_chars": len(context),
+            "num_sources": len(sources),
+            "strategy": "stuffing",
+        },
+    })
+    return {"context": context, "question": message}, sources
+
+
+def _finish_trace(trace: List[dict], llm_elapsed: float, answer: str) -> None:
+    # ── Step 7: LLM Response Generation ──
+    trace.append({
+        "step": 7,
+        "label": "LLM Response Generation",
+        "status": "complete",
+        "duration_s": llm_elapsed,
+        "metadata": {
+            "model": _answer_model,
+            "temperature": 0.3,
+            "answer_length_chars": len(answer),
+        },
+    })
+
+    # ── Step 8: Final Answer Delivered ──
+    trace.append({
+        "step": 8,
+        "label": "Final Answer Delivered",
+        "status": "complete",
+        "metadata": {
+            "finish_reason": "stop",
+        },
+    })
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
+@router.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
     try:
-        # run_query now returns {"final_results": [...], "trace": [...]}
-        result = app_state.rag_manager.run_query(request.message)
-        relevant_docs: List[Document] = result["final_results"]
-        trace = result.get("trace", [])
+        relevant_docs, trace = await _retrieve(request.message)
 
         if not relevant_docs:
-            return ChatResponse(
-                answer="I couldn't find any relevant information in the uploaded documents.",
-                sources=[],
-                trace=trace,
-            )
-
-        context = "\n\n---\n\n".join(doc.page_content for doc in relevant_docs)
-        sources = list(
-            {doc.metadata.get("source", "Unknown") for doc in relevant_docs}
-        )
+            return ChatResponse(answer=_NO_RESULTS, sources=[], trace=trace)
 
-        # ── Step 6: Context Assembled ──
-        trace.append({
-            "step": 6,
-            "label": "Context Assembled",
-            "status": "complete",
-            "metadata": {
-                "context_length_chars": len(context),
-                "num_sources": len(sources),
-                "strategy": "stuffing",
-            },
-        })
+        inputs, sources = _assemble_context(relevant_docs, request.message, trace)
 
-        # ── Step 7: LLM Response Generation ──
         t0 = time.time()
-        response = (_ANSWER_PROMPT | _answer_llm).invoke(
-            {"context": context, "question": request.message}
-        )
-        llm_elapsed = round(time.time() - t0, 2)
-
-        trace.append({
-            "step": 7,
-            "label": "LLM Response Generation",
-            "status": "complete",
-            "duration_s": llm_elapsed,
-            "metadata": {
-                "model": GEMINI_MODEL,
-                "temperature": 0.3,
-                "answer_length_chars": len(response.content),
-            },
-        })
-
-        # ── Step 8: Final Answer Delivered ──
-        trace.append({
-            "step": 8,
-            "label": "Final Answer Delivered",
-            "status": "complete",
-            "metadata": {
-                "finish_reason": "stop",
-            },
-        })
+        response = await (_ANSWER_PROMPT | _answer_llm).ainvoke(inputs)
+        _finish_trace(trace, round(time.time() - t0, 2), response.content)
 
         return ChatResponse(
             answer=response.content,
@@ -106,5 +120,61 @@ async def chat(request: ChatRequest):
             trace=trace,
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing query: {e}")
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Stream the answer using Server-Sent Events.
+
+    Events: ``sources`` (source files, chunk texts and the trace up to step
+    6), then one ``token`` per answer delta, then ``done`` with the complete
+    trace, or ``error``. The stream ends with ``data: [DONE]``.
+    """
+    try:
+        relevant_docs, trace = await _retrieve(request.message)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing query: {e}")
+
+    async def generate():
+        inputs, sources = None, []
+        if relevant_docs:
+            inputs, sources = _assemble_context(relevant_docs, request.message, trace)
+        yield _sse("sources", {
+            "sources": sources,
+            "chunks": [
+                {"source": doc.metadata.get("source", "Unknown"), "text": doc.page_content}
+                for doc in relevant_docs
+            ],
+            "trace": trace,
+        })
+        try:
+            if inputs is None:
+                yield _sse("token", {"content": _NO_RESULTS})
+            else:
+                t0 = time.time()
+                answer = []
+                async for chunk in (_ANSWER_PROMPT | _answer_llm).astream(inputs):
+                    if chunk.content:
+                        answer.append(chunk.content)
+                        yield _sse("token", {"content": chunk.content})
+                _finish_trace(trace, round(time.time() - t0, 2), "".join(answer))
+            yield _sse("done", {"trace": trace})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Error generating answer: {e}"})
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -0,0 +1,173 @@
+"""
+Embedding and chat model providers.
+
+``EMBEDDING_PROVIDER`` and ``LLM_PROVIDER`` in config.py select one each:
+
+* ``"gemini"`` – Google's API (needs ``Gemini_APi_Key``)
+* ``"local"``  – FastEmbed ONNX embeddings on the CPU; chat through an Ollama
+  server (``OLLAMA_BASE_URL``); no internet access needed
+* ``"fake"``   – deterministic and offline: feature-hashed bag-of-words
+  embeddings, and a chat model that replies with the question it was asked.
+  For tests and benchmarks; retrieval quality reflects word overlap only.
+"""
+
+import math
+import re
+import time
+import zlib
+from functools import lru_cache
+from typing import Iterator, List
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+
+from config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_PROVIDER,
+    FAKE_EMBEDDING_DIM,
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    LLM_PROVIDER,
+    LOCAL_EMBEDDING_MODEL,
+    OLLAMA_BASE_URL,
+    OLLAMA_MODEL,
+)
+
+_PROVIDERS = ("gemini", "local", "fake")
+
+_WORD = re.compile(r"\w+")
+# The last "Question: ..." or "Query: ..." of a prompt
+_QUESTION = re.compile(r"(?:Question|Query): (.*?)(?:\n\n|$)", re.S)
+
+
+# ── fake ─────────────────────────────────────────────────────────────────
+
+class HashingEmbeddings(Embeddings):
+    """Feature-hashed bag-of-words vectors (signed, sublinear tf, L2-normalized).
+
+    CRC32 rather than ``hash()``: vectors are the same in every process.
+    """
+
+    def __init__(self, dimensions: int = FAKE_EMBEDDING_DIM) -> None:
+        self.dimensions = dimensions
+        self.model = f"fake-hashing-{dimensions}"
+
+    def _embed(self, text: str) -> List[float]:
+        counts = {}
+        for word in _WORD.findall(text.lower()):
+            counts[word] = counts.get(word, 0) + 1
+
+        vector = [0.0] * self.dimensions
+        for word, count in counts.items():
+            digest = zlib.crc32(word.encode("utf-8"))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dimensions] += sign * (1.0 + math.log(count))
+
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class FakeChatModel(BaseChatModel):
+    """Replies with the last question (or query) in the prompt, word by word.
+
+    *latency_ms* is waited before the first word and *token_ms* before each
+    following one, to stand in for a real model's generation time.
+    """
+
+    model: str = "fake-echo"
+    latency_ms: float = 0.0
+    token_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @staticmethod
+    def reply(prompt: str) -> str:
+        questions = _QUESTION.findall(prompt)
+        if questions:
+            return questions[-1].strip()
+        lines = prompt.strip().splitlines()
+        return lines[-1] if lines else ""
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        prompt = "\n".join(str(message.content) for message in messages)
+        time.sleep(self.latency_ms / 1000)
+        for i, word in enumerate(self.reply(prompt).split(" ")):
+            if i:
+                time.sleep(self.token_ms / 1000)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=" " + word if i else word))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text = "".join(chunk.text for chunk in self._stream(messages, stop, run_manager))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+# ── local ────────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=None)
+def _fastembed() -> Embeddings:
+    # Loaded once per process: every upload or delete creates a new RAGManager
+    from langchain_community.embeddings import FastEmbedEmbeddings
+
+    started = time.perf_counter()
+    embeddings = FastEmbedEmbeddings(
+        model_name=LOCAL_EMBEDDING_MODEL,
+        providers=["CPUExecutionProvider"],
+    )
+    print(f"Loaded embedding model {LOCAL_EMBEDDING_MODEL} in {time.perf_counter() - started:.1f}s")
+    return embeddings
+
+
+# ── factories ────────────────────────────────────────────────────────────
+
+def _check(setting: str, provider: str) -> None:
+    if provider not in _PROVIDERS:
+        raise ValueError(
+            f"Unknown {setting} {provider!r}; expected 'gemini', 'local' or 'fake'"
+        )
+
+
+def create_embeddings(provider: str = EMBEDDING_PROVIDER) -> Embeddings:
+    """Embedding model of the given provider (default: ``EMBEDDING_PROVIDER``)."""
+    _check("EMBEDDING_PROVIDER", provider)
+    if provider == "gemini":
+        return GoogleGenerativeAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            google_api_key=GEMINI_API_KEY,
+        )
+    if provider == "local":
+        return _fastembed()
+    return HashingEmbeddings()
+
+
+def create_chat_model(temperature: float, provider: str = LLM_PROVIDER) -> BaseChatModel:
+    """Chat model of the given provider (default: ``LLM_PROVIDER``)."""
+    _check("LLM_PROVIDER", provider)
+    if provider == "gemini":
+        return ChatGoogleGenerativeAI(
+            model=GEMINI_MODEL,
+            api_key=GEMINI_API_KEY,
+            temperature=temperature,
+        )
+    if provider == "local":
+        from langchain_ollama import ChatOllama
+
+        return ChatOllama(
+            model=OLLAMA_MODEL,
+            base_url=OLLAMA_BASE_URL,
+            temperature=temperature,
+        )
+    return FakeChatModel()
@@ -13,17 +13,14 @@ from typing import Any, Dict, List, Optional, TypedDict
 
 from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 from langgraph.graph import END, START, StateGraph
 
-from config import (
-    EMBEDDING_MODEL,
-    GEMINI_API_KEY,
-    GEMINI_MODEL,
-    RETRIEVER_K,
-    VECTOR_STORE_DIR,
-)
+from config import RETRIEVER_K, VECTOR_STORE_DIR
+from services.embedding_cache import CachedEmbeddings, EmbeddingCache, model_name
+from services.providers import create_chat_model, create_embeddings
 
 
 class _AgentState(TypedDict):
@@ -42,21 +39,25 @@ class RAGManager:
         self,
         documents: List[Document],
         persist_dir: str = VECTOR_STORE_DIR,
+        embedding: Optional[Embeddings] = None,
+        hyde_llm: Optional[BaseChatModel] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
     ) -> None:
+        """*embedding* and *hyde_llm* default to the ``EMBEDDING_PROVIDER`` and
+        ``LLM_PROVIDER`` models.
+
+        With an *embedding_cache*, only chunk texts it has not seen are sent to
+        the embedding model.
+        """
         self._persist_dir = persist_dir
         self._collection = "hyde_rag_collection"
 
-        self._embedding = GoogleGenerativeAIEmbeddings(
-            model=EMBEDDING_MODEL,
-            google_api_key=GEMINI_API_KEY,
-        )
+        self._embedding = embedding or create_embeddings()
+        if embedding_cache is not None:
+            self._embedding = CachedEmbeddings(self._embedding, embedding_cache)
 
         # Used for hypothetical document generation (same LLM as old reranker)
-        self._hyde_llm = ChatGoogleGenerativeAI(
-            model=GEMINI_MODEL,
-            api_key=GEMINI_API_KEY,
-            temperature=0.7,
-        )
+        self._hyde_llm = hyde_llm or create_chat_model(temperature=0.7)
 
         self._vector_store: Optional[Chroma] = None
         self._init_vector_store(documents)
@@ -134,7 +135,7 @@ class RAGManager:
             "status": "complete",
             "duration_s": embed_elapsed,
             "metadata": {
-                "model": EMBEDDING_MODEL,
+                "model": model_name(self._embedding),
                 "dimensions": len(hypo_embedding),
             },
         }
@@ -203,6 +204,12 @@ class RAGManager:
 
     # ── public API ───────────────────────────────────────────────────────
 
+    def embedding_stats(self) -> Optional[Dict[str, int]]:
+        """Embedding cache counters of this build, or None without a cache."""
+        if isinstance(self._embedding, CachedEmbeddings):
+            return self._embedding.stats()
+        return None
+
     def run_query(self, user_query: str) -> dict:
         """Run the HyDE pipeline. Returns dict with 'final_results' and 'trace'."""
         result = self._app.invoke({
@@ -3,6 +3,9 @@ Shared application state.
 
 Centralises the mutable globals (RAG manager, document list, file names)
 so that every route module can import and mutate the same objects.
+
+Every rebuild re-creates the vector store from all documents; chunk vectors
+are cached by content (``EmbeddingCache``), so only new chunks are embedded.
 """
 
 import os
@@ -11,7 +14,8 @@ from typing import List, Optional
 
 from langchain_core.documents import Document
 
-from config import VECTOR_STORE_DIR
+from config import EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_SIZE, VECTOR_STORE_DIR
+from services.embedding_cache import EmbeddingCache
 
 
 class AppState:
@@ -21,15 +25,20 @@ class AppState:
         self.rag_manager: Optional["RAGManager"] = None  # noqa: F821
         self.all_documents: List[Document] = []
         self.uploaded_file_names: List[str] = []
+        self._embedding_cache: Optional[EmbeddingCache] = None
 
     def rebuild_rag(self) -> None:
         """(Re-)initialise the RAGManager with current documents."""
         from services.rag_manager import RAGManager  # lazy to avoid circular
 
+        if self._embedding_cache is None and EMBEDDING_CACHE_SIZE > 0:
+            self._embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_SIZE)
         if os.path.exists(VECTOR_STORE_DIR):
             shutil.rmtree(VECTOR_STORE_DIR)
         self.rag_manager = RAGManager(
-            self.all_documents, persist_dir=VECTOR_STORE_DIR
+            self.all_documents,
+            persist_dir=VECTOR_STORE_DIR,
+            embedding_cache=self._embedding_cache,
         )
 
     def reset_rag(self) -> None: